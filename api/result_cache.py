@@ -0,0 +1,134 @@
+import os
+import json
+import threading
+import time
+import logging
+from collections import OrderedDict
+import numpy as np
+from embeddings.similarity import normalize
+from embeddings.sparse_embedder import tokenize
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600"))
+RESULT_CACHE_SIMILARITY = float(os.getenv("RESULT_CACHE_SIMILARITY", "0.97"))
+
+
+def make_result_key(collection_name, query, filters, limit, reasoning_mode) -> str:
+    # The query's lexical terms are part of the key, so the near-duplicate match on
+    # the dense vector only applies between queries with the same terms: CLIP puts
+    # "POL-2023-14" and "POL-2023-15" next to each other, the lexical search does not.
+    normalized = filters.model_dump(exclude_none=True) if filters is not None else {}
+    if normalized.get("tags"):
+        normalized["tags"] = sorted(normalized["tags"])
+    terms = sorted(set(tokenize(query)))
+    return json.dumps([collection_name, terms, normalized, limit, reasoning_mode], sort_keys=True)
+
+
+class _Entry:
+    __slots__ = ("key", "vector", "response", "generation", "stored_at")
+
+    def __init__(self, key, vector, response, generation, stored_at):
+        self.key = key
+        self.vector = vector
+        self.response = response
+        self.generation = generation
+        self.stored_at = stored_at
+
+
+class SemanticResultCache:
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+                 similarity_threshold=RESULT_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.near_duplicate_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str, query_vector, generation: int):
+        if self.max_entries <= 0:
+            return None
+        query_vector = normalize(query_vector)
+        now = time.monotonic()
+        with self._lock:
+            ids = self._buckets.get(key, [])
+            for entry_id in list(ids):
+                entry = self._entries[entry_id]
+                if entry.generation != generation or now - entry.stored_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    self.invalidations += 1
+
+            ids = self._buckets.get(key)
+            if not ids:
+                self.misses += 1
+                return None
+
+            vectors = np.stack([self._entries[entry_id].vector for entry_id in ids])
+            scores = vectors @ query_vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            entry_id = ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            if scores[best] < 1.0 - 1e-6:
+                self.near_duplicate_hits += 1
+            return self._entries[entry_id].response
+
+    def put(self, key: str, query_vector, response, generation: int):
+        if self.max_entries <= 0:
+            return
+        entry = _Entry(key, normalize(query_vector), response, generation, time.monotonic())
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._buckets.setdefault(key, []).append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        ids = self._buckets[entry.key]
+        ids.remove(entry_id)
+        if not ids:
+            del self._buckets[entry.key]
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_duplicate_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_result_cache() -> SemanticResultCache:
+    global _cache
+    if _cache is None:
+        _cache = SemanticResultCache()
+    return _cache
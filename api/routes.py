@@ -1,9 +1,60 @@
-from fastapi import FastAPI, HTTPException
-from api.schemas import QueryRequest, QueryResponse, MemoryResponse, IngestRequest, UpdateMemoryRequest
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from api.schemas import QueryRequest, QueryResponse, BatchQueryRequest, BatchQueryResponse, MemoryResponse, IngestRequest, IngestJobRequest, UpdateMemoryRequest
 from memory.schema import QueryFilters
+from embeddings.scheduler import get_embedding_scheduler
 import traceback
+import asyncio
+import os
 
-app = FastAPI(title="Chronicle AI - Institutional Memory Agent API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await get_embedding_scheduler().start()
+    from api.startup import get_startup
+    startup = get_startup()
+    startup.register("reasoning", _warm_reasoning)
+    await startup.start()
+
+    from ingestion.worker import worker_mode, start_worker_processes, stop_worker_processes, start_inline_worker, start_spool_sweeper
+    mode = worker_mode()
+    workers = start_worker_processes() if mode == "process" else []
+    inline = start_inline_worker() if mode == "inline" else None
+    sweeper = start_spool_sweeper() if os.getenv("API_WORKER_INDEX", "0") == "0" else None
+    from memory.decay_update import DECAY_ENABLED, start_decay_jobs
+    # The default collection, named here so startup does not import the search stack.
+    # Under api/serve.py every worker flushes its own access counts, but only worker 0 refreshes.
+    decay = start_decay_jobs("memories", refresh=os.getenv("API_WORKER_INDEX", "0") == "0") if DECAY_ENABLED else None
+
+    yield
+
+    await startup.stop()
+    if sweeper is not None:
+        stop, task = sweeper
+        stop.set()
+        await asyncio.gather(task, return_exceptions=True)
+    if decay is not None:
+        stop, task = decay
+        stop.set()
+        # Lets the job write back the access stats still held in memory.
+        await asyncio.gather(task, return_exceptions=True)
+
+    if inline is not None:
+        stop, task = inline
+        stop.set()
+        # An item interrupted here is handed out again once its lease expires.
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    stop_worker_processes(workers)
+    from ingestion.extraction import shutdown_extraction_pool
+    shutdown_extraction_pool()
+    await get_embedding_scheduler().stop()
+    from qdrant.client import close_qdrant_clients
+    await close_qdrant_clients()
+    from embeddings.model_registry import unload_all
+    unload_all()
+
+app = FastAPI(title="Chronicle AI - Institutional Memory Agent API", lifespan=lifespan)
 
 _memory_manager = None
 _recommendation_engine = None
@@ -15,6 +66,12 @@ def get_memory_manager():
         _memory_manager = MemoryManager()
     return _memory_manager
 
+async def _warm_reasoning():
+    # Pulls in openai, qdrant_client and the reasoning modules off the event loop.
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, get_memory_manager)
+    await loop.run_in_executor(None, get_recommendation_engine)
+
 def get_recommendation_engine():
     global _recommendation_engine
     if _recommendation_engine is None:
@@ -30,8 +87,15 @@ async def root():
         "endpoints": {
             "GET /": "API information",
             "GET /health": "Health check",
+            "GET /ready": "Readiness: which components are warm (503 until all are)",
+            "GET /metrics": "Embedding scheduler, cache and Qdrant client metrics",
             "POST /query": "Query institutional memory",
-            "POST /ingest": "Ingest new document or image",
+            "POST /query/batch": "Run several queries in one embedding pass and one Qdrant round trip",
+            "POST /ingest": "Queue a new document or image for ingestion",
+            "POST /ingest/jobs": "Queue many documents or images as one ingestion job",
+            "POST /ingest/upload": "Upload a PDF, DOCX, text file or image for background ingestion",
+            "GET /ingest/jobs/{job_id}": "Status, progress and dead letters of an ingestion job",
+            "DELETE /ingest/jobs/{job_id}": "Cancel an ingestion job",
             "PUT /update/{memory_id}": "Update existing memory",
             "GET /docs": "Interactive API documentation"
         }
@@ -43,84 +107,241 @@ async def query_memories(request: QueryRequest):
         memory_manager = get_memory_manager()
         recommendation_engine = get_recommendation_engine()
 
-        filters = QueryFilters(**request.filters) if request.filters else QueryFilters()
+        filters = _query_filters(request)
 
-        if request.data_type and request.data_type != "both":
-            filters.type = request.data_type
+        from api.result_cache import get_result_cache, make_result_key
+        from qdrant.collections import get_collection_generation
+        from qdrant.search import embed_query_async
 
-        memories = memory_manager.retrieve_memories(
+        query_vector = await embed_query_async(request.query)
+        result_cache = get_result_cache()
+        cache_key = make_result_key(memory_manager.collection_name, request.query, filters,
+                                   request.limit, request.reasoning_mode)
+        # Captured before searching so a concurrent ingest invalidates this result.
+        generation = get_collection_generation(memory_manager.collection_name)
+        cached = result_cache.get(cache_key, query_vector, generation)
+        if cached is not None:
+            return cached.model_copy(update={"query": request.query})
+
+        memories = await memory_manager.retrieve_memories_async(
             request.query,
             filters,
-            request.limit
+            request.limit,
+            query_vector=query_vector
         )
 
-        if request.reasoning_mode == "recommendation":
-            reasoning = recommendation_engine.generate_recommendation(request.query, memories)
-        elif request.reasoning_mode == "comparison":
-            reasoning = f"Comparing retrieved memories: {len(memories)} items found."
-        else:
-            reasoning = f"Summary of {len(memories)} relevant memories."
-
-        summary = recommendation_engine.get_summary(request.query, memories)
-
-        memory_responses = [
-            MemoryResponse(
-                id=m.id,
-                text=getattr(m, 'text', None),
-                image_url=getattr(m, 'image_url', None),
-                department=m.department,
-                date=m.date,
-                outcome=m.outcome,
-                type=m.type,
-                location=m.location,
-                tags=getattr(m, 'tags', None)
-            ) for m in memories
-        ]
-
-        return QueryResponse(
-            query=request.query,
-            memories=memory_responses,
-            reasoning=reasoning,
-            summary=summary
-        )
+        reasoning, summary = await _reason(request, memories, recommendation_engine)
+        response = _query_response(request, memories, reasoning, summary)
+        result_cache.put(cache_key, query_vector, response, generation)
+        return response
 
     except Exception as e:
         import traceback
         print(f"Error in query: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/ingest")
-async def ingest_document(request: IngestRequest):
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def query_memories_batch(request: BatchQueryRequest):
     try:
-        from qdrant.ingest import ingest_single_document
+        memory_manager = get_memory_manager()
+        recommendation_engine = get_recommendation_engine()
 
-        metadata = {
-            "department": request.department,
-            "date": request.date,
-            "outcome": request.outcome,
-            "type": request.type,
-            "location": request.location,
-            "tags": request.tags,
-            "document_type": request.document_type,
-            "confidence": request.confidence,
-            "source": request.source,
-            "notes": request.notes,
-            "image_category": request.image_category,
-            "related_event": request.related_event
-        }
-        metadata = {k: v for k, v in metadata.items() if v is not None}
+        requests = request.queries
+        results = await memory_manager.retrieve_memories_batch_async(
+            [r.query for r in requests],
+            [_query_filters(r) for r in requests],
+            [r.limit for r in requests]
+        )
+
+        if request.include_reasoning:
+            sections = await asyncio.gather(*(
+                _reason(r, memories, recommendation_engine) for r, memories in zip(requests, results)
+            ))
+        else:
+            sections = [("", "")] * len(requests)
+
+        return BatchQueryResponse(results=[
+            _query_response(r, memories, reasoning, summary)
+            for r, memories, (reasoning, summary) in zip(requests, results, sections)
+        ])
+
+    except Exception as e:
+        import traceback
+        print(f"Error in batch query: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _query_filters(request: QueryRequest) -> QueryFilters:
+    filters = QueryFilters(**request.filters) if request.filters else QueryFilters()
+
+    if request.data_type and request.data_type != "both":
+        filters.type = request.data_type
+    return filters
+
+async def _reason(request: QueryRequest, memories, recommendation_engine):
+    if request.reasoning_mode == "recommendation":
+        return await recommendation_engine.generate_recommendation_with_summary_async(request.query, memories)
+
+    if request.reasoning_mode == "comparison":
+        reasoning = f"Comparing retrieved memories: {len(memories)} items found."
+    else:
+        reasoning = f"Summary of {len(memories)} relevant memories."
+    summary = await recommendation_engine.get_summary_async(request.query, memories)
+    return reasoning, summary
 
-        ingest_single_document(text=request.text or request.description, image_path=request.image_path, metadata=metadata)
-        return {"message": f"{request.type.capitalize()} ingested successfully"}
+def _query_response(request: QueryRequest, memories, reasoning: str, summary: str) -> QueryResponse:
+    memory_responses = [
+        MemoryResponse(
+            id=m.id,
+            text=getattr(m, 'text', None),
+            image_url=getattr(m, 'image_url', None),
+            department=m.department,
+            date=m.date,
+            outcome=m.outcome,
+            type=m.type,
+            location=m.location,
+            tags=getattr(m, 'tags', None),
+            snippet=getattr(m, 'snippet', False)
+        ) for m in memories
+    ]
+
+    return QueryResponse(
+        query=request.query,
+        memories=memory_responses,
+        reasoning=reasoning,
+        summary=summary
+    )
+
+@app.post("/ingest", status_code=202)
+async def ingest_document(request: IngestRequest):
+    try:
+        from ingestion.queue import get_job_queue
+
+        job_id = await _run_queue(get_job_queue().enqueue, "document", [_ingest_payload(request)])
+        return _job_accepted(job_id, f"{request.type.capitalize()} queued for ingestion")
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"Error in ingest: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/ingest/jobs", status_code=202)
+async def create_ingest_job(request: IngestJobRequest):
+    from ingestion.queue import get_job_queue, INGEST_MAX_ATTEMPTS
+
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items to ingest")
+    payloads = [_ingest_payload(item) for item in request.items]
+    job_id = await _run_queue(get_job_queue().enqueue, "document", payloads, request.max_attempts or INGEST_MAX_ATTEMPTS)
+    return _job_accepted(job_id, f"{len(payloads)} items queued for ingestion")
+
+UPLOAD_FIELDS = ("department", "date", "outcome", "location", "document_type", "confidence", "source",
+                 "notes", "description", "image_category", "related_event")
+
+@app.post("/ingest/upload", status_code=202)
+async def upload_document(request: Request):
+    from ingestion.uploads import spool_upload, UploadTooLarge, InvalidUpload, UPLOAD_MAX_BYTES
+    from ingestion.worker import is_supported
+    from ingestion.queue import get_job_queue
+
+    # Refuse oversized bodies before reading them; the spool enforces the limit
+    # on the bytes actually received as well.
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+        if content_length < 0:
+            raise ValueError(content_length)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+    if content_length > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {UPLOAD_MAX_BYTES} byte limit")
+
+    try:
+        spooled, form = await spool_upload(request.stream(), request.headers.get("content-type", ""),
+                                           expected_size=content_length, accept=is_supported)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    fields = {name: values[0] for name, values in form.items() if values and values[0]}
+    for field in ("department", "date"):
+        if not fields.get(field):
+            spooled.discard()
+            raise HTTPException(status_code=400, detail=f"Missing required field '{field}'")
+
+    metadata = {field: fields[field] for field in UPLOAD_FIELDS if field in fields}
+    tags = [tag.strip() for tag in form.get("tags", []) for tag in tag.split(",") if tag.strip()]
+    if tags:
+        metadata["tags"] = tags
+
+    try:
+        job_id = await _run_queue(get_job_queue().enqueue, "upload", [{
+            "upload": spooled.to_dict(),
+            "metadata": metadata,
+            "collection_name": get_memory_manager().collection_name
+        }])
+    except Exception:
+        # No job will ever read the file.
+        spooled.discard()
+        raise
+    return _job_accepted(job_id, f"{spooled.filename} queued for ingestion")
+
+@app.get("/ingest/jobs/{job_id}")
+async def ingest_job_status(job_id: str):
+    from ingestion.queue import get_job_queue
+
+    status = await _run_queue(get_job_queue().status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return status
+
+@app.delete("/ingest/jobs/{job_id}")
+async def cancel_ingest_job(job_id: str):
+    from ingestion.queue import get_job_queue
+
+    queue = get_job_queue()
+    if not await _run_queue(queue.cancel, job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return await _run_queue(queue.status, job_id)
+
+def _ingest_payload(request: IngestRequest) -> dict:
+    text = request.text or request.description
+    if (request.type == "text" and not text) or (request.type == "image" and not request.image_path):
+        raise HTTPException(status_code=400, detail="Invalid type or missing content")
+
+    metadata = {
+        "department": request.department,
+        "date": request.date,
+        "outcome": request.outcome,
+        "type": request.type,
+        "location": request.location,
+        "tags": request.tags,
+        "document_type": request.document_type,
+        "confidence": request.confidence,
+        "source": request.source,
+        "notes": request.notes,
+        "image_category": request.image_category,
+        "related_event": request.related_event
+    }
+    metadata = {k: v for k, v in metadata.items() if v is not None}
+    return {
+        "text": text,
+        "image_path": request.image_path,
+        "metadata": metadata,
+        "collection_name": get_memory_manager().collection_name
+    }
+
+async def _run_queue(fn, *args):
+    # JobQueue calls wait on SQLite's file lock, which the workers also hold.
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+def _job_accepted(job_id: str, message: str) -> dict:
+    return {"message": message, "job_id": job_id, "status": "queued", "status_url": f"/ingest/jobs/{job_id}"}
+
 @app.put("/update/{memory_id}")
 async def update_memory(memory_id: str, request: UpdateMemoryRequest):
     try:
-        from qdrant.ingest import update_memory_document
+        from qdrant.ingest import update_memory_document_async
 
         update_data = {
             "text": request.text,
@@ -136,7 +357,7 @@ async def update_memory(memory_id: str, request: UpdateMemoryRequest):
         }
         update_data = {k: v for k, v in update_data.items() if v is not None}
 
-        update_memory_document(memory_id, update_data)
+        await update_memory_document_async(memory_id, update_data)
         return {"message": f"Memory {memory_id} updated successfully"}
     except Exception as e:
         import traceback
@@ -145,4 +366,24 @@ async def update_memory(memory_id: str, request: UpdateMemoryRequest):
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness():
+    from api.startup import get_startup
+    status = get_startup().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    from embeddings.query_cache import get_query_cache
+    from api.result_cache import get_result_cache
+    from qdrant.client import qdrant_metrics
+    from qdrant.search import filter_index_metrics
+    return {
+        "embedding_scheduler": get_embedding_scheduler().metrics(),
+        "query_cache": get_query_cache().metrics(),
+        "result_cache": get_result_cache().metrics(),
+        "qdrant": qdrant_metrics(),
+        "payload_indexes": filter_index_metrics()
+    }
\ No newline at end of file
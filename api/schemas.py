@@ -1,6 +1,10 @@
+import os
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 
+# Queries accepted by one POST /query/batch request; longer batches get a 422.
+BATCH_QUERY_MAX_SIZE = int(os.getenv("BATCH_QUERY_MAX_SIZE", "64"))
+
 class QueryRequest(BaseModel):
     query: str
     filters: Optional[Dict[str, Any]] = None
@@ -21,6 +25,8 @@ class MemoryResponse(BaseModel):
     type: str  # "text" or "image"
     location: Optional[str] = None
     tags: Optional[List[str]] = None
+    # text is the best-matching chunk of a longer document, not the whole of it.
+    snippet: bool = False
 
 
 class QueryResponse(BaseModel):
@@ -30,6 +36,15 @@ class QueryResponse(BaseModel):
     summary: str
 
 
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest] = Field(..., max_length=BATCH_QUERY_MAX_SIZE)
+    include_reasoning: Optional[bool] = True
+
+
+class BatchQueryResponse(BaseModel):
+    results: List[QueryResponse]
+
+
 # -------------------------------
 # Ingestion Models
 # -------------------------------
@@ -57,6 +72,11 @@ class IngestRequest(BaseModel):
     related_event: Optional[str] = None
 
 
+class IngestJobRequest(BaseModel):
+    items: List[IngestRequest]
+    max_attempts: Optional[int] = None
+
+
 # -------------------------------
 # Memory Update Models
 # -------------------------------
@@ -0,0 +1,211 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import gc
+import signal
+import socket
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pre-forking server for production. The master loads the CLIP weights and the
+# app once, then forks API_WORKERS uvicorn workers that accept on one shared
+# socket; the weights stay shared copy-on-write (and page-cache backed with
+# CLIP_MMAP_WEIGHTS). api/main.py remains the single-process development server.
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# 0 derives the value from the core count: workers x torch threads = cores.
+API_WORKERS = int(os.getenv("API_WORKERS", "0"))
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "1"))
+API_GRACEFUL_TIMEOUT = float(os.getenv("API_GRACEFUL_TIMEOUT", "30"))
+API_BACKLOG = 2048
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_workers(workers, threads, reserved=0):
+    # One single-threaded worker per core scales best for many small queries;
+    # fewer workers with more threads suit large ingestion batches. Cores
+    # reserved for the ingestion worker processes are left out of the budget.
+    cores = available_cores()
+    budget = max(1, cores - reserved)
+    if workers <= 0:
+        workers = max(1, budget // max(threads, 1))
+    if threads <= 0:
+        threads = max(1, budget // workers)
+    if workers * threads + reserved > cores:
+        logger.warning(f"Serve - {workers} workers x {threads} threads plus {reserved} ingestion workers "
+                       f"oversubscribes {cores} cores")
+    return workers, threads
+
+
+def configure_threads(threads):
+    # Read by OpenMP/MKL, ONNX Runtime and the image preprocessing pool when they
+    # start, so this runs before torch is imported.
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ.setdefault("ORT_INTRA_OP_THREADS", str(threads))
+    os.environ.setdefault("IMAGE_PREPROCESS_WORKERS", str(threads))
+
+
+def preload():
+    # Weights and modules only: no inference may run before fork, because the
+    # OpenMP and ONNX Runtime thread pools do not survive it. Each worker's
+    # startup warmup does its dummy pass after the fork. The master itself stays
+    # single-threaded; run_worker sets each worker's thread count.
+    import torch
+
+    torch.set_num_threads(1)
+    torch.set_num_interop_threads(1)
+
+    from api.startup import STARTUP_WARMUP
+    from embeddings.model_registry import get_clip_model
+    for tower in ("text", "image"):
+        if tower in STARTUP_WARMUP:
+            get_clip_model(tower=tower)
+
+    from api.routes import app
+    import memory.memory_manager
+    import reasoning.recommendation
+
+    # Objects that exist now are left alone by the collector, so its bookkeeping
+    # writes do not copy the shared pages into every worker.
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def bind(host, port):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(API_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(index, app, sock, threads):
+    import torch
+    import uvicorn
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    os.environ["API_WORKER_INDEX"] = str(index)
+    torch.set_num_threads(threads)
+    # uvicorn installs its own SIGTERM/SIGINT handling and shuts down gracefully.
+    uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked workers sharing one copy of the model weights")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    parser.add_argument("--threads", type=int, default=TORCH_THREADS, help="torch threads per worker (0: cores / workers)")
+    args = parser.parse_args()
+
+    remote = "://" in os.getenv("QDRANT_URL", "./qdrant_storage")
+    # Read from the environment: importing ingestion.worker here would load torch
+    # before configure_threads.
+    ingest_processes = remote and os.getenv("INGEST_WORKER_MODE", "process") == "process"
+    reserved = int(os.getenv("INGEST_WORKERS", "2")) if ingest_processes else 0
+    workers, threads = plan_workers(args.workers, args.threads, reserved)
+    if workers > 1 and not remote:
+        # Embedded storage can only be opened by one process.
+        logger.warning("Serve - Local Qdrant storage supports one process; starting a single worker")
+        workers = 1
+    configure_threads(threads)
+
+    # Ingestion workers are started once here rather than by every API worker.
+    master_ingest = ingest_processes and workers > 1
+    if master_ingest:
+        os.environ["INGEST_WORKER_MODE"] = "external"
+
+    started = time.perf_counter()
+    app = preload()
+    sock = bind(args.host, args.port)
+    logger.info(f"Serve - Preloaded in {time.perf_counter() - started:.2f}s; "
+                f"{workers} workers x {threads} threads on {args.host}:{args.port}")
+
+    children = {}
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(index, app, sock, threads)
+            except BaseException:
+                logger.exception(f"Serve - Worker {index} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    for index in range(workers):
+        spawn(index)
+
+    ingest = []
+    if master_ingest:
+        from ingestion.worker import start_worker_processes
+        ingest = start_worker_processes()
+
+    stopping = False
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    # waitpid on our own children only: a bare os.wait() would also reap the
+    # multiprocessing ingestion workers behind their Process objects' backs.
+    while not stopping:
+        for pid, index in list(children.items()):
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                del children[pid]
+                logger.warning(f"Serve - Worker {index} (pid {pid}) exited with status {status}, restarting")
+                spawn(index)
+        time.sleep(0.5)
+
+    logger.info("Serve - Shutting down workers")
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + API_GRACEFUL_TIMEOUT
+    while children and time.monotonic() < deadline:
+        for pid in list(children):
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                del children[pid]
+        time.sleep(0.2)
+    for pid in children:
+        logger.warning(f"Serve - Worker pid {pid} did not stop in {API_GRACEFUL_TIMEOUT:g}s, killing it")
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    if ingest:
+        from ingestion.worker import stop_worker_processes
+        stop_worker_processes(ingest)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
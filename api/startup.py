@@ -0,0 +1,115 @@
+import os
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Components preloaded by the lifespan hook: text, image, qdrant, reasoning.
+STARTUP_WARMUP = [name.strip() for name in os.getenv("STARTUP_WARMUP", "text,qdrant,reasoning").split(",") if name.strip()]
+# Components whose failed warmup keeps /ready at 503; the others only log and load
+# lazily on first use. An unknown name in STARTUP_WARMUP always counts as failed.
+STARTUP_REQUIRED = [name.strip() for name in os.getenv("STARTUP_REQUIRED", "text,qdrant").split(",") if name.strip()]
+# Block startup until warm (true) or serve immediately and report progress on /ready (false).
+STARTUP_WARMUP_BLOCKING = os.getenv("STARTUP_WARMUP_BLOCKING", "false").lower() == "true"
+# Batch size of the dummy inference pass; the largest batch allocates the largest buffers.
+STARTUP_WARMUP_BATCH = int(os.getenv("STARTUP_WARMUP_BATCH", os.getenv("EMBED_MAX_BATCH_SIZE", "32")))
+
+
+class Startup:
+    def __init__(self, components=None, required=None):
+        self.components = list(STARTUP_WARMUP if components is None else components)
+        self.required = set(STARTUP_REQUIRED if required is None else required)
+        self._warmers = {}
+        self._status = {}
+        self._task = None
+        self.started_at = None
+
+    def register(self, name, warmer):
+        # warmer is a zero-argument coroutine function.
+        self._warmers[name] = warmer
+
+    async def start(self, blocking=STARTUP_WARMUP_BLOCKING):
+        self.started_at = time.monotonic()
+        for name in self.components:
+            self._status[name] = {"state": "pending"}
+        self._task = asyncio.create_task(self._run())
+        if blocking:
+            await self._task
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        # Sequential on purpose: the warmers compete for the same cores, and the
+        # order (embedder first) matches what the first query needs.
+        for name in self.components:
+            warmer = self._warmers.get(name)
+            if warmer is None:
+                self._status[name] = {"state": "failed", "error": "unknown component", "required": True}
+                logger.warning(f"Startup - Unknown warmup component '{name}'")
+                continue
+            self._status[name] = {"state": "warming"}
+            started = time.perf_counter()
+            try:
+                await warmer()
+            except Exception as e:
+                self._status[name] = {"state": "failed", "error": str(e), "seconds": time.perf_counter() - started}
+                logger.warning(f"Startup - Warming {name} failed: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            self._status[name] = {"state": "ready", "seconds": elapsed}
+            logger.info(f"Startup - {name} warm in {elapsed:.2f}s")
+        logger.info(f"Startup - Warmup finished in {time.monotonic() - self.started_at:.2f}s")
+
+    def ready(self) -> bool:
+        # Optional components that failed still load lazily on first use; a required
+        # one (or a misspelt name) keeps the instance out of rotation.
+        for name, status in self._status.items():
+            if status["state"] == "failed" and (name in self.required or status.get("required")):
+                return False
+            if status["state"] not in ("ready", "failed"):
+                return False
+        return True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready(),
+            "uptime_seconds": time.monotonic() - self.started_at if self.started_at else 0.0,
+            "components": dict(self._status),
+        }
+
+
+async def warm_text():
+    from embeddings.text_embedder import TextEmbedder
+    # Same model instance the scheduler's embedder uses, via the registry.
+    await _in_thread(lambda: TextEmbedder().warmup(STARTUP_WARMUP_BATCH))
+
+
+async def warm_image():
+    from embeddings.image_embedder import ImageEmbedder
+    await _in_thread(lambda: ImageEmbedder().warmup(STARTUP_WARMUP_BATCH))
+
+
+async def warm_qdrant():
+    from qdrant.client import run_qdrant
+    await run_qdrant("get_collections")
+
+
+async def _in_thread(fn):
+    return await asyncio.get_running_loop().run_in_executor(None, fn)
+
+
+_startup = None
+
+
+def get_startup() -> Startup:
+    global _startup
+    if _startup is None:
+        _startup = Startup()
+        _startup.register("text", warm_text)
+        _startup.register("image", warm_image)
+        _startup.register("qdrant", warm_qdrant)
+    return _startup
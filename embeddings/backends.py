@@ -0,0 +1,226 @@
+import os
+import logging
+import torch
+
+logger = logging.getLogger(__name__)
+
+# torch runs the open_clip model eagerly; the others run towers exported by
+# scripts/export_clip.py. onnx-int8 uses dynamically quantized weights.
+BACKENDS = ("torch", "torchscript", "onnx", "onnx-int8")
+CLIP_EXPORT_DIR = os.getenv("CLIP_EXPORT_DIR", "./models/clip")
+# 0 lets ONNX Runtime use one thread per physical core.
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+ONNX_OPSET = 17
+# Keep a plain state dict next to the exports and memory-map it, so worker
+# processes share the weight pages through the page cache.
+CLIP_MMAP_WEIGHTS = os.getenv("CLIP_MMAP_WEIGHTS", "true").lower() == "true"
+
+TOWERS = ("text", "image")
+# open_clip attributes owned by each tower (CustomTextCLIP keeps its text tower under "text").
+TOWER_ATTRS = {
+    "text": ("transformer", "token_embedding", "positional_embedding", "ln_final", "text_projection", "text"),
+    "image": ("visual",),
+}
+
+_SUFFIXES = {"torchscript": ".pt", "onnx": ".onnx", "onnx-int8": ".int8.onnx"}
+
+
+def export_path(model_name, pretrained, tower, backend, export_dir=None) -> str:
+    name = f"{model_name}-{pretrained}-{tower}".replace("/", "_")
+    return os.path.join(export_dir or CLIP_EXPORT_DIR, name + _SUFFIXES[backend])
+
+
+def weights_path(model_name, pretrained, export_dir=None) -> str:
+    name = f"{model_name}-{pretrained}".replace("/", "_")
+    return os.path.join(export_dir or CLIP_EXPORT_DIR, name + ".state_dict.pt")
+
+
+class _MissingTower(torch.nn.Module):
+    def __init__(self, tower):
+        super().__init__()
+        self.tower = tower
+
+    def forward(self, *args, **kwargs):
+        raise RuntimeError(f"CLIP {self.tower} tower is not loaded")
+
+
+def strip_towers(model, keep):
+    # Drops the other towers' weights; calling into them raises instead of
+    # silently computing garbage.
+    for tower, attrs in TOWER_ATTRS.items():
+        if tower in keep:
+            continue
+        for name in attrs:
+            if name in model._parameters:
+                setattr(model, name, None)
+            elif name in model._modules:
+                setattr(model, name, _MissingTower(tower))
+    return model
+
+
+def graft_tower(target, source, tower):
+    for name in TOWER_ATTRS[tower]:
+        if name in source._parameters or name in source._modules:
+            setattr(target, name, getattr(source, name))
+
+
+def load_torch_towers(model_name, pretrained, device, towers, export_dir=None):
+    # Returns (model, preprocess) with only the requested towers resident.
+    import open_clip
+
+    path = weights_path(model_name, pretrained, export_dir)
+    if CLIP_MMAP_WEIGHTS and device == "cpu" and os.path.exists(path):
+        try:
+            state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+            model = open_clip.create_model(model_name, pretrained=None, force_quick_gelu=pretrained == "openai")
+            strip_towers(model, towers)
+            wanted = model.state_dict().keys()
+            # assign=True keeps the mmapped tensors instead of copying them into fresh ones.
+            result = model.load_state_dict({k: v for k, v in state.items() if k in wanted}, strict=False, assign=True)
+            if result.missing_keys:
+                raise RuntimeError(f"{path} is missing {len(result.missing_keys)} weights; delete it to regenerate")
+            preprocess, _ = load_preprocessing(model_name, pretrained)
+            return model.eval(), preprocess
+        except TypeError:
+            # torch < 2.1 has neither mmap nor assign.
+            logger.warning("Clip Backends - This torch cannot memory-map weights, loading normally")
+
+    model, _, preprocess = open_clip.create_model_and_transforms(model_name, pretrained=pretrained, device=device)
+    if CLIP_MMAP_WEIGHTS and device == "cpu" and not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name so concurrent workers never map a partial file.
+        tmp = f"{path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), tmp)
+        os.replace(tmp, path)
+        logger.info(f"Clip Backends - Saved mmap-able weights to {path}")
+    return strip_towers(model, towers).eval(), preprocess
+
+
+class _TextTower(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, tokens):
+        return self.model.encode_text(tokens)
+
+
+class _ImageTower(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, images):
+        return self.model.encode_image(images)
+
+
+def _examples(clip):
+    size = clip.model.visual.image_size
+    size = size if isinstance(size, tuple) else (size, size)
+    return {
+        "text": (_TextTower(clip.model), clip.tokenizer(["a photo of a flooded road", "budget review"]), "tokens"),
+        "image": (_ImageTower(clip.model), torch.randn(2, 3, *size), "images"),
+    }
+
+
+def export(clip, backend, export_dir=None) -> list:
+    # clip must be a torch-backed ClipModel on CPU. Returns the written paths.
+    if backend not in _SUFFIXES:
+        raise ValueError(f"Nothing to export for backend '{backend}'")
+    os.makedirs(export_dir or CLIP_EXPORT_DIR, exist_ok=True)
+    written = []
+    for tower, (module, example, input_name) in _examples(clip).items():
+        path = export_path(clip.model_name, clip.pretrained, tower, backend, export_dir)
+        with torch.no_grad():
+            if backend == "torchscript":
+                torch.jit.save(torch.jit.trace(module, example), path)
+            else:
+                onnx_path = export_path(clip.model_name, clip.pretrained, tower, "onnx", export_dir)
+                torch.onnx.export(
+                    module, (example,), onnx_path, input_names=[input_name], output_names=["features"],
+                    dynamic_axes={input_name: {0: "batch"}, "features": {0: "batch"}},
+                    opset_version=ONNX_OPSET, do_constant_folding=True
+                )
+                if backend == "onnx-int8":
+                    _require_onnx()
+                    from onnxruntime.quantization import quantize_dynamic, QuantType
+                    quantize_dynamic(onnx_path, path, weight_type=QuantType.QInt8)
+        logger.info(f"Clip Backends - Exported {tower} tower to {path}")
+        written.append(path)
+    return written
+
+
+class TorchScriptEncoder:
+    def __init__(self, model_name, pretrained, device, export_dir=None):
+        self._paths = {tower: export_path(model_name, pretrained, tower, "torchscript", export_dir) for tower in ("text", "image")}
+        self._device = device
+        self._modules = {}
+
+    def _module(self, tower):
+        # Each tower is loaded on first use, so a text-only process never maps the vision weights.
+        if tower not in self._modules:
+            self._modules[tower] = torch.jit.load(self._paths[tower], map_location=self._device).eval()
+        return self._modules[tower]
+
+    def encode_text(self, tokens):
+        return self._module("text")(tokens)
+
+    def encode_image(self, images):
+        return self._module("image")(images)
+
+
+def _require_onnx():
+    # ONNX Runtime is optional (requirements-onnx.txt); only the onnx backends need it.
+    try:
+        import onnxruntime
+    except ImportError:
+        raise ImportError("The onnx backends need ONNX Runtime: pip install -r requirements-onnx.txt")
+    return onnxruntime
+
+
+class OnnxEncoder:
+    def __init__(self, model_name, pretrained, backend="onnx", export_dir=None):
+        self._paths = {tower: export_path(model_name, pretrained, tower, backend, export_dir) for tower in ("text", "image")}
+        self._sessions = {}
+
+    def _session(self, tower):
+        if tower not in self._sessions:
+            ort = _require_onnx()
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = ORT_INTRA_OP_THREADS
+            options.inter_op_num_threads = ORT_INTER_OP_THREADS
+            options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._sessions[tower] = ort.InferenceSession(self._paths[tower], options, providers=["CPUExecutionProvider"])
+        return self._sessions[tower]
+
+    def encode_text(self, tokens):
+        return self._session("text").run(None, {"tokens": tokens.cpu().numpy()})[0]
+
+    def encode_image(self, images):
+        return self._session("image").run(None, {"images": images.cpu().numpy()})[0]
+
+
+def load_encoder(backend, model_name, pretrained, device, export_dir=None):
+    for tower in ("text", "image"):
+        path = export_path(model_name, pretrained, tower, backend, export_dir)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run scripts/export_clip.py --backend {backend}")
+    if backend == "torchscript":
+        return TorchScriptEncoder(model_name, pretrained, device, export_dir)
+    if device != "cpu":
+        logger.warning(f"Clip Backends - {backend} runs on CPU only, ignoring device '{device}'")
+    return OnnxEncoder(model_name, pretrained, backend, export_dir)
+
+
+def load_preprocessing(model_name, pretrained):
+    # Tokenizer and image transforms come from the model config alone, so exported
+    # backends never load the PyTorch weights.
+    import open_clip
+
+    image_size = open_clip.get_model_config(model_name)["vision_cfg"]["image_size"]
+    cfg = open_clip.get_pretrained_cfg(model_name, pretrained)
+    preprocess = open_clip.image_transform(image_size, is_train=False, mean=cfg.get("mean"), std=cfg.get("std"))
+    return preprocess, open_clip.get_tokenizer(model_name)
@@ -0,0 +1,54 @@
+import os
+import re
+from functools import lru_cache
+
+# CLIP's context is 77 tokens including the start/end markers.
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "75"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "16"))
+
+_WORD = re.compile(r"\S+")
+
+
+@lru_cache(maxsize=1)
+def _bpe():
+    try:
+        from open_clip.tokenizer import SimpleTokenizer
+    except ImportError:
+        return None
+    return SimpleTokenizer()
+
+
+def chunk_text(text: str, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS) -> list:
+    return list(iter_chunks(text, max_tokens, overlap_tokens))
+
+
+def iter_chunks(text: str, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    # Windows are measured in CLIP BPE tokens but cut on word boundaries, so every
+    # chunk is a verbatim slice of the original text that fits the encoder.
+    bpe = _bpe()
+    words = []
+    for match in _WORD.finditer(text):
+        tokens = len(bpe.encode(match.group())) if bpe is not None else 1
+        words.append((match.start(), match.end(), tokens))
+    if not words:
+        return
+
+    start = 0
+    while start < len(words):
+        end = start
+        total = 0
+        # A single word longer than the window still becomes its own chunk.
+        while end < len(words) and (end == start or total + words[end][2] <= max_tokens):
+            total += words[end][2]
+            end += 1
+        yield text[words[start][0]:words[end - 1][1]]
+        if end == len(words):
+            return
+
+        # Step back far enough that the next window repeats ~overlap_tokens.
+        next_start = end
+        carried = 0
+        while next_start - 1 > start and carried + words[next_start - 1][2] <= overlap_tokens:
+            next_start -= 1
+            carried += words[next_start][2]
+        start = next_start
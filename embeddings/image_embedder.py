@@ -1,29 +1,93 @@
-import open_clip
 import torch
 from PIL import Image
 import os
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from embeddings.model_registry import get_clip_model, features_to_numpy
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PREPROCESS_WORKERS = int(os.getenv("IMAGE_PREPROCESS_WORKERS", str(os.cpu_count() or 4)))
+IMAGE_BATCH_SIZE = int(os.getenv("IMAGE_BATCH_SIZE", "32"))
+
+# PIL decoding/resizing and the tensor transforms release the GIL, so a thread
+# pool keeps every core busy without pickling images across processes.
+_preprocess_pool = None
+_pool_lock = threading.Lock()
+
+def _get_preprocess_pool():
+    global _preprocess_pool
+    if _preprocess_pool is None:
+        with _pool_lock:
+            if _preprocess_pool is None:
+                _preprocess_pool = ThreadPoolExecutor(max_workers=IMAGE_PREPROCESS_WORKERS, thread_name_prefix="image-preprocess")
+    return _preprocess_pool
 
 class ImageEmbedder:
-    def __init__(self, model_name='ViT-B-32', pretrained='openai'):
-        self.model, _, self.preprocess = open_clip.create_model_and_transforms(model_name, pretrained=pretrained)
-        self.tokenizer = open_clip.get_tokenizer(model_name)
+    def __init__(self, model_name=None, pretrained=None, device=None):
+        clip = get_clip_model(model_name, pretrained, device, tower="image")
+        self.model = clip.model
+        self.preprocess = clip.preprocess
+        self.device = clip.device
 
     def embed(self, image_path: str):
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image file not found: {image_path}")
-        image = self.preprocess(Image.open(image_path)).unsqueeze(0)
+        image = self._load(image_path).unsqueeze(0).to(self.device)
         with torch.no_grad():
             image_features = self.model.encode_image(image)
-            return image_features.squeeze().tolist()
+            return features_to_numpy(image_features)[0]
 
     def embed_batch(self, image_paths: list):
-        images = []
         for path in image_paths:
-            if os.path.exists(path):
-                images.append(self.preprocess(Image.open(path)))
-            else:
+            if not os.path.exists(path):
                 raise FileNotFoundError(f"Image file not found: {path}")
-        image_input = torch.stack(images)
+        images = list(_get_preprocess_pool().map(self._load, image_paths))
+        return self._encode(images)
+
+    def iter_embeddings(self, image_paths, batch_size=IMAGE_BATCH_SIZE):
+        # Yields (path, vector, error). Corrupt or missing files come back with
+        # vector=None and the error instead of aborting the run.
+        pool = _get_preprocess_pool()
+        window = batch_size + 2 * IMAGE_PREPROCESS_WORKERS
+        in_flight = deque()
+        paths = iter(image_paths)
+        ready = []
+
+        def refill():
+            while len(in_flight) < window:
+                path = next(paths, None)
+                if path is None:
+                    return
+                in_flight.append((path, pool.submit(self._load, path)))
+
+        refill()
+        while in_flight:
+            path, future = in_flight.popleft()
+            refill()
+            try:
+                ready.append((path, future.result()))
+            except Exception as e:
+                logger.warning(f"Image Embedder - Skipping {path}: {e}")
+                yield path, None, str(e)
+            if len(ready) >= batch_size or (not in_flight and ready):
+                vectors = self._encode([tensor for _, tensor in ready])
+                for (ready_path, _), vector in zip(ready, vectors):
+                    yield ready_path, vector, None
+                ready = []
+
+    def warmup(self, batch_size=1):
+        blank = self.preprocess(Image.new("RGB", (224, 224)))
+        self._encode([blank] * batch_size)
+
+    def _load(self, path):
+        with Image.open(path) as image:
+            return self.preprocess(image.convert("RGB"))
+
+    def _encode(self, images):
+        image_input = torch.stack(images).to(self.device)
         with torch.no_grad():
             image_features = self.model.encode_image(image_input)
-            return image_features.tolist()
+            return features_to_numpy(image_features)
\ No newline at end of file
@@ -0,0 +1,152 @@
+import os
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = os.getenv("CLIP_MODEL_NAME", "ViT-B-32")
+DEFAULT_PRETRAINED = os.getenv("CLIP_PRETRAINED", "openai")
+DEFAULT_DEVICE = os.getenv("CLIP_DEVICE", "cpu")
+# torch, torchscript, onnx or onnx-int8; see embeddings/backends.py.
+DEFAULT_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+
+
+class ClipModel:
+    # model is anything with encode_text/encode_image: the open_clip module itself
+    # or an encoder over exported towers.
+    def __init__(self, key, model, preprocess, tokenizer, backend="torch", towers=("text", "image")):
+        self.key = key
+        self.model = model
+        self.preprocess = preprocess
+        self.tokenizer = tokenizer
+        self.backend = backend
+        self.towers = set(towers)
+
+    @property
+    def model_name(self):
+        return self.key[0]
+
+    @property
+    def pretrained(self):
+        return self.key[1]
+
+    @property
+    def device(self):
+        return self.key[2]
+
+
+_models = {}
+_key_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _resolve_key(model_name=None, pretrained=None, device=None):
+    return (
+        model_name or DEFAULT_MODEL_NAME,
+        pretrained or DEFAULT_PRETRAINED,
+        device or DEFAULT_DEVICE,
+    )
+
+
+def model_identity(model_name=None, pretrained=None, backend=None) -> tuple:
+    # Device does not change the embedding space, so it is not part of the identity.
+    # The backend is: exported and quantized (onnx-int8) encoders produce slightly
+    # different vectors, so switching EMBED_BACKEND must invalidate cached query
+    # embeddings and re-embed manifest-tracked items.
+    return _resolve_key(model_name, pretrained)[:2] + (backend or DEFAULT_BACKEND,)
+
+
+def load_clip(model_name=None, pretrained=None, device=None, backend=None, export_dir=None, towers=("text", "image")) -> ClipModel:
+    # Uncached; get_clip_model is the shared entry point.
+    key = _resolve_key(model_name, pretrained, device)
+    model_name, pretrained, device = key
+    backend = backend or DEFAULT_BACKEND
+    if backend != "torch":
+        from embeddings.backends import load_encoder, load_preprocessing
+
+        # Exported towers are opened on first use, so every tower counts as available.
+        logger.info(f"Model Registry - Loading CLIP model {model_name} ({pretrained}) on {device} with {backend} backend")
+        preprocess, tokenizer = load_preprocessing(model_name, pretrained)
+        return ClipModel(key, load_encoder(backend, model_name, pretrained, device, export_dir), preprocess, tokenizer, backend)
+
+    import open_clip
+    from embeddings.backends import load_torch_towers
+
+    logger.info(f"Model Registry - Loading CLIP model {model_name} ({pretrained}) on {device}, towers: {', '.join(towers)}")
+    model, preprocess = load_torch_towers(model_name, pretrained, device, towers, export_dir)
+    return ClipModel(key, model, preprocess, open_clip.get_tokenizer(model_name), towers=towers)
+
+
+def _add_towers(entry, towers):
+    from embeddings.backends import graft_tower
+
+    addition = load_clip(*entry.key, backend=entry.backend, towers=towers)
+    for tower in towers:
+        graft_tower(entry.model, addition.model, tower)
+    entry.towers.update(towers)
+
+
+def get_clip_model(model_name=None, pretrained=None, device=None, tower=None) -> ClipModel:
+    # tower="text" or "image" loads just that tower; one entry per key is shared
+    # and gains the other tower only if something asks for it.
+    key = _resolve_key(model_name, pretrained, device)
+    towers = (tower,) if tower else ("text", "image")
+    entry = _models.get(key)
+    if entry is not None and entry.towers.issuperset(towers):
+        return entry
+
+    with _registry_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Per-key lock so loading one model never blocks lookups of another.
+    with key_lock:
+        entry = _models.get(key)
+        if entry is None:
+            entry = load_clip(*key, towers=towers)
+            _models[key] = entry
+        elif not entry.towers.issuperset(towers):
+            _add_towers(entry, [t for t in towers if t not in entry.towers])
+    return entry
+
+
+def features_to_numpy(features):
+    # CPU float32 features are exposed to numpy without a copy (only another
+    # device or dtype pays for one) and L2-normalized in place. ONNX Runtime
+    # already returns arrays.
+    from embeddings.similarity import normalize
+
+    if not isinstance(features, np.ndarray):
+        features = features.detach().cpu().float().numpy()
+    return normalize(features, copy=False)
+
+
+def is_loaded(model_name=None, pretrained=None, device=None) -> bool:
+    return _resolve_key(model_name, pretrained, device) in _models
+
+
+def loaded_models() -> list:
+    return list(_models.keys())
+
+
+def warmup(model_name=None, pretrained=None, device=None) -> ClipModel:
+    entry = get_clip_model(model_name, pretrained, device)
+    logger.info(f"Model Registry - Warm: {entry.key}")
+    return entry
+
+
+def unload(model_name=None, pretrained=None, device=None) -> bool:
+    key = _resolve_key(model_name, pretrained, device)
+    with _registry_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        entry = _models.pop(key, None)
+    if entry is None:
+        return False
+    logger.info(f"Model Registry - Unloaded: {key}")
+    return True
+
+
+def unload_all():
+    for key in loaded_models():
+        unload(*key)
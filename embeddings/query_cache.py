@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+import logging
+import tempfile
+from collections import OrderedDict
+import numpy as np
+from embeddings.similarity import normalize
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+QUERY_CACHE_SPILL_PATH = os.getenv("QUERY_CACHE_SPILL_PATH")
+QUERY_CACHE_SPILL_ENTRIES = int(os.getenv("QUERY_CACHE_SPILL_ENTRIES", "65536"))
+VECTOR_SIZE = 512
+
+
+def _normalize_key(text: str) -> str:
+    return " ".join(text.split())
+
+
+class _SpillFile:
+    # Ring buffer of float32 rows in a memory-mapped file. The index lives in
+    # memory, so the spill only extends capacity and does not survive restarts.
+    # path only names the location: every cache (one per API worker under
+    # api/serve.py, one per ingestion worker) maps its own unlinked file next to
+    # it, so caches never overwrite each other's rows.
+    def __init__(self, path, capacity, dim):
+        self.capacity = capacity
+        directory, name = os.path.split(os.path.abspath(path))
+        worker = os.getenv("API_WORKER_INDEX", "0")
+        self._file = tempfile.TemporaryFile(dir=directory, prefix=f"{name}.w{worker}.")
+        self._vectors = np.memmap(self._file, dtype=np.float32, mode="w+", shape=(capacity, dim))
+        self._index = {}
+        self._slots = [None] * capacity
+        self._next = 0
+
+    def put(self, key, vector, stored_at):
+        slot = self._index[key][0] if key in self._index else self._next
+        if key not in self._index:
+            self._next = (self._next + 1) % self.capacity
+            previous = self._slots[slot]
+            if previous is not None:
+                del self._index[previous]
+        self._vectors[slot] = vector
+        self._slots[slot] = key
+        self._index[key] = (slot, stored_at)
+
+    def pop(self, key):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return None, None
+        slot, stored_at = entry
+        self._slots[slot] = None
+        return np.array(self._vectors[slot]), stored_at
+
+    def clear(self):
+        self._index.clear()
+        self._slots = [None] * self.capacity
+
+    def __len__(self):
+        return len(self._index)
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES, ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+                 spill_path=QUERY_CACHE_SPILL_PATH, spill_entries=QUERY_CACHE_SPILL_ENTRIES, dim=VECTOR_SIZE):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_key = None
+        self._spill = _SpillFile(spill_path, spill_entries, dim) if spill_path and spill_entries > 0 else None
+
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, text: str, model_key):
+        if self.max_entries <= 0:
+            return None
+        key = _normalize_key(text)
+        now = time.monotonic()
+        with self._lock:
+            self._check_model(model_key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, stored_at = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+                self.expirations += 1
+
+            if self._spill is not None:
+                vector, stored_at = self._spill.pop(key)
+                if vector is not None:
+                    if now - stored_at <= self.ttl_seconds:
+                        vector.setflags(write=False)
+                        self._insert(key, vector, stored_at)
+                        self.hits += 1
+                        self.spill_hits += 1
+                        return vector
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector, model_key):
+        # Embedder output is already a unit float32 array; this is then a no-copy check.
+        vector = normalize(vector, copy=False)
+        vector.setflags(write=False)
+        if self.max_entries <= 0:
+            return vector
+        with self._lock:
+            self._check_model(model_key)
+            self._insert(_normalize_key(text), vector, time.monotonic())
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._spill is not None:
+                self._spill.clear()
+
+    def _insert(self, key, vector, stored_at):
+        self._entries[key] = (vector, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, (evicted_vector, evicted_at) = self._entries.popitem(last=False)
+            if self._spill is not None:
+                self._spill.put(evicted_key, evicted_vector, evicted_at)
+
+    def _check_model(self, model_key):
+        if model_key == self._model_key:
+            return
+        if self._model_key is not None:
+            logger.info(f"Query Cache - Model changed from {self._model_key} to {model_key}, invalidating")
+            self.invalidations += 1
+        self._entries.clear()
+        if self._spill is not None:
+            self._spill.clear()
+        self._model_key = model_key
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "spilled_entries": len(self._spill) if self._spill is not None else 0,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "spill_hits": self.spill_hits,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryEmbeddingCache()
+    return _cache
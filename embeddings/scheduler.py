@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class _Job:
+    __slots__ = ("kind", "item", "future", "enqueued_at")
+
+    def __init__(self, kind, item, future):
+        self.kind = kind
+        self.item = item
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingScheduler:
+    def __init__(self, window_ms=EMBED_BATCH_WINDOW_MS, max_batch_size=EMBED_MAX_BATCH_SIZE, executor=None):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue = None
+        self._worker = None
+        self._text_embedder = None
+        self._image_embedder = None
+
+        self._batches = 0
+        self._items = 0
+        self._failures = 0
+        self._histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._histogram["inf"] = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def start(self):
+        if self._worker is not None:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"Embedding Scheduler - Started (window={self.window * 1000:.1f}ms, max_batch={self.max_batch_size})")
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Embedding scheduler stopped"))
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("Embedding Scheduler - Stopped")
+
+    async def embed_text(self, text: str):
+        return await self._submit("text", text)
+
+    async def embed_text_batch(self, texts: list):
+        # Enqueued together, so they share forward passes of up to max_batch_size.
+        return await asyncio.gather(*(self._submit("text", text) for text in texts))
+
+    async def embed_image(self, image_path: str):
+        return await self._submit("image", image_path)
+
+    async def _submit(self, kind, item):
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Job(kind, item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        started = time.perf_counter()
+        groups = {}
+        for job in batch:
+            if job.future.cancelled():
+                continue
+            wait = started - job.enqueued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            groups.setdefault(job.kind, []).append(job)
+
+        loop = asyncio.get_running_loop()
+        for kind, jobs in groups.items():
+            self._record_batch(len(jobs))
+            items = [job.item for job in jobs]
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._embed_batch, kind, items)
+            except Exception:
+                # One bad input (e.g. a missing image) must not fail the whole batch.
+                await self._dispatch_individually(kind, jobs)
+                continue
+            for job, vector in zip(jobs, vectors):
+                if not job.future.done():
+                    job.future.set_result(vector)
+
+    async def _dispatch_individually(self, kind, jobs):
+        loop = asyncio.get_running_loop()
+        for job in jobs:
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._embed_batch, kind, [job.item])
+            except Exception as e:
+                self._failures += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                continue
+            if not job.future.done():
+                job.future.set_result(vectors[0])
+
+    def _embed_batch(self, kind, items):
+        if kind == "text":
+            if self._text_embedder is None:
+                from embeddings.text_embedder import TextEmbedder
+                self._text_embedder = TextEmbedder()
+            return self._text_embedder.embed_batch(items)
+        if self._image_embedder is None:
+            from embeddings.image_embedder import ImageEmbedder
+            self._image_embedder = ImageEmbedder()
+        return self._image_embedder.embed_batch(items)
+
+    def _record_batch(self, size):
+        self._batches += 1
+        self._items += size
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self._histogram[bucket] += 1
+                return
+        self._histogram["inf"] += 1
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "items": self._items,
+            "failures": self._failures,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "batch_size_histogram": {f"le_{k}": v for k, v in self._histogram.items()},
+            "avg_wait_ms": self._wait_total / self._items * 1000 if self._items else 0.0,
+            "max_wait_ms": self._wait_max * 1000,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+_scheduler = None
+
+
+def get_embedding_scheduler() -> EmbeddingScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = EmbeddingScheduler()
+    return _scheduler
@@ -0,0 +1,72 @@
+import numpy as np
+
+# Shared float32 similarity kernels. Inputs may be single vectors or row
+# matrices; outputs stay numpy arrays so callers can chain them without copies.
+
+
+def as_matrix(vectors) -> np.ndarray:
+    # No copy when the input is already a float32 array.
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+def normalize(vectors, copy=True) -> np.ndarray:
+    # Row-wise L2 normalization; zero rows are left as they are.
+    array = np.array(vectors, dtype=np.float32, copy=copy) if copy else np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(array, axis=-1, keepdims=True)
+    np.divide(array, norms, out=array, where=norms > 0)
+    return array
+
+
+def cosine_matrix(queries, corpus, normalized=False) -> np.ndarray:
+    # (n_queries, n_corpus) similarities; pass normalized=True to skip renormalizing.
+    queries, corpus = as_matrix(queries), as_matrix(corpus)
+    if not normalized:
+        queries, corpus = normalize(queries), normalize(corpus)
+    return queries @ corpus.T
+
+
+def cosine(a, b) -> float:
+    return float(cosine_matrix(a, b)[0, 0])
+
+
+def top_k(scores, k):
+    # Indices and scores of the k best entries along the last axis, best first.
+    # argpartition keeps this O(n) before sorting only the k survivors.
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        empty = scores[..., :0]
+        return empty.astype(np.intp), empty
+    indices = np.argpartition(-scores, k - 1, axis=-1)[..., :k] if k < n else np.broadcast_to(np.arange(n), scores.shape).copy()
+    values = np.take_along_axis(scores, indices, axis=-1)
+    order = np.argsort(-values, axis=-1, kind="stable")
+    return np.take_along_axis(indices, order, axis=-1), np.take_along_axis(values, order, axis=-1)
+
+
+def mmr(query, candidates, k, diversity=0.5, normalized=False, relevance=None) -> np.ndarray:
+    # Maximal marginal relevance: each pick maximizes
+    # (1 - diversity) * sim(query, c) - diversity * max sim(c, already picked).
+    # Precomputed relevance scores (e.g. re-ranked ones) replace sim(query, c), and
+    # query may then be None.
+    candidates = as_matrix(candidates)
+    if not normalized:
+        candidates = normalize(candidates)
+    k = min(k, len(candidates))
+    if relevance is None:
+        query = as_matrix(query)[0] if normalized else normalize(as_matrix(query)[0])
+        relevance = candidates @ query
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected = np.empty(k, dtype=np.intp)
+    for i in range(k):
+        penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+        marginal = np.where(available, (1 - diversity) * relevance - diversity * penalty, -np.inf)
+        pick = int(np.argmax(marginal))
+        selected[i] = pick
+        available[pick] = False
+        np.maximum(redundancy, candidates @ candidates[pick], out=redundancy)
+    return selected
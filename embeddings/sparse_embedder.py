@@ -0,0 +1,62 @@
+import os
+import re
+import zlib
+from collections import Counter
+
+# BM25 term-frequency saturation. The IDF half of BM25 is applied by Qdrant
+# (Modifier.IDF on the sparse vector), so only document-side weights live here.
+LEXICAL_K1 = float(os.getenv("LEXICAL_K1", "1.2"))
+LEXICAL_B = float(os.getenv("LEXICAL_B", "0.75"))
+LEXICAL_AVG_DOC_LENGTH = float(os.getenv("LEXICAL_AVG_DOC_LENGTH", "120"))
+
+# Keeps codes like "POL-2023-14" or "sec.4.2" whole; their parts are indexed too.
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+their this to was were which will with
+""".split())
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        parts = _PART.findall(token)
+        if len(parts) > 1:
+            tokens.append(token)
+        tokens.extend(part for part in parts if part not in _STOPWORDS)
+    return tokens
+
+
+def _term_index(term: str) -> int:
+    # Stable across processes, unlike hash(); collisions only merge rare terms.
+    return zlib.crc32(term.encode())
+
+
+class SparseEmbedder:
+    def __init__(self, k1=LEXICAL_K1, b=LEXICAL_B, avg_doc_length=LEXICAL_AVG_DOC_LENGTH):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    def embed(self, text: str):
+        tokens = tokenize(text)
+        norm = self.k1 * (1 - self.b + self.b * len(tokens) / self.avg_doc_length)
+        weights = {}
+        for term, tf in Counter(tokens).items():
+            index = _term_index(term)
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (tf + norm)
+        return _to_sparse(weights)
+
+    def embed_batch(self, texts: list):
+        return [self.embed(text) for text in texts]
+
+    def embed_query(self, text: str):
+        # Each distinct query term counts once; Qdrant supplies the IDF weighting.
+        return _to_sparse({_term_index(term): 1.0 for term in set(tokenize(text))})
+
+
+def _to_sparse(weights):
+    indices = sorted(weights)
+    return indices, [weights[index] for index in indices]
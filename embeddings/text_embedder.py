@@ -1,19 +1,26 @@
-import open_clip
 import torch
+from embeddings.model_registry import get_clip_model, features_to_numpy
 
 class TextEmbedder:
-    def __init__(self, model_name='ViT-B-32', pretrained='openai'):
-        self.model, _, _ = open_clip.create_model_and_transforms(model_name, pretrained=pretrained)
-        self.tokenizer = open_clip.get_tokenizer(model_name)
+    def __init__(self, model_name=None, pretrained=None, device=None):
+        clip = get_clip_model(model_name, pretrained, device, tower="text")
+        self.model = clip.model
+        self.tokenizer = clip.tokenizer
+        self.device = clip.device
 
     def embed(self, text: str):
-        text_input = self.tokenizer([text])
+        text_input = self.tokenizer([text]).to(self.device)
         with torch.no_grad():
             text_features = self.model.encode_text(text_input)
-            return text_features.squeeze().tolist()
+            return features_to_numpy(text_features)[0]
 
     def embed_batch(self, texts: list):
-        text_input = self.tokenizer(texts)
+        text_input = self.tokenizer(texts).to(self.device)
         with torch.no_grad():
             text_features = self.model.encode_text(text_input)
-            return text_features.tolist()
\ No newline at end of file
+            return features_to_numpy(text_features)
+
+    def warmup(self, batch_size=1):
+        # One throwaway forward pass so allocator pools and kernels are ready
+        # before the first real query.
+        self.embed_batch(["warmup"] * batch_size)
\ No newline at end of file
@@ -2,37 +2,95 @@ import streamlit as st
 import requests
 import json
 from PIL import Image
-import os
 from datetime import datetime
-from pypdf import PdfReader
-from docx import Document
-from io import BytesIO
-import re
-
-def extract_metadata_from_text(text):
-    metadata = {}
-
-    patterns = {
-        "department": r"Department:\s*(.*)",
-        "location": r"Location:\s*(.*)",
-        "outcome": r"Outcome:\s*(.*)",
-        "date": r"(Q[1-4]\s*\d{4})",
-        "document_type": r"(Policy|Report|Decision|Incident)"
-    }
-
-    for key, pattern in patterns.items():
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            metadata[key] = match.group(1).strip()
-
-    # Extract tags based on keywords
-    possible_tags = ["policy", "budget", "flood", "infrastructure", "emergency", "monitoring", "evacuation", "cybersecurity"]
-    metadata["tags"] = [tag for tag in possible_tags if tag in text.lower()]
-
-    return metadata
+import time
 
 API_BASE = "http://localhost:8000"
 
+# How long to follow an ingestion job, and the polling interval's start and cap.
+JOB_WAIT_SECONDS = 1800
+JOB_POLL_SECONDS = 0.5
+JOB_POLL_MAX_SECONDS = 5.0
+
+def upload_and_wait(uploaded_file, form_data, label):
+    # The API spools and extracts the file itself; this only streams the bytes.
+    try:
+        response = requests.post(
+            f"{API_BASE}/ingest/upload",
+            files={"file": (uploaded_file.name, uploaded_file, uploaded_file.type or "application/octet-stream")},
+            data={k: v for k, v in form_data.items() if v},
+            timeout=300
+        )
+    except requests.RequestException as e:
+        st.error(f"Connection error: {e}")
+        return
+    wait_for_job(response, label)
+
+def wait_for_job(response, label):
+    # Ingestion runs in the API's job queue; poll the job until it finishes, backing
+    # off while it runs and giving up after JOB_WAIT_SECONDS.
+    if response.status_code != 202:
+        st.error(f"Ingestion failed: {response.status_code} - {response.text}")
+        return
+
+    accepted = response.json()
+    job_id = accepted["job_id"]
+    job_url = f"{API_BASE}{accepted['status_url']}"
+    progress = st.progress(0.0, text=f"Processing {label}...")
+    deadline = time.monotonic() + JOB_WAIT_SECONDS
+    delay = JOB_POLL_SECONDS
+    error = None
+    while True:
+        # Connection errors and server errors are retried until the deadline.
+        job = None
+        try:
+            status = requests.get(job_url, timeout=10)
+            if status.status_code == 404:
+                progress.empty()
+                st.error(f"Ingestion job {job_id} no longer exists")
+                return
+            if status.status_code == 200:
+                job = status.json()
+            else:
+                error = f"{status.status_code} - {status.text}"
+        except requests.RequestException as e:
+            error = f"Connection error: {e}"
+
+        if job is not None:
+            error = None
+            for item in job["progress"].values():
+                if item.get("pages_total"):
+                    progress.progress(min(item["pages_done"] / item["pages_total"], 1.0),
+                                      text=f"Processing {label}: {item.get('chunks_done', 0)} chunks embedded")
+
+            memory_ids = ", ".join(result["memory_id"] for result in job["results"])
+            errors = "; ".join(dead["error"] for dead in job["dead_letters"])
+            if job["status"] == "completed":
+                progress.progress(1.0, text="Done")
+                st.success(f"{label.capitalize()} ingested successfully! Memory ID: {memory_ids}")
+                return
+            if job["status"] == "completed_with_errors":
+                progress.progress(1.0, text="Done")
+                st.warning(f"{label.capitalize()} partly ingested. Memory ID: {memory_ids}")
+                st.error(f"Failed items: {errors}")
+                return
+            if job["status"] == "failed":
+                progress.empty()
+                st.error(f"Ingestion failed: {errors or 'no item could be ingested'}")
+                return
+            if job["status"] == "cancelled":
+                progress.empty()
+                st.error(f"Ingestion of the {label} was cancelled")
+                return
+
+        if time.monotonic() + delay > deadline:
+            progress.empty()
+            reason = f" (last error: {error})" if error else ""
+            st.error(f"Still processing after {JOB_WAIT_SECONDS // 60} minutes; check job {job_id} later{reason}")
+            return
+        time.sleep(delay)
+        delay = min(delay * 2, JOB_POLL_MAX_SECONDS)
+
 st.title("Chronicle AI - Institutional Memory Agent")
 st.markdown("**Preserve institutional knowledge, learn from the past, and make evidence-based decisions.**")
 
@@ -147,62 +205,24 @@ elif page == "Add Institutional Memory":
         col1, col2 = st.columns(2)
 
         with col1:
-            # File uploader for document upload
-            uploaded_file = st.file_uploader("Upload Document (optional)", type=["txt", "md", "pdf", "docx"], help="Upload a text file to autofill the document text field")
-            
-            if uploaded_file is not None:
-                try:
-                    file_bytes = uploaded_file.read()
-                    file_extension = uploaded_file.name.split('.')[-1].lower()
-                    
-                    if file_extension in ['txt', 'md']:
-                        uploaded_text = file_bytes.decode('utf-8')
-                    elif file_extension == 'pdf':
-                        pdf_file = BytesIO(file_bytes)
-                        reader = PdfReader(pdf_file)
-                        uploaded_text = ""
-                        for page in reader.pages:
-                            uploaded_text += page.extract_text() + "\n"
-                    elif file_extension == 'docx':
-                        docx_file = BytesIO(file_bytes)
-                        doc = Document(docx_file)
-                        uploaded_text = "\n".join([para.text for para in doc.paragraphs])
-                    else:
-                        raise ValueError("Unsupported file type")
-                    
-                    st.session_state['document_text'] = uploaded_text
-                    auto_metadata = extract_metadata_from_text(uploaded_text)
-                    st.session_state['auto_metadata'] = auto_metadata
-                    st.success(f"Document '{uploaded_file.name}' uploaded successfully! Text extracted and ready for editing.")
-                except Exception as e:
-                    st.error(f"Error reading file: {str(e)}")
-            
-            document_text = st.text_area("Document Text", value=st.session_state.get('document_text', ''), height=200)
-            department_options = ["Emergency Management", "Finance", "Infrastructure", "Other"]
-            extracted_dept = st.session_state.get('auto_metadata', {}).get("department", "")
-            dept_index = department_options.index(extracted_dept) if extracted_dept in department_options else 0
-            department = st.selectbox("Department", department_options, index=dept_index)
+            # Uploaded documents are extracted and chunked by the API
+            uploaded_file = st.file_uploader("Upload Document (optional)", type=["txt", "md", "pdf", "docx"], help="Upload a document instead of pasting its text; blank metadata fields are filled from its opening pages")
+
+            document_text = st.text_area("Document Text", height=200, disabled=uploaded_file is not None)
+            department = st.selectbox("Department", ["Emergency Management", "Finance", "Infrastructure", "Other"])
 
         with col2:
             date = st.date_input("Date")
-            outcome_options = ["success", "failure", "mixed"]
-            extracted_outcome = st.session_state.get('auto_metadata', {}).get("outcome", "").lower()
-            outcome_index = outcome_options.index(extracted_outcome) if extracted_outcome in outcome_options else 0
-            outcome = st.selectbox("Outcome", outcome_options, index=outcome_index)
-            location = st.text_input("Location", value=st.session_state.get('auto_metadata', {}).get("location", ""))
+            outcome = st.selectbox("Outcome", ["success", "failure", "mixed"])
+            location = st.text_input("Location")
 
-        tags_options = ["policy", "budget", "flood", "infrastructure", "emergency", "monitoring", "evacuation", "cybersecurity"]
-        extracted_tags = st.session_state.get('auto_metadata', {}).get("tags", [])
-        tags_input = st.multiselect("Tags", tags_options, default=extracted_tags)
+        tags_input = st.multiselect("Tags", ["policy", "budget", "flood", "infrastructure", "emergency", "monitoring", "evacuation", "cybersecurity"])
 
         st.subheader("Optional Information")
         col3, col4 = st.columns(2)
 
         with col3:
-            document_type_options = ["", "Policy", "Report", "Decision", "Incident"]
-            extracted_doc_type = st.session_state.get('auto_metadata', {}).get("document_type", "")
-            doc_type_index = document_type_options.index(extracted_doc_type) if extracted_doc_type in document_type_options else 0
-            document_type = st.selectbox("Document Type", document_type_options, index=doc_type_index)
+            document_type = st.selectbox("Document Type", ["", "Policy", "Report", "Decision", "Incident"], index=0)
             confidence = st.selectbox("Confidence Level", ["", "low", "medium", "high"], index=0)
 
         with col4:
@@ -210,7 +230,19 @@ elif page == "Add Institutional Memory":
             notes = st.text_area("Notes (Internal)", height=100)
 
         if st.button("Ingest Text Document", type="primary"):
-            if document_text and department:
+            if uploaded_file is not None and department:
+                upload_and_wait(uploaded_file, {
+                    "department": department,
+                    "date": str(date),
+                    "outcome": outcome,
+                    "location": location,
+                    "tags": ",".join(tags_input),
+                    "document_type": document_type,
+                    "confidence": confidence,
+                    "source": source,
+                    "notes": notes
+                }, "document")
+            elif document_text and department:
                 tags = tags_input if tags_input else None
 
                 payload = {
@@ -228,17 +260,13 @@ elif page == "Add Institutional Memory":
                     "metadata_confidence": "auto-extracted"
                 }
 
-                with st.spinner("Ingesting text document..."):
-                    try:
-                        response = requests.post(f"{API_BASE}/ingest", json=payload)
-                        if response.status_code == 200:
-                            st.success("Text document ingested successfully!")
-                        else:
-                            st.error(f"Ingestion failed: {response.status_code} - {response.text}")
-                    except Exception as e:
-                        st.error(f"Connection error: {str(e)}")
+                try:
+                    response = requests.post(f"{API_BASE}/ingest", json=payload, timeout=30)
+                    wait_for_job(response, "text document")
+                except Exception as e:
+                    st.error(f"Connection error: {str(e)}")
             else:
-                st.warning("Please fill in the required fields (Document Text and Department)")
+                st.warning("Please fill in the required fields (Document Text or an uploaded document, and Department)")
 
     else:
         st.subheader("Required Information")
@@ -274,37 +302,19 @@ elif page == "Add Institutional Memory":
 
             if st.button("Ingest Image", type="primary"):
                 if image_description and department:
-                    temp_path = f"temp_{uploaded_file.name}"
-                    with open(temp_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-
-                    payload = {
-                        "type": "image",
-                        "image_path": temp_path,
+                    uploaded_file.seek(0)
+                    upload_and_wait(uploaded_file, {
                         "description": image_description,
                         "department": department,
                         "date": str(date),
                         "outcome": outcome,
-                        "location": location if location else None,
-                        "tags": tags_input if tags_input else None,
-                        "image_category": image_category if image_category else None,
-                        "related_event": related_event if related_event else None,
-                        "source": source if source else None,
-                        "notes": notes if notes else None
-                    }
-
-                    with st.spinner("Ingesting image..."):
-                        try:
-                            response = requests.post(f"{API_BASE}/ingest", json=payload)
-                            if response.status_code == 200:
-                                st.success("Image ingested successfully!")
-                            else:
-                                st.error(f"Ingestion failed: {response.status_code} - {response.text}")
-                        except Exception as e:
-                            st.error(f"Connection error: {str(e)}")
-                        finally:
-                            if os.path.exists(temp_path):
-                                os.remove(temp_path)
+                        "location": location,
+                        "tags": ",".join(tags_input),
+                        "image_category": image_category,
+                        "related_event": related_event,
+                        "source": source,
+                        "notes": notes
+                    }, "image")
                 else:
                     st.warning("Please provide an image description and select a department")
         else:
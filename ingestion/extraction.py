@@ -0,0 +1,116 @@
+import os
+import re
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+DOCUMENT_EXTENSIONS = ('.txt', '.md', '.pdf', '.docx')
+
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_PAGES_PER_TASK = int(os.getenv("EXTRACT_PAGES_PER_TASK", "8"))
+# Plain-text uploads are read in blocks of this many characters, cut at whitespace.
+TEXT_BLOCK_CHARS = 1 << 18
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    # pypdf is pure Python, so pages are extracted in worker processes rather than
+    # threads to keep extraction off the GIL the API and the embedder share.
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _pool
+
+
+def shutdown_extraction_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _pdf_page_count(path):
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _pdf_pages(path, start, stop):
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _docx_sections(path, paragraphs_per_section):
+    from docx import Document
+    paragraphs = [paragraph.text for paragraph in Document(path).paragraphs]
+    return ["\n".join(paragraphs[i:i + paragraphs_per_section]) for i in range(0, len(paragraphs), paragraphs_per_section)]
+
+
+async def iter_pages(path: str, extension: str, pages_per_task=EXTRACT_PAGES_PER_TASK):
+    # Yields (pages_done, pages_total, text) in document order. For PDFs up to two
+    # page ranges are extracted ahead, so extraction overlaps with whatever the
+    # consumer does with the previous range.
+    loop = asyncio.get_running_loop()
+    pool = get_extraction_pool()
+    extension = extension.lower()
+
+    if extension == '.pdf':
+        total = await loop.run_in_executor(pool, _pdf_page_count, path)
+        ranges = [(start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)]
+        pending = [loop.run_in_executor(pool, _pdf_pages, path, start, stop) for start, stop in ranges[:2]]
+        for i, (start, stop) in enumerate(ranges):
+            pages = await pending[i]
+            if i + 2 < len(ranges):
+                pending.append(loop.run_in_executor(pool, _pdf_pages, path, *ranges[i + 2]))
+            yield stop, total, "\n".join(pages)
+
+    elif extension == '.docx':
+        sections = await loop.run_in_executor(pool, _docx_sections, path, pages_per_task * 10)
+        for i, section in enumerate(sections):
+            yield i + 1, len(sections), section
+
+    elif extension in ('.txt', '.md'):
+        size = os.path.getsize(path)
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            carry = ""
+            done = 0
+            while True:
+                block = await loop.run_in_executor(None, f.read, TEXT_BLOCK_CHARS)
+                if not block:
+                    break
+                done += len(block)
+                block = carry + block
+                cut = max(block.rfind(" "), block.rfind("\n"))
+                carry, block = (block[cut:], block[:cut]) if cut > 0 else ("", block)
+                yield min(done, size), size, block
+            if carry:
+                yield size, size, carry
+
+    else:
+        raise ValueError(f"Unsupported document type: {extension}")
+
+
+_METADATA_PATTERNS = {
+    "department": r"Department:\s*(.*)",
+    "location": r"Location:\s*(.*)",
+    "outcome": r"Outcome:\s*(.*)",
+    "document_type": r"(Policy|Report|Decision|Incident)"
+}
+
+KNOWN_TAGS = ["policy", "budget", "flood", "infrastructure", "emergency", "monitoring", "evacuation", "cybersecurity"]
+
+
+def extract_metadata(text: str) -> dict:
+    # Moved from the frontend: best-effort metadata from the opening pages.
+    metadata = {}
+    for key, pattern in _METADATA_PATTERNS.items():
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            metadata[key] = match.group(1).strip()
+    metadata["tags"] = [tag for tag in KNOWN_TAGS if tag in text.lower()]
+    return metadata
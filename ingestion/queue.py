@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from collections import namedtuple
+
+INGEST_QUEUE_PATH = os.getenv("INGEST_QUEUE_PATH", "./ingest_queue.sqlite")
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_RETRY_BACKOFF = float(os.getenv("INGEST_RETRY_BACKOFF", "5"))
+# A running item whose worker has not finished it within the lease is assumed
+# lost (crashed or killed worker) and handed out again.
+INGEST_LEASE_SECONDS = float(os.getenv("INGEST_LEASE_SECONDS", "900"))
+
+QueueItem = namedtuple("QueueItem", ["job_id", "item_index", "kind", "payload", "attempts", "worker_id"])
+
+# Item states: queued -> running -> completed | queued (retry) | dead | cancelled.
+_TERMINAL = ("completed", "dead", "cancelled")
+# Matches an item only while the given worker still holds its lease.
+_OWNED = "WHERE job_id = ? AND item_index = ? AND status = 'running' AND claimed_by = ?"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    item_index INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at REAL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, item_index)
+);
+CREATE INDEX IF NOT EXISTS items_ready ON items (status, not_before);
+"""
+
+
+class JobQueue:
+    # Shared by the API (enqueue, status, cancel) and the worker processes (claim,
+    # progress, complete, fail); SQLite's file locking arbitrates between them.
+    def __init__(self, path=INGEST_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, kind: str, payloads: list, max_attempts=INGEST_MAX_ATTEMPTS) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._transaction():
+            self._conn.execute("INSERT INTO jobs (job_id, kind, created_at) VALUES (?, ?, ?)", (job_id, kind, now))
+            self._conn.executemany(
+                "INSERT INTO items (job_id, item_index, kind, payload, status, max_attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                [(job_id, i, kind, json.dumps(payload), max_attempts, now) for i, payload in enumerate(payloads)]
+            )
+        return job_id
+
+    def claim(self, worker_id: str):
+        now = time.time()
+        with self._lock, self._transaction():
+            # An expired lease counts as a failed attempt: requeued, or dead-lettered
+            # once the item has used up its attempts. No worker will finish a
+            # dead-lettered upload, so its spooled file is deleted here.
+            dead = self._conn.execute(
+                "SELECT kind, payload FROM items WHERE status = 'running' AND claimed_at < ? AND attempts >= max_attempts",
+                (now - INGEST_LEASE_SECONDS,)
+            ).fetchall()
+            self._conn.execute(
+                "UPDATE items SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END, "
+                "error = CASE WHEN attempts >= max_attempts THEN 'lease expired' ELSE error END, "
+                "claimed_by = NULL, updated_at = ? "
+                "WHERE status = 'running' AND claimed_at < ?", (now, now - INGEST_LEASE_SECONDS)
+            )
+            row = self._conn.execute(
+                "SELECT job_id, item_index, kind, payload, attempts FROM items "
+                "WHERE status = 'queued' AND not_before <= ? ORDER BY not_before, rowid LIMIT 1", (now,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE items SET status = 'running', attempts = attempts + 1, claimed_by = ?, claimed_at = ?, updated_at = ? "
+                    "WHERE job_id = ? AND item_index = ?", (worker_id, now, now, row[0], row[1])
+                )
+        _discard_spooled(dead)
+        if row is None:
+            return None
+        job_id, item_index, kind, payload, attempts = row
+        return QueueItem(job_id, item_index, kind, json.loads(payload), attempts + 1, worker_id)
+
+    # The methods below only touch an item while the caller still holds its lease:
+    # once it expired and another worker claimed the item, they match no row and
+    # return False ("lost" for fail), and the caller must drop its work.
+
+    def progress(self, item: QueueItem, progress: dict) -> bool:
+        # Also renews the lease, so long uploads are not handed to a second worker.
+        now = time.time()
+        return self._update(item, "progress = ?, claimed_at = ?", json.dumps(progress), now)
+
+    def renew(self, item: QueueItem) -> bool:
+        # Heartbeat for items that report no progress of their own.
+        return self._update(item, "claimed_at = ?", time.time())
+
+    def complete(self, item: QueueItem, result=None) -> bool:
+        return self._update(item, "status = 'completed', result = ?, error = NULL", json.dumps(result))
+
+    def fail(self, item: QueueItem, error: str) -> str:
+        # Retries with exponential backoff, then dead-letters the item.
+        with self._lock, self._transaction():
+            max_attempts = self._conn.execute(
+                "SELECT max_attempts FROM items WHERE job_id = ? AND item_index = ?", (item.job_id, item.item_index)
+            ).fetchone()[0]
+            status = "dead" if item.attempts >= max_attempts else "queued"
+            not_before = time.time() + INGEST_RETRY_BACKOFF * (2 ** (item.attempts - 1))
+            updated = self._conn.execute(
+                f"UPDATE items SET status = ?, error = ?, not_before = ?, claimed_by = NULL, updated_at = ? {_OWNED}",
+                (status, error, not_before, time.time(), item.job_id, item.item_index, item.worker_id)
+            ).rowcount
+        return status if updated else "lost"
+
+    def mark_cancelled(self, item: QueueItem) -> bool:
+        return self._update(item, "status = 'cancelled', error = ?", "cancelled")
+
+    def cancel(self, job_id: str) -> bool:
+        # Queued items are cancelled at once; running ones stop at their next
+        # progress check.
+        with self._lock, self._transaction():
+            found = self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,)).rowcount
+            queued = self._conn.execute(
+                "SELECT kind, payload FROM items WHERE job_id = ? AND status = 'queued'", (job_id,)
+            ).fetchall()
+            self._conn.execute(
+                "UPDATE items SET status = 'cancelled', updated_at = ? WHERE job_id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+        _discard_spooled(queued)
+        return bool(found)
+
+    def live_uploads(self) -> set:
+        # Spooled files that a queued or running item will still read.
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, payload FROM items WHERE status IN ('queued', 'running')"
+            ).fetchall()
+        return set(_spooled_paths(rows))
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def status(self, job_id: str):
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT kind, created_at, cancel_requested FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            items = self._conn.execute(
+                "SELECT item_index, status, attempts, progress, result, error, updated_at FROM items "
+                "WHERE job_id = ? ORDER BY item_index", (job_id,)
+            ).fetchall()
+
+        kind, created_at, cancel_requested = job
+        counts = {state: 0 for state in ("queued", "running") + _TERMINAL}
+        for _, state, *_ in items:
+            counts[state] += 1
+        return {
+            "job_id": job_id,
+            "kind": kind,
+            "status": _job_status(counts, len(items), cancel_requested),
+            "items": len(items),
+            "counts": counts,
+            "progress": {index: json.loads(progress) for index, state, _, progress, *_ in items if progress and state == "running"},
+            "results": [json.loads(result) for _, state, _, _, result, *_ in items if state == "completed" and result],
+            "dead_letters": [
+                {"item_index": index, "attempts": attempts, "error": error}
+                for index, state, attempts, _, _, error, _ in items if state == "dead"
+            ],
+            "created_at": created_at,
+            "updated_at": max((row[-1] for row in items), default=created_at),
+        }
+
+    def _update(self, item, assignment, *values) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                f"UPDATE items SET {assignment}, updated_at = ? {_OWNED}",
+                (*values, time.time(), item.job_id, item.item_index, item.worker_id)
+            ).rowcount == 1
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _spooled_paths(rows):
+    for kind, payload in rows:
+        if kind == "upload":
+            path = json.loads(payload).get("upload", {}).get("path")
+            if path:
+                yield path
+
+
+def _discard_spooled(rows):
+    # Deleted by path rather than through SpooledUpload, so the queue does not
+    # depend on the multipart parser.
+    for path in _spooled_paths(rows):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class _Transaction:
+    # BEGIN IMMEDIATE takes the write lock up front, so two processes can never
+    # claim the same item.
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _job_status(counts, total, cancel_requested):
+    if counts["running"]:
+        return "running"
+    if counts["queued"]:
+        return "cancelling" if cancel_requested else "queued"
+    if counts["cancelled"]:
+        return "cancelled"
+    if counts["dead"] == total:
+        return "failed"
+    if counts["dead"]:
+        return "completed_with_errors"
+    return "completed"
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
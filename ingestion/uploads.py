@@ -0,0 +1,206 @@
+import os
+import time
+import uuid
+import hashlib
+import tempfile
+from multipart.multipart import MultipartParser, parse_options_header
+from multipart.exceptions import MultipartParseError
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "chronicle_uploads"))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_DIR_MAX_BYTES = int(os.getenv("UPLOAD_DIR_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Uploaded images are referenced by image_url, so they are kept rather than spooled.
+UPLOAD_IMAGE_DIR = os.getenv("UPLOAD_IMAGE_DIR", "data/raw/images/uploads")
+# Cap on the form's text fields together; only the file part goes to disk.
+UPLOAD_MAX_FIELD_BYTES = 64 * 1024
+# Spooled files no queue item references are deleted once they are this old; the
+# age covers the moment between spooling an upload and enqueueing its job.
+UPLOAD_ORPHAN_SECONDS = float(os.getenv("UPLOAD_ORPHAN_SECONDS", "3600"))
+UPLOAD_SWEEP_SECONDS = float(os.getenv("UPLOAD_SWEEP_SECONDS", "600"))
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+def spool_usage() -> int:
+    # Spooled files are deleted once their job finishes, whichever process ran it,
+    # so the directory itself is the shared record of what is in use.
+    if not os.path.isdir(UPLOAD_DIR):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(UPLOAD_DIR) if entry.is_file())
+
+
+def sweep_spool(live_paths, min_age=UPLOAD_ORPHAN_SECONDS) -> int:
+    # Deletes spooled files left behind by a crashed request or worker, which would
+    # otherwise count against UPLOAD_DIR_MAX_BYTES forever.
+    if not os.path.isdir(UPLOAD_DIR):
+        return 0
+    live = {os.path.abspath(path) for path in live_paths}
+    cutoff = time.time() - min_age
+    removed = 0
+    for entry in os.scandir(UPLOAD_DIR):
+        if entry.is_file() and os.path.abspath(entry.path) not in live and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+class SpooledUpload:
+    def __init__(self, path, filename, size, digest):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.digest = digest
+
+    @property
+    def extension(self):
+        return os.path.splitext(self.filename)[1].lower()
+
+    def keep(self, directory=UPLOAD_IMAGE_DIR) -> str:
+        # Moves the file out of the spool for good and returns its new path; safe
+        # to repeat when a retried job already moved it.
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, f"{self.digest[:16]}{self.extension}")
+        if os.path.exists(self.path):
+            os.replace(self.path, target)
+        return target
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def to_dict(self) -> dict:
+        return {"path": self.path, "filename": self.filename, "size": self.size, "digest": self.digest}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["path"], data["filename"], data["size"], data["digest"])
+
+
+class _SpoolFile:
+    # Writes one file into the bounded spool directory, hashing as it goes and
+    # enforcing the per-file and spool-wide limits on every write.
+    def __init__(self, filename, max_bytes, expected_size):
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        self.used = spool_usage()
+        if self.used + expected_size > UPLOAD_DIR_MAX_BYTES:
+            raise UploadTooLarge(f"Upload spool is full ({self.used} of {UPLOAD_DIR_MAX_BYTES} bytes in use)")
+        self.filename = os.path.basename(filename or "upload")
+        self.path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}{os.path.splitext(self.filename)[1].lower()}")
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = open(self.path, "wb")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes or self.used + self.size > UPLOAD_DIR_MAX_BYTES:
+            raise UploadTooLarge(f"{self.filename} exceeds the upload limit or the free spool space")
+        self._file.write(data)
+        self._digest.update(data)
+
+    def finish(self) -> SpooledUpload:
+        self._file.close()
+        return SpooledUpload(self.path, self.filename, self.size, self._digest.hexdigest())
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+async def spool_upload(stream, content_type, max_bytes=UPLOAD_MAX_BYTES, expected_size=0, accept=None):
+    # Parses a multipart/form-data body as it arrives (an async iterable of bytes,
+    # e.g. request.stream()) and writes its single file part straight into the
+    # spool, so neither the body nor the file is ever buffered whole. Returns the
+    # spooled file and the text fields as {name: [values]}. accept(filename) may
+    # reject the file from its part headers, before any of it is written.
+    ctype, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if ctype != b"multipart/form-data" or not boundary:
+        raise InvalidUpload("Expected a multipart/form-data body")
+
+    fields = {}
+    state = {"headers": {}, "header": b"", "value": b"", "field": None, "data": [], "spool": None,
+             "spooled": None, "field_bytes": 0, "ended": False}
+
+    def on_header_field(data, start, end):
+        state["header"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header"].lower()] = state["value"]
+        state["header"] = state["value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition"))
+        name = disposition.get(b"name", b"").decode("latin-1")
+        filename = disposition.get(b"filename")
+        state["headers"] = {}
+        if filename is None:
+            state["field"] = name
+            return
+        if name != "file" or state["spool"] is not None or state["spooled"] is not None:
+            raise InvalidUpload("Expected exactly one file, in the 'file' part")
+        filename = filename.decode("utf-8", "replace")
+        if accept is not None and not accept(filename):
+            raise InvalidUpload(f"Unsupported file type: {filename}")
+        state["spool"] = _SpoolFile(filename, max_bytes, expected_size)
+
+    def on_part_data(data, start, end):
+        if state["spool"] is not None:
+            state["spool"].write(data[start:end])
+            return
+        state["field_bytes"] += end - start
+        if state["field_bytes"] > UPLOAD_MAX_FIELD_BYTES:
+            raise InvalidUpload(f"Form fields exceed {UPLOAD_MAX_FIELD_BYTES} bytes")
+        state["data"].append(data[start:end])
+
+    def on_part_end():
+        if state["spool"] is not None:
+            state["spooled"], state["spool"] = state["spool"].finish(), None
+        elif state["field"] is not None:
+            fields.setdefault(state["field"], []).append(b"".join(state["data"]).decode("utf-8", "replace"))
+        state["field"], state["data"] = None, []
+
+    def on_end():
+        state["ended"] = True
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field, "on_header_value": on_header_value, "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished, "on_part_data": on_part_data, "on_part_end": on_part_end,
+        "on_end": on_end,
+    })
+    try:
+        async for chunk in stream:
+            if chunk:
+                parser.write(chunk)
+        parser.finalize()
+        if not state["ended"]:
+            raise InvalidUpload("Incomplete multipart body")
+        if state["spooled"] is None:
+            raise InvalidUpload("Missing 'file' part")
+    except MultipartParseError as e:
+        _abort(state)
+        raise InvalidUpload(f"Malformed multipart body: {e}")
+    except BaseException:
+        _abort(state)
+        raise
+    return state["spooled"], fields
+
+
+def _abort(state):
+    if state["spool"] is not None:
+        state["spool"].abort()
+    if state["spooled"] is not None:
+        state["spooled"].discard()
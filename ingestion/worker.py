@@ -0,0 +1,248 @@
+import os
+import uuid
+import signal
+import asyncio
+import logging
+import multiprocessing
+from ingestion.extraction import iter_pages, extract_metadata, DOCUMENT_EXTENSIONS
+from ingestion.queue import JobQueue, get_job_queue, INGEST_LEASE_SECONDS
+from ingestion.uploads import SpooledUpload, sweep_spool, UPLOAD_SWEEP_SECONDS
+from qdrant.ingest import ingest_single_document_async, ingest_text_stream_async, IMAGE_EXTENSIONS
+from qdrant.collections import bump_collection_generation
+from qdrant.manifest import content_hash, stable_point_id
+from embeddings.scheduler import get_embedding_scheduler
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+# process: the API spawns INGEST_WORKERS worker processes; inline: one worker task
+# inside the API process; external: the API only enqueues (scripts/run_ingest_workers.py).
+INGEST_WORKER_MODE = os.getenv("INGEST_WORKER_MODE", "process")
+INGEST_POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "0.5"))
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class LeaseLost(Exception):
+    # The item's lease expired and it was handed to another worker, which now owns
+    # its status and spooled file.
+    pass
+
+
+def is_supported(filename: str) -> bool:
+    return os.path.splitext(filename)[1].lower() in DOCUMENT_EXTENSIONS + IMAGE_EXTENSIONS
+
+
+def worker_mode() -> str:
+    # Embedded Qdrant storage can only be opened by one process, so with a local
+    # path (or :memory:) ingestion has to run inside the API process.
+    if "://" not in os.getenv("QDRANT_URL", "./qdrant_storage") and INGEST_WORKER_MODE == "process":
+        return "inline"
+    return INGEST_WORKER_MODE
+
+
+async def run_worker(queue: JobQueue, worker_id: str, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    await get_embedding_scheduler().start()
+    logger.info(f"Ingest Worker - {worker_id} started")
+    while not stop.is_set():
+        item = await loop.run_in_executor(None, queue.claim, worker_id)
+        if item is None:
+            try:
+                await asyncio.wait_for(stop.wait(), INGEST_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        heartbeat = asyncio.create_task(_renew_lease(queue, item))
+        try:
+            result = await _HANDLERS[item.kind](queue, item)
+            if not await loop.run_in_executor(None, queue.complete, item, result):
+                raise LeaseLost()
+            # The writes bumped it already; this also covers results cached while
+            # the item was still being written.
+            await _in_thread(bump_collection_generation, item.payload.get("collection_name", "memories"))
+            logger.info(f"Ingest Worker - {worker_id} completed {item.kind} item {item.job_id}/{item.item_index}")
+        except LeaseLost:
+            logger.warning(f"Ingest Worker - {worker_id} lost the lease on {item.job_id}/{item.item_index}, result dropped")
+        except JobCancelled:
+            if await loop.run_in_executor(None, queue.mark_cancelled, item):
+                _discard_upload(item)
+                logger.info(f"Ingest Worker - {worker_id} cancelled {item.job_id}/{item.item_index}")
+            else:
+                logger.warning(f"Ingest Worker - {worker_id} lost the lease on {item.job_id}/{item.item_index}")
+        except Exception as e:
+            state = await loop.run_in_executor(None, queue.fail, item, str(e))
+            if state == "lost":
+                logger.warning(f"Ingest Worker - {worker_id} lost the lease on {item.job_id}/{item.item_index}: {e}")
+            else:
+                if state == "dead":
+                    _discard_upload(item)
+                logger.error(f"Ingest Worker - {item.job_id}/{item.item_index} failed (attempt {item.attempts}, now {state}): {e}")
+        finally:
+            heartbeat.cancel()
+    logger.info(f"Ingest Worker - {worker_id} stopped")
+
+
+async def _renew_lease(queue, item):
+    # Keeps the lease of a long-running item alive (a large text document reports
+    # no progress), so it is not handed to a second worker while this one is busy.
+    while True:
+        await asyncio.sleep(INGEST_LEASE_SECONDS / 3)
+        if not await _in_thread(queue.renew, item):
+            return
+
+
+async def _ingest_document_item(queue, item):
+    payload = item.payload
+    memory_id = await ingest_single_document_async(
+        text=payload.get("text"), image_path=payload.get("image_path"),
+        metadata=payload.get("metadata"), collection_name=payload.get("collection_name", "memories")
+    )
+    return {"memory_id": str(memory_id)}
+
+
+async def _ingest_upload_item(queue, item):
+    upload = SpooledUpload.from_dict(item.payload["upload"])
+    metadata = dict(item.payload["metadata"])
+    collection_name = item.payload.get("collection_name", "memories")
+    await _check_cancelled(queue, item)
+
+    if upload.extension in IMAGE_EXTENSIONS:
+        description = metadata.pop("description", None)
+        memory_id = await ingest_single_document_async(
+            text=description, image_path=upload.keep(),
+            metadata={**metadata, "type": "image"}, collection_name=collection_name
+        )
+        return {"memory_id": str(memory_id)}
+
+    progress = {"pages_done": 0, "pages_total": None, "chunks_done": 0}
+
+    async def report(**fields):
+        # Progress doubles as the cancellation check point.
+        progress.update(fields)
+        if not await _in_thread(queue.progress, item, dict(progress)):
+            raise LeaseLost()
+        await _check_cancelled(queue, item)
+
+    pages = iter_pages(upload.path, upload.extension)
+    try:
+        done, total, first = await pages.__anext__()
+    except StopAsyncIteration:
+        raise ValueError(f"{upload.filename} is empty")
+    await report(pages_done=done, pages_total=total)
+
+    # Fields the uploader left blank are filled from the opening pages.
+    for key, value in extract_metadata(first).items():
+        if value and not metadata.get(key):
+            metadata[key] = value
+
+    async def pieces():
+        yield first
+        async for done, total, text in pages:
+            await report(pages_done=done, pages_total=total)
+            yield text
+
+    parent_id = stable_point_id("upload", f"{upload.digest}:{content_hash(metadata)}")
+    memory_id = await ingest_text_stream_async(
+        pieces(), parent_id, {**metadata, "source_file": upload.filename},
+        collection_name=collection_name, progress=lambda count: report(chunks_done=count)
+    )
+    upload.discard()
+    return {"memory_id": str(memory_id), **progress}
+
+
+_HANDLERS = {
+    "document": _ingest_document_item,
+    "upload": _ingest_upload_item,
+}
+
+
+async def _check_cancelled(queue, item):
+    if await _in_thread(queue.is_cancelled, item.job_id):
+        raise JobCancelled()
+
+
+async def _in_thread(fn, *args):
+    # JobQueue calls block on SQLite's file lock, so they stay off the event loop.
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+def _discard_upload(item):
+    if item.kind == "upload":
+        SpooledUpload.from_dict(item.payload["upload"]).discard()
+
+
+async def run_spool_sweeper(queue: JobQueue, stop: asyncio.Event):
+    # Runs at startup and then periodically in one API process, deleting spooled
+    # uploads that no queued or running item references any more.
+    while not stop.is_set():
+        try:
+            live = await _in_thread(queue.live_uploads)
+            removed = await _in_thread(sweep_spool, live)
+            if removed:
+                logger.info(f"Ingest Worker - Removed {removed} orphaned spooled uploads")
+        except Exception as e:
+            logger.warning(f"Ingest Worker - Spool sweep failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), UPLOAD_SWEEP_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_spool_sweeper():
+    stop = asyncio.Event()
+    return stop, asyncio.create_task(run_spool_sweeper(get_job_queue(), stop))
+
+
+def worker_main(worker_id: str):
+    # Entry point of a worker process: it owns its own CLIP models, scheduler and
+    # Qdrant client, and exits cleanly on SIGTERM/SIGINT.
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        queue = JobQueue()
+        try:
+            await run_worker(queue, worker_id, stop)
+        finally:
+            await get_embedding_scheduler().stop()
+            from qdrant.client import close_qdrant_clients
+            await close_qdrant_clients()
+            queue.close()
+
+    asyncio.run(main())
+
+
+def start_worker_processes(count=INGEST_WORKERS) -> list:
+    # spawn, not fork: children must not inherit the API's event loop, threads or
+    # client connections.
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for i in range(count):
+        process = context.Process(target=worker_main, args=(f"worker-{i}-{uuid.uuid4().hex[:6]}",),
+                                  name=f"ingest-worker-{i}")
+        process.start()
+        processes.append(process)
+    logger.info(f"Ingest Worker - Started {count} worker processes")
+    return processes
+
+
+def stop_worker_processes(processes, timeout=30):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+
+
+def start_inline_worker():
+    stop = asyncio.Event()
+    task = asyncio.create_task(run_worker(get_job_queue(), f"inline-{uuid.uuid4().hex[:6]}", stop))
+    return stop, task
@@ -0,0 +1,252 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from datetime import date
+import numpy as np
+from qdrant_client.http import models
+from qdrant.client import run_qdrant
+from qdrant.collections import TEXT_VECTOR, IMAGE_VECTOR
+from embeddings.similarity import top_k, mmr
+
+logger = logging.getLogger(__name__)
+
+DECAY_ENABLED = os.getenv("DECAY_ENABLED", "true").lower() == "true"
+DECAY_HALF_LIFE_DAYS = float(os.getenv("DECAY_HALF_LIFE_DAYS", "365"))
+# Old memories fade towards this share of their relevance, never to zero.
+DECAY_FLOOR = float(os.getenv("DECAY_FLOOR", "0.4"))
+DECAY_ACCESS_BOOST = float(os.getenv("DECAY_ACCESS_BOOST", "0.05"))
+# Candidates fetched per requested result so re-ranking can promote from below the cut.
+DECAY_OVERFETCH = int(os.getenv("DECAY_OVERFETCH", "3"))
+# Relevance/novelty trade-off of the final pick (maximal marginal relevance over
+# the re-ranked candidates); 0 keeps the ranking as it is.
+RERANK_DIVERSITY = float(os.getenv("RERANK_DIVERSITY", "0"))
+DECAY_FLUSH_SECONDS = float(os.getenv("DECAY_FLUSH_SECONDS", "60"))
+DECAY_REFRESH_SECONDS = float(os.getenv("DECAY_REFRESH_SECONDS", "86400"))
+DECAY_SCROLL_BATCH = 1024
+ACCESS_FIELD_PREFIX = "access_count_w"
+
+
+def _parse_outcome_weights(spec):
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition(":")
+        if name.strip():
+            weights[name.strip()] = float(weight)
+    return weights
+
+
+DECAY_OUTCOME_WEIGHTS = _parse_outcome_weights(os.getenv("DECAY_OUTCOME_WEIGHTS", "success:1.0,mixed:0.9,failure:0.8"))
+
+
+def recency_weights(dates, today=None) -> np.ndarray:
+    today = np.datetime64(today or date.today(), "D")
+    parsed = np.array([_parse_date(value) for value in dates], dtype="datetime64[D]")
+    age = np.clip((today - parsed).astype("float64"), 0, None)
+    # Undated memories count as one half-life old.
+    age[np.isnat(parsed)] = DECAY_HALF_LIFE_DAYS
+    return DECAY_FLOOR + (1 - DECAY_FLOOR) * np.power(0.5, age / DECAY_HALF_LIFE_DAYS)
+
+
+def outcome_weights(outcomes) -> np.ndarray:
+    return np.array([DECAY_OUTCOME_WEIGHTS.get(outcome, 1.0) for outcome in outcomes], dtype=np.float64)
+
+
+def decay_weights(payloads, today=None) -> np.ndarray:
+    return recency_weights([p.get("date") for p in payloads], today) * outcome_weights([p.get("outcome") for p in payloads])
+
+
+def rerank(points, limit):
+    # One vectorized pass over the over-fetched candidates: similarity scaled by the
+    # stored decay weight (recomputed from date and outcome where the refresh job
+    # has not written one yet) and a log boost for frequently used memories.
+    if not DECAY_ENABLED or not points:
+        return points[:limit]
+    payloads = [point.payload or {} for point in points]
+    scores = np.array([point.score for point in points], dtype=np.float64)
+
+    stored = np.array([p.get("decay_weight", np.nan) for p in payloads], dtype=np.float64)
+    missing = np.isnan(stored)
+    if missing.any():
+        stored[missing] = decay_weights([p for p, m in zip(payloads, missing) if m])
+    access = np.array([access_count(p) for p in payloads], dtype=np.float64)
+
+    adjusted = scores * stored * (1 + DECAY_ACCESS_BOOST * np.log1p(access))
+    order, scores = top_k(adjusted, limit)
+    return [points[i].model_copy(update={"score": float(score)}) for i, score in zip(order, scores)]
+
+
+def access_count(payload) -> int:
+    # Each API worker keeps its own counter field (see flush_access_stats); the
+    # total is their sum plus the single counter written before workers existed.
+    return sum(value for key, value in payload.items()
+               if key == "access_count" or key.startswith(ACCESS_FIELD_PREFIX))
+
+
+def diversify(points, limit, diversity=RERANK_DIVERSITY):
+    # Picks limit of the re-ranked points, trading their score against similarity
+    # to the points already picked, so near-duplicates (e.g. several reports of
+    # one event) do not fill the results. Needs the points' dense vectors.
+    vectors = [_dense_vector(point) for point in points]
+    if diversity <= 0 or len(points) <= limit or any(vector is None for vector in vectors):
+        return points[:limit]
+    scores = np.array([point.score for point in points], dtype=np.float32)
+    # Scaled to [0, 1] so the scores weigh against the cosine redundancy term.
+    relevance = scores / scores.max() if scores.max() > 0 else scores
+    return [points[i] for i in mmr(None, vectors, limit, diversity, relevance=relevance)]
+
+
+def _dense_vector(point):
+    vector = point.vector
+    if isinstance(vector, dict):
+        vector = vector.get(TEXT_VECTOR) or vector.get(IMAGE_VECTOR)
+    return vector
+
+
+def candidate_limit(limit: int) -> int:
+    return limit * DECAY_OVERFETCH if DECAY_ENABLED or RERANK_DIVERSITY > 0 else limit
+
+
+def _parse_date(value):
+    try:
+        return np.datetime64(str(value)[:10], "D")
+    except (ValueError, TypeError):
+        return np.datetime64("NaT")
+
+
+class AccessTracker:
+    # Retrievals are counted in memory and written back in bulk by
+    # flush_access_stats, so queries never pay a write round trip.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._last = {}
+
+    def record(self, ids):
+        now = time.time()
+        with self._lock:
+            for point_id in map(int, ids):
+                self._counts[point_id] = self._counts.get(point_id, 0) + 1
+                self._last[point_id] = now
+
+    def drain(self):
+        with self._lock:
+            counts, last = self._counts, self._last
+            self._counts, self._last = {}, {}
+        return counts, last
+
+    def merge(self, counts, last):
+        # Puts back what a failed flush drained, so the next flush retries it.
+        with self._lock:
+            for point_id, count in counts.items():
+                self._counts[point_id] = self._counts.get(point_id, 0) + count
+                self._last[point_id] = max(self._last.get(point_id, 0.0), last[point_id])
+
+
+_tracker = AccessTracker()
+
+
+def get_access_tracker() -> AccessTracker:
+    return _tracker
+
+
+def _access_field():
+    # Read at flush time: api/serve.py sets the index in each worker after the fork.
+    return f"{ACCESS_FIELD_PREFIX}{os.getenv('API_WORKER_INDEX', '0')}"
+
+
+async def flush_access_stats(collection_name="memories") -> int:
+    # Every API worker adds to its own counter field, so the read-modify-write
+    # below never races another process; rerank sums the fields.
+    counts, last = get_access_tracker().drain()
+    if not counts:
+        return 0
+    ids = list(counts)
+    field = _access_field()
+    try:
+        points = await run_qdrant("retrieve", collection_name=collection_name, ids=ids,
+                                  with_payload=[field], with_vectors=False)
+        current = {point.id: (point.payload or {}).get(field, 0) for point in points}
+        operations = [
+            models.SetPayloadOperation(set_payload=models.SetPayload(
+                payload={field: current[point_id] + counts[point_id],
+                         "last_accessed": _isoformat(last[point_id])},
+                filter=_document_filter(point_id)
+            ))
+            for point_id in ids if point_id in current
+        ]
+        if operations:
+            await run_qdrant("batch_update_points", collection_name=collection_name, update_operations=operations)
+    except BaseException:
+        get_access_tracker().merge(counts, last)
+        raise
+    logger.info(f"Decay - Flushed access stats for {len(operations)} memories")
+    return len(operations)
+
+
+async def refresh_decay(collection_name="memories", today=None) -> int:
+    # Recomputes decay_weight for every point. Points that end up with the same
+    # (rounded) weight share one set_payload operation, and each scroll page is
+    # written with a single batch_update_points request.
+    refreshed = 0
+    offset = None
+    while True:
+        points, offset = await run_qdrant(
+            "scroll", collection_name=collection_name, limit=DECAY_SCROLL_BATCH, offset=offset,
+            with_payload=["date", "outcome", "decay_weight"], with_vectors=False
+        )
+        if points:
+            weights = np.round(decay_weights([point.payload or {} for point in points], today), 4)
+            groups = {}
+            for point, weight in zip(points, weights):
+                if (point.payload or {}).get("decay_weight") != float(weight):
+                    groups.setdefault(float(weight), []).append(point.id)
+            if groups:
+                await run_qdrant("batch_update_points", collection_name=collection_name, update_operations=[
+                    models.SetPayloadOperation(set_payload=models.SetPayload(payload={"decay_weight": weight}, points=ids))
+                    for weight, ids in groups.items()
+                ])
+                refreshed += sum(len(ids) for ids in groups.values())
+        if offset is None:
+            break
+    logger.info(f"Decay - Refreshed decay weights for {refreshed} memories in '{collection_name}'")
+    return refreshed
+
+
+async def run_decay_jobs(collection_name: str, stop: asyncio.Event, refresh=True):
+    # Background task in the API process: frequent access-stat flushes and an
+    # occasional full decay refresh. Neither bumps the collection generation, since
+    # ranking weights drifting slowly is not worth invalidating cached results.
+    # With several API workers only one needs to refresh; all of them flush.
+    last_refresh = 0.0
+    while not stop.is_set():
+        try:
+            await flush_access_stats(collection_name)
+            if refresh and time.monotonic() - last_refresh >= DECAY_REFRESH_SECONDS:
+                await refresh_decay(collection_name)
+                last_refresh = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Decay - Background update failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), DECAY_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    await flush_access_stats(collection_name)
+
+
+def start_decay_jobs(collection_name="memories", refresh=True):
+    stop = asyncio.Event()
+    return stop, asyncio.create_task(run_decay_jobs(collection_name, stop, refresh))
+
+
+def _document_filter(memory_id):
+    # Chunks carry the stats too, since any of them can stand in for the document.
+    return models.Filter(should=[
+        models.HasIdCondition(has_id=[memory_id]),
+        models.FieldCondition(key="parent_id", match=models.MatchValue(value=str(memory_id)))
+    ])
+
+
+def _isoformat(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
@@ -1,25 +1,58 @@
-from qdrant.search import search_memories, build_filter
+from qdrant.search import search_memories, search_memories_async, search_memories_batch, search_memories_batch_async, build_filter
 from memory.schema import MemoryItem, QueryFilters
+from memory.decay_update import rerank, diversify, candidate_limit, get_access_tracker, RERANK_DIVERSITY
 
 class MemoryManager:
     def __init__(self, collection_name="memories"):
         self.collection_name = collection_name
 
-    def retrieve_memories(self, query: str, filters: QueryFilters = None, limit=5):
-        qdrant_filter = None
-        if filters:
-            qdrant_filter = build_filter(
-                department=filters.department,
-                outcome=filters.outcome,
-                type_filter=filters.type,
-                location=filters.location,
-                date_from=filters.date_from,
-                date_to=filters.date_to,
-                tags=filters.tags
-            )
+    def retrieve_memories(self, query: str, filters: QueryFilters = None, limit=5, query_vector=None, hnsw_ef=None, exact=False):
+        qdrant_filter = self._build_filter(filters)
+        results = search_memories(query, self.collection_name, candidate_limit(limit), qdrant_filter, query_vector=query_vector, hnsw_ef=hnsw_ef, exact=exact, with_vectors=RERANK_DIVERSITY > 0)
+        return self._to_memories(self._rerank(results, limit))
+
+    async def retrieve_memories_async(self, query: str, filters: QueryFilters = None, limit=5, query_vector=None, hnsw_ef=None, exact=False):
+        qdrant_filter = self._build_filter(filters)
+        results = await search_memories_async(query, self.collection_name, candidate_limit(limit), qdrant_filter, query_vector=query_vector, hnsw_ef=hnsw_ef, exact=exact, with_vectors=RERANK_DIVERSITY > 0)
+        return self._to_memories(self._rerank(results, limit))
+
+    def retrieve_memories_batch(self, queries: list[str], filters: list[QueryFilters] = None, limits: list[int] = None, query_vectors=None, hnsw_ef=None, exact=False):
+        qdrant_filters = [self._build_filter(f) for f in filters] if filters else None
+        limits = limits if limits is not None else [5] * len(queries)
+        results = search_memories_batch(queries, self.collection_name, [candidate_limit(l) for l in limits], qdrant_filters, query_vectors=query_vectors, hnsw_ef=hnsw_ef, exact=exact, with_vectors=RERANK_DIVERSITY > 0)
+        return [self._to_memories(self._rerank(r, l)) for r, l in zip(results, limits)]
+
+    async def retrieve_memories_batch_async(self, queries: list[str], filters: list[QueryFilters] = None, limits: list[int] = None, query_vectors=None, hnsw_ef=None, exact=False):
+        qdrant_filters = [self._build_filter(f) for f in filters] if filters else None
+        limits = limits if limits is not None else [5] * len(queries)
+        results = await search_memories_batch_async(queries, self.collection_name, [candidate_limit(l) for l in limits], qdrant_filters, query_vectors=query_vectors, hnsw_ef=hnsw_ef, exact=exact, with_vectors=RERANK_DIVERSITY > 0)
+        return [self._to_memories(self._rerank(r, l)) for r, l in zip(results, limits)]
+
+    def _rerank(self, results, limit):
+        # Candidates are over-fetched in the same search request, so decay
+        # re-ranking costs no extra round trip; access stats are flushed later.
+        # With RERANK_DIVERSITY the final pick is diversified over all of them.
+        if RERANK_DIVERSITY > 0:
+            results = diversify(rerank(results, len(results)), limit)
+        else:
+            results = rerank(results, limit)
+        get_access_tracker().record(result.id for result in results)
+        return results
 
-        results = search_memories(query, self.collection_name, limit, qdrant_filter)
+    def _build_filter(self, filters: QueryFilters = None):
+        if not filters:
+            return None
+        return build_filter(
+            department=filters.department,
+            outcome=filters.outcome,
+            type_filter=filters.type,
+            location=filters.location,
+            date_from=filters.date_from,
+            date_to=filters.date_to,
+            tags=filters.tags
+        )
 
+    def _to_memories(self, results):
         memories = []
         for result in results:
             payload = result.payload
@@ -32,7 +65,8 @@ class MemoryManager:
                 outcome=payload.get('outcome', ''),
                 type=payload.get('type', ''),
                 location=payload.get('location'),
-                tags=payload.get('tags')
+                tags=payload.get('tags'),
+                snippet=payload.get('snippet', False)
             )
             memories.append(memory)
 
@@ -11,6 +11,7 @@ class MemoryItem(BaseModel):
     type: str
     location: Optional[str] = None
     tags: Optional[list[str]] = None
+    snippet: bool = False
 
 class QueryFilters(BaseModel):
     department: Optional[str] = None
@@ -1,11 +1,227 @@
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+import logging
 import os
 
-def get_qdrant_client():
-    url = os.getenv("QDRANT_URL", "./qdrant_storage")
+logger = logging.getLogger(__name__)
+
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
+QDRANT_RETRIES = int(os.getenv("QDRANT_RETRIES", "2"))
+QDRANT_RETRY_BACKOFF = float(os.getenv("QDRANT_RETRY_BACKOFF", "0.2"))
+QDRANT_KEEPALIVE_CONNECTIONS = int(os.getenv("QDRANT_KEEPALIVE_CONNECTIONS", "20"))
+QDRANT_KEEPALIVE_EXPIRY = float(os.getenv("QDRANT_KEEPALIVE_EXPIRY", "60"))
+
+_TRANSIENT_STATUS = {429, 502, 503, 504}
+_TRANSIENT_GRPC = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED"}
+
+_client = None
+_async_client = None
+_local_executor = None
+_client_lock = threading.Lock()
+
+
+class _ClientMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clients_created = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self._latency = {}
+
+    def record(self, method, elapsed, failed=False):
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.failures += 1
+            count, total = self._latency.get(method, (0, 0.0))
+            self._latency[method] = (count + 1, total + elapsed)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "mode": _mode(_url()),
+                "prefer_grpc": QDRANT_PREFER_GRPC,
+                "clients_created": self.clients_created,
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "avg_latency_ms": {method: total / count * 1000 for method, (count, total) in self._latency.items()},
+            }
+
+
+_metrics = _ClientMetrics()
+
+
+def _url():
+    return os.getenv("QDRANT_URL", "./qdrant_storage")
+
+
+def _mode(url):
     if url == ":memory:":
-        return QdrantClient(":memory:")
-    elif "://" in url:
-        return QdrantClient(url=url)
-    else:
-        return QdrantClient(path=url)
\ No newline at end of file
+        return "memory"
+    return "remote" if "://" in url else "local"
+
+
+def _is_transient(error):
+    if isinstance(error, ResponseHandlingException):
+        return True
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in _TRANSIENT_STATUS
+    code = getattr(error, "code", None)
+    if callable(code):
+        return getattr(code(), "name", None) in _TRANSIENT_GRPC
+    return False
+
+
+class _ManagedClient:
+    # Wraps one long-lived client so every call is timed and transient remote
+    # failures are retried; all other attributes pass straight through.
+    def __init__(self, client, retries):
+        self._client = client
+        self._retries = retries
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args, **kwargs):
+            for attempt in range(self._retries + 1):
+                started = time.perf_counter()
+                try:
+                    result = attr(*args, **kwargs)
+                except Exception as e:
+                    retry = attempt < self._retries and _is_transient(e)
+                    _metrics.record(name, time.perf_counter() - started, failed=not retry)
+                    if not retry:
+                        raise
+                    _metrics.record_retry()
+                    logger.warning(f"Qdrant Client - {name} failed ({e}), retrying")
+                    time.sleep(QDRANT_RETRY_BACKOFF * (2 ** attempt))
+                    continue
+                _metrics.record(name, time.perf_counter() - started)
+                return result
+        return call
+
+
+class _ManagedAsyncClient(_ManagedClient):
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not asyncio.iscoroutinefunction(attr) or name.startswith("_"):
+            return attr
+
+        async def call(*args, **kwargs):
+            for attempt in range(self._retries + 1):
+                started = time.perf_counter()
+                try:
+                    result = await attr(*args, **kwargs)
+                except Exception as e:
+                    retry = attempt < self._retries and _is_transient(e)
+                    _metrics.record(name, time.perf_counter() - started, failed=not retry)
+                    if not retry:
+                        raise
+                    _metrics.record_retry()
+                    logger.warning(f"Qdrant Client - {name} failed ({e}), retrying")
+                    await asyncio.sleep(QDRANT_RETRY_BACKOFF * (2 ** attempt))
+                    continue
+                _metrics.record(name, time.perf_counter() - started)
+                return result
+        return call
+
+
+def _remote_kwargs(url):
+    import httpx
+
+    return dict(
+        url=url,
+        api_key=os.getenv("QDRANT_API_KEY"),
+        prefer_grpc=QDRANT_PREFER_GRPC,
+        grpc_port=QDRANT_GRPC_PORT,
+        timeout=QDRANT_TIMEOUT,
+        grpc_options={"grpc.keepalive_time_ms": int(QDRANT_KEEPALIVE_EXPIRY * 1000)},
+        # Forwarded to the httpx client: keep connections warm between requests.
+        limits=httpx.Limits(max_keepalive_connections=QDRANT_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=QDRANT_KEEPALIVE_EXPIRY),
+    )
+
+
+def get_qdrant_client():
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            url = _url()
+            if url == ":memory:":
+                client = QdrantClient(":memory:")
+            elif "://" in url:
+                client = QdrantClient(**_remote_kwargs(url))
+            else:
+                client = QdrantClient(path=url)
+            _metrics.clients_created += 1
+            logger.info(f"Qdrant Client - Connected ({_mode(url)}: {url})")
+            _client = _ManagedClient(client, QDRANT_RETRIES if "://" in url else 0)
+    return _client
+
+
+def get_async_qdrant_client():
+    global _async_client
+    url = _url()
+    if "://" not in url:
+        # Local storage can only be opened by one client at a time.
+        return None
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _metrics.clients_created += 1
+                _async_client = _ManagedAsyncClient(AsyncQdrantClient(**_remote_kwargs(url)), QDRANT_RETRIES)
+    return _async_client
+
+
+async def run_qdrant(method: str, **kwargs):
+    global _local_executor
+    client = get_async_qdrant_client()
+    if client is not None:
+        return await getattr(client, method)(**kwargs)
+
+    # Embedded mode: serialize calls on one thread so the event loop stays free
+    # and the shared local client is never used concurrently.
+    if _local_executor is None:
+        _local_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qdrant-local")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_local_executor, lambda: getattr(get_qdrant_client(), method)(**kwargs))
+
+
+def qdrant_metrics() -> dict:
+    return _metrics.snapshot()
+
+
+def close_qdrant_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def close_qdrant_clients():
+    global _async_client, _local_executor
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _local_executor is not None:
+        _local_executor.shutdown(wait=True)
+        _local_executor = None
+    close_qdrant_client()
+    logger.info("Qdrant Client - Closed")
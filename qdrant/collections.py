@@ -1,16 +1,190 @@
 from qdrant_client.http import models
-from qdrant.client import get_qdrant_client
+from qdrant.client import get_qdrant_client, run_qdrant
+from qdrant.generations import get_generation_store
+import time
+import logging
+import os
 
-def create_memory_collection(collection_name="memories", vector_size=512):
+logger = logging.getLogger(__name__)
+
+# Fields build_filter() can filter on. Categorical fields get keyword indexes and
+# the ISO date gets a datetime index so range filters avoid payload scans.
+PAYLOAD_INDEXES = {
+    "department": models.PayloadSchemaType.KEYWORD,
+    "outcome": models.PayloadSchemaType.KEYWORD,
+    "type": models.PayloadSchemaType.KEYWORD,
+    "location": models.PayloadSchemaType.KEYWORD,
+    "tags": models.PayloadSchemaType.KEYWORD,
+    "date": models.PayloadSchemaType.DATETIME,
+    # Links chunk points to their document for aggregation, updates and deletes.
+    "parent_id": models.PayloadSchemaType.KEYWORD,
+}
+
+INDEXED_FIELDS_TTL_SECONDS = 60
+
+# Every point carries one CLIP vector per modality it has; both live in the same
+# embedding space, so a text query is scored against either.
+TEXT_VECTOR = "text"
+IMAGE_VECTOR = "image"
+VECTOR_NAMES = (TEXT_VECTOR, IMAGE_VECTOR)
+# BM25-style sparse vector over the memory text for exact terms (codes, place names)
+# that CLIP's 77-token encoder handles poorly.
+LEXICAL_VECTOR = "lexical"
+
+# Storage/recall trade-offs for the memories collection. Quantized vectors stay in
+# RAM for the HNSW traversal; the candidates are rescored against the originals,
+# fetching `oversampling` times the limit to recover the recall lost to quantization.
+COLLECTION_PROFILES = {
+    # Everything in RAM, denser graph, int8 vectors only to speed up scoring.
+    "latency": {
+        "hnsw": {"m": 32, "ef_construct": 200, "on_disk": False},
+        "quantization": "scalar",
+        "vectors_on_disk": False,
+        "payload_on_disk": False,
+        "hnsw_ef": 128,
+        "oversampling": 1.5,
+    },
+    # Originals on disk, int8 copies (4x smaller) in RAM.
+    "balanced": {
+        "hnsw": {"m": 16, "ef_construct": 100, "on_disk": False},
+        "quantization": "scalar",
+        "vectors_on_disk": True,
+        "payload_on_disk": False,
+        "hnsw_ef": 64,
+        "oversampling": 2.0,
+    },
+    # Originals, graph and payloads on disk; product-quantized copies (16x smaller) in RAM.
+    "memory-saver": {
+        "hnsw": {"m": 8, "ef_construct": 64, "on_disk": True},
+        "quantization": "product",
+        "vectors_on_disk": True,
+        "payload_on_disk": True,
+        "hnsw_ef": 64,
+        "oversampling": 3.0,
+    },
+}
+
+QDRANT_COLLECTION_PROFILE = os.getenv("QDRANT_COLLECTION_PROFILE", "balanced")
+
+def get_collection_profile(profile=None) -> dict:
+    profile = profile or QDRANT_COLLECTION_PROFILE
+    if profile not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile '{profile}', expected one of {sorted(COLLECTION_PROFILES)}")
+    return COLLECTION_PROFILES[profile]
+
+def _quantization_config(kind):
+    if kind == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    if kind == "product":
+        return models.ProductQuantization(
+            product=models.ProductQuantizationConfig(
+                compression=models.CompressionRatio.X16,
+                always_ram=True
+            )
+        )
+    return None
+
+def create_memory_collection(collection_name="memories", vector_size=512, profile=None):
+    settings = get_collection_profile(profile)
     client = get_qdrant_client()
     client.create_collection(
         collection_name=collection_name,
-        vectors_config=models.VectorParams(
-            size=vector_size,
-            distance=models.Distance.COSINE
+        vectors_config={
+            name: models.VectorParams(
+                size=vector_size,
+                distance=models.Distance.COSINE,
+                on_disk=settings["vectors_on_disk"]
+            )
+            for name in VECTOR_NAMES
+        },
+        sparse_vectors_config={
+            LEXICAL_VECTOR: models.SparseVectorParams(
+                index=models.SparseIndexParams(on_disk=settings["payload_on_disk"]),
+                modifier=models.Modifier.IDF
+            )
+        },
+        hnsw_config=models.HnswConfigDiff(**settings["hnsw"]),
+        quantization_config=_quantization_config(settings["quantization"]),
+        on_disk_payload=settings["payload_on_disk"]
+    )
+    logger.info(f"Qdrant Collections - Created '{collection_name}' with profile '{profile or QDRANT_COLLECTION_PROFILE}'")
+    ensure_payload_indexes(collection_name)
+
+def search_params(hnsw_ef=None, exact=False, profile=None):
+    settings = get_collection_profile(profile)
+    quantization = None
+    if settings["quantization"]:
+        quantization = models.QuantizationSearchParams(
+            rescore=True,
+            oversampling=settings["oversampling"]
         )
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef or settings["hnsw_ef"],
+        exact=exact,
+        quantization=quantization
     )
 
+def ensure_payload_indexes(collection_name="memories") -> list:
+    client = get_qdrant_client()
+    existing = client.get_collection(collection_name).payload_schema or {}
+
+    created = []
+    for field, schema in PAYLOAD_INDEXES.items():
+        current = existing.get(field)
+        if current is not None and current.data_type == schema:
+            continue
+        if current is not None:
+            client.delete_payload_index(collection_name=collection_name, field_name=field, wait=True)
+        client.create_payload_index(collection_name=collection_name, field_name=field, field_schema=schema, wait=True)
+        logger.info(f"Qdrant Collections - Created {schema.value} index on '{field}' in '{collection_name}'")
+        created.append(field)
+
+    _indexed_fields.pop(collection_name, None)
+    return created
+
+def get_indexed_fields(collection_name="memories") -> set:
+    cached = _cached_indexed_fields(collection_name)
+    if cached is not None:
+        return cached
+    info = get_qdrant_client().get_collection(collection_name)
+    return _store_indexed_fields(collection_name, info)
+
+async def get_indexed_fields_async(collection_name="memories") -> set:
+    cached = _cached_indexed_fields(collection_name)
+    if cached is not None:
+        return cached
+    info = await run_qdrant("get_collection", collection_name=collection_name)
+    return _store_indexed_fields(collection_name, info)
+
+_indexed_fields = {}
+
+def _cached_indexed_fields(collection_name):
+    cached = _indexed_fields.get(collection_name)
+    if cached is not None and time.monotonic() - cached[1] < INDEXED_FIELDS_TTL_SECONDS:
+        return cached[0]
+    return None
+
+def _store_indexed_fields(collection_name, info):
+    fields = set((info.payload_schema or {}).keys())
+    _indexed_fields[collection_name] = (fields, time.monotonic())
+    return fields
+
 def delete_collection(collection_name="memories"):
     client = get_qdrant_client()
-    client.delete_collection(collection_name=collection_name)
\ No newline at end of file
+    client.delete_collection(collection_name=collection_name)
+    bump_collection_generation(collection_name)
+
+# Bumped on every write so caches built on search results can detect staleness.
+# The counters live in SQLite, so writes from ingestion workers and other API
+# workers are observed too.
+def get_collection_generation(collection_name="memories") -> int:
+    return get_generation_store().get(collection_name)
+
+def bump_collection_generation(collection_name="memories") -> int:
+    return get_generation_store().bump(collection_name)
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import threading
+
+# Kept next to the job queue by default: the API workers and the ingestion worker
+# processes all open that file already.
+COLLECTION_GENERATIONS_PATH = os.getenv("COLLECTION_GENERATIONS_PATH",
+                                        os.getenv("INGEST_QUEUE_PATH", "./ingest_queue.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS collection_generations (
+    collection_name TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+class GenerationStore:
+    # Per-collection write counters shared by every process that writes to or
+    # caches results from Qdrant: a write in an ingestion worker or another API
+    # worker bumps the same row a cached query reads.
+    def __init__(self, path=COLLECTION_GENERATIONS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def get(self, collection_name: str) -> int:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT generation FROM collection_generations WHERE collection_name = ?", (collection_name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, collection_name: str) -> int:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO collection_generations (collection_name, generation) VALUES (?, 1) "
+                    "ON CONFLICT (collection_name) DO UPDATE SET generation = generation + 1", (collection_name,)
+                )
+                generation = conn.execute(
+                    "SELECT generation FROM collection_generations WHERE collection_name = ?", (collection_name,)
+                ).fetchone()[0]
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return generation
+
+    def _connection(self):
+        # A connection inherited across fork (api/serve.py) must not be reused, so
+        # each process opens its own.
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_generation_store() -> GenerationStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = GenerationStore()
+    return _store
\ No newline at end of file
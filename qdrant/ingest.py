@@ -1,153 +1,559 @@
-import json
 from qdrant_client.http import models
-from qdrant.client import get_qdrant_client
+from qdrant.client import get_qdrant_client, run_qdrant
+from qdrant.collections import bump_collection_generation, TEXT_VECTOR, IMAGE_VECTOR, LEXICAL_VECTOR
 from embeddings.text_embedder import TextEmbedder
 from embeddings.image_embedder import ImageEmbedder
+from embeddings.sparse_embedder import SparseEmbedder
+from embeddings.chunking import chunk_text
+from embeddings.scheduler import get_embedding_scheduler
+from qdrant.streaming import iter_json_records, batched
+from qdrant.manifest import IngestionManifest, INGEST_MANIFEST_PATH, content_hash, file_hash, stable_point_id
+from embeddings.model_registry import model_identity
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import hashlib
+import numpy as np
 import os
+import time
 from typing import Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "256"))
+
 def ingest_documents(documents_path="data/processed/documents.json",
                      metadata_path="data/processed/metadata.json",
-                     collection_name="memories"):
+                     collection_name="memories",
+                     batch_size=INGEST_BATCH_SIZE,
+                     upsert_batch_size=INGEST_UPSERT_BATCH_SIZE,
+                     manifest_path=INGEST_MANIFEST_PATH,
+                     force=False):
     embedder = TextEmbedder()
     client = get_qdrant_client()
 
-    with open(documents_path, 'r') as f:
-        documents = json.load(f)
+    documents = iter_json_records(documents_path)
+    if metadata_path:
+        records = zip(documents, iter_json_records(metadata_path))
+    else:
+        # JSONL corpora may carry metadata inline next to id/text.
+        records = ((doc, {k: v for k, v in doc.items() if k not in ("id", "text")}) for doc in documents)
 
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    manifest = IngestionManifest(manifest_path) if manifest_path else None
+    source = f"{collection_name}:{os.path.abspath(documents_path)}"
+    run_id = manifest.begin_run(source) if manifest else None
+    model_version = _model_version(lexical=True)
 
-    points = []
-    for doc, meta in zip(documents, metadata):
-        vector = embedder.embed(doc['text'])
-        payload = {**meta, "text": doc['text']}
-        points.append(
-            models.PointStruct(
-                id=int(doc['id']),
-                vector=vector,
-                payload=payload
-            )
-        )
+    started = time.perf_counter()
+    ingested = 0
+    unchanged = 0
+    buffer = []
+    pending = None
+
+    def upsert(entries):
+        client.upsert(collection_name=collection_name, points=[point for point, _ in entries])
+        bump_collection_generation(collection_name)
+        # Recorded only after the write succeeds, so an interrupted run resumes here.
+        if manifest:
+            manifest.record(source, run_id, model_version, [row for _, row in entries])
+        return len(entries)
+
+    # One upsert in flight at a time: batch N is written while batch N+1 is
+    # embedded, and memory stays bounded by a couple of chunks.
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-upsert") as upserter:
+        for batch in batched(records, batch_size):
+            keyed = [(str(doc['id']), content_hash(doc['text'], meta), doc, meta) for doc, meta in batch]
+            if manifest and not force:
+                known = manifest.lookup(source, [key for key, *_ in keyed])
+                current = {key for key, digest, _, _ in keyed if _is_current(known.get(key), digest, model_version)}
+                manifest.touch(source, run_id, current)
+                unchanged += len(current)
+                keyed = [item for item in keyed if item[0] not in current]
+            if not keyed:
+                continue
+
+            # One conversion for the whole batch matrix at the client boundary.
+            vectors = embedder.embed_batch([doc['text'] for _, _, doc, _ in keyed]).tolist()
+            for (key, digest, doc, meta), vector in zip(keyed, vectors):
+                point = models.PointStruct(
+                    id=int(doc['id']),
+                    vector={TEXT_VECTOR: vector, LEXICAL_VECTOR: _lexical_vector(doc['text'])},
+                    payload={**meta, "text": doc['text']}
+                )
+                buffer.append((point, (key, digest, None, point.id)))
+
+            while len(buffer) >= upsert_batch_size:
+                chunk, buffer = buffer[:upsert_batch_size], buffer[upsert_batch_size:]
+                if pending is not None:
+                    ingested += pending.result()
+                    _log_throughput(ingested, started)
+                pending = upserter.submit(upsert, chunk)
+
+        if pending is not None:
+            ingested += pending.result()
+        if buffer:
+            ingested += upsert(buffer)
+
+    removed = _finish_run(client, manifest, source, run_id, collection_name)
+
+    elapsed = time.perf_counter() - started
+    rate = ingested / elapsed if elapsed > 0 else 0.0
+    print(f"Ingested {ingested} documents into {collection_name} in {elapsed:.1f}s ({rate:.1f} docs/sec); "
+          f"{unchanged} unchanged, {removed} removed")
 
-    client.upsert(collection_name=collection_name, points=points)
-    print(f"Ingested {len(points)} documents into {collection_name}")
+def _model_version(lexical=False):
+    # Text points also carry the lexical vector: the suffix makes text stored before
+    # sparse vectors existed re-ingest once. Image points have no text, so their
+    # version is the CLIP model alone.
+    version = "/".join(model_identity())
+    return version + "+lexical" if lexical else version
 
-def ingest_single_document(text: Optional[str] = None, image_path: Optional[str] = None, metadata: Optional[dict] = None, collection_name="memories"):
-    if metadata is None:
-        metadata = {}
+def _wire_vectors(vectors):
+    # Embedders return float32 arrays; the client's point models take lists, so
+    # arrays are converted here, once, rather than anywhere upstream.
+    return {name: value.tolist() if isinstance(value, np.ndarray) else value for name, value in vectors.items()}
+
+def _lexical_vector(text):
+    indices, values = SparseEmbedder().embed(text)
+    return models.SparseVector(indices=indices, values=values)
+
+def _is_current(entry, digest, model_version):
+    return entry is not None and entry.content_hash == digest and entry.model_version == model_version
+
+def _finish_run(client, manifest, source, run_id, collection_name):
+    if not manifest:
+        return 0
+    # Anything recorded for this source but not seen in this run was deleted upstream.
+    stale = manifest.stale_point_ids(source, run_id)
+    for i in range(0, len(stale), INGEST_UPSERT_BATCH_SIZE):
+        client.delete(collection_name=collection_name,
+                      points_selector=models.PointIdsList(points=stale[i:i + INGEST_UPSERT_BATCH_SIZE]))
+    if stale:
+        bump_collection_generation(collection_name)
+    manifest.forget_stale(source, run_id)
+    manifest.complete_run(run_id)
+    manifest.close()
+    return len(stale)
+
+def _log_throughput(ingested, started, unit="docs"):
+    elapsed = time.perf_counter() - started
+    logger.info(f"Qdrant Ingest - {ingested} {unit} upserted, {ingested / elapsed if elapsed > 0 else 0.0:.1f} {unit}/sec")
+
+def ingest_single_document(text: Optional[str] = None, image_path: Optional[str] = None, metadata: Optional[dict] = None, collection_name="memories", vector=None):
     client = get_qdrant_client()
-    payload = metadata.copy()
+    payload = _prepare_payload(text, image_path, metadata)
+
+    chunks = _chunks_for(text, payload) if vector is None else None
+    if chunks:
+        parent_id = _document_id(text, {**payload, "text": text})
+        _ingest_chunks(client, parent_id, chunks, payload, collection_name)
+        return parent_id
+
+    if vector is None:
+        # Every modality the memory has gets its own named vector.
+        vector = {}
+        if text:
+            vector[TEXT_VECTOR] = TextEmbedder().embed(text)
+        if payload["type"] == "image":
+            vector[IMAGE_VECTOR] = ImageEmbedder().embed(image_path)
+
+    point = _build_point(text, image_path, payload, vector)
+    client.upsert(collection_name=collection_name, points=[point])
+    bump_collection_generation(collection_name)
+    _log_ingested(point, collection_name)
+    return point.id
+
+async def ingest_single_document_async(text: Optional[str] = None, image_path: Optional[str] = None, metadata: Optional[dict] = None, collection_name="memories", vector=None):
+    payload = _prepare_payload(text, image_path, metadata)
+
+    chunks = _chunks_for(text, payload) if vector is None else None
+    if chunks:
+        parent_id = _document_id(text, {**payload, "text": text})
+        await _ingest_chunks_async(parent_id, chunks, payload, collection_name)
+        return parent_id
+
+    if vector is None:
+        # Submitted together so both land in the same scheduler window.
+        scheduler = get_embedding_scheduler()
+        jobs = {}
+        if text:
+            jobs[TEXT_VECTOR] = scheduler.embed_text(text)
+        if payload["type"] == "image":
+            jobs[IMAGE_VECTOR] = scheduler.embed_image(image_path)
+        vector = dict(zip(jobs, await asyncio.gather(*jobs.values())))
+
+    point = _build_point(text, image_path, payload, vector)
+    await run_qdrant("upsert", collection_name=collection_name, points=[point])
+    bump_collection_generation(collection_name)
+    _log_ingested(point, collection_name)
+    return point.id
+
+def _prepare_payload(text, image_path, metadata):
+    payload = (metadata or {}).copy()
 
     # Ensure required fields exist
     payload["type"] = payload.get("type", "text" if text else "image")
     payload["outcome"] = payload.get("outcome", "success")
 
-    vector = None
-    if payload["type"] == "text" and text:
-        embedder = TextEmbedder()
-        vector = embedder.embed(text)
+    if not ((payload["type"] == "text" and text) or (payload["type"] == "image" and image_path)):
+        raise ValueError("Invalid type or missing content")
+    return payload
+
+def _build_point(text, image_path, payload, vector):
+    if not isinstance(vector, dict):
+        # A single precomputed vector belongs to the memory's primary modality.
+        vector = {TEXT_VECTOR if payload["type"] == "text" else IMAGE_VECTOR: vector}
+    if text and LEXICAL_VECTOR not in vector:
+        vector = {**vector, LEXICAL_VECTOR: _lexical_vector(text)}
+
+    if payload["type"] == "text":
         payload["text"] = text
-        logger.info(f"Qdrant Ingest - Text embedding created, dimensions: {len(vector)}")
-    elif payload["type"] == "image" and image_path:
-        embedder = ImageEmbedder()
-        vector = embedder.embed(image_path)
+    else:
         payload["image_url"] = image_path
         if text:
             payload["text"] = text
-        logger.info(f"Qdrant Ingest - Image embedding created, dimensions: {len(vector)}, file: {image_path}")
-    else:
-        raise ValueError("Invalid type or missing content")
+    for name in (TEXT_VECTOR, IMAGE_VECTOR):
+        if name in vector:
+            logger.info(f"Qdrant Ingest - {name.capitalize()} embedding created, dimensions: {len(vector[name])}")
 
-    content = text if text else image_path
-    content_hash = hashlib.md5((content + str(payload)).encode()).hexdigest()
-    doc_id = int(content_hash[:16], 16)
-
-    point = models.PointStruct(
-        id=doc_id,
-        vector=vector,
+    return models.PointStruct(
+        id=_document_id(text if text else image_path, payload),
+        vector=_wire_vectors(vector),
         payload=payload
     )
 
-    client.upsert(collection_name=collection_name, points=[point])
-    logger.info(f"Qdrant Ingest - Successfully stored {payload['type']} in collection '{collection_name}' with ID {doc_id}")
-    print(f"Ingested {payload['type']} into {collection_name} with ID {doc_id}")
+def _document_id(content, payload):
+    content_hash = hashlib.md5((content + str(payload)).encode()).hexdigest()
+    return int(content_hash[:16], 16)
+
+CHUNK_FIELDS = ("parent_id", "chunk_index", "chunk_count")
+
+def _chunks_for(text, payload):
+    # Only text memories are split; an image description rides on the image point.
+    if payload["type"] != "text":
+        return None
+    chunks = chunk_text(text)
+    return chunks if len(chunks) > 1 else None
+
+def _chunk_points(parent_id, payload, chunks, vectors, offset, total):
+    base = {k: v for k, v in payload.items() if k not in CHUNK_FIELDS}
+    return [
+        models.PointStruct(
+            # The first chunk keeps the document's own ID so the memory stays addressable by it.
+            id=parent_id if index == 0 else stable_point_id(str(parent_id), f"chunk-{index}"),
+            vector=_wire_vectors({TEXT_VECTOR: vector, LEXICAL_VECTOR: _lexical_vector(chunk)}),
+            payload={**base, "text": chunk, "parent_id": str(parent_id), "chunk_index": index,
+                     **({"chunk_count": total} if total is not None else {})}
+        )
+        for index, (chunk, vector) in enumerate(zip(chunks, vectors), start=offset)
+    ]
+
+def _ingest_chunks(client, parent_id, chunks, payload, collection_name):
+    # Chunks are embedded INGEST_BATCH_SIZE at a time and written in upsert-sized
+    # batches, so a long report costs a handful of round trips, not one per chunk.
+    embedder = TextEmbedder()
+    for offset in range(0, len(chunks), INGEST_UPSERT_BATCH_SIZE):
+        batch = chunks[offset:offset + INGEST_UPSERT_BATCH_SIZE]
+        vectors = []
+        for texts in batched(batch, INGEST_BATCH_SIZE):
+            vectors.extend(embedder.embed_batch(texts))
+        client.upsert(collection_name=collection_name,
+                      points=_chunk_points(parent_id, payload, batch, vectors, offset, len(chunks)))
+    bump_collection_generation(collection_name)
+    _log_chunked(parent_id, len(chunks), collection_name)
+
+async def _ingest_chunks_async(parent_id, chunks, payload, collection_name):
+    scheduler = get_embedding_scheduler()
+    for offset in range(0, len(chunks), INGEST_UPSERT_BATCH_SIZE):
+        batch = chunks[offset:offset + INGEST_UPSERT_BATCH_SIZE]
+        vectors = await scheduler.embed_text_batch(batch)
+        await run_qdrant("upsert", collection_name=collection_name,
+                         points=_chunk_points(parent_id, payload, batch, vectors, offset, len(chunks)))
+    bump_collection_generation(collection_name)
+    _log_chunked(parent_id, len(chunks), collection_name)
+
+async def ingest_text_stream_async(pieces, parent_id, metadata: Optional[dict] = None, collection_name="memories", progress=None):
+    # Ingests a text document that arrives piece by piece (e.g. extracted page
+    # ranges) as chunk points. Each piece is chunked together with the tail carried
+    # over from the previous one, and full upsert batches are embedded and written
+    # while the producer is already working on the next piece. progress, if given,
+    # is an async callable awaited with the number of chunks written so far.
+    payload = {**(metadata or {}), "type": "text"}
+    payload["outcome"] = payload.get("outcome", "success")
+    scheduler = get_embedding_scheduler()
+    loop = asyncio.get_running_loop()
+
+    # A re-upload replaces the previous chunks of the same document.
+    await run_qdrant("delete", collection_name=collection_name, points_selector=_document_selector(parent_id))
+
+    written = 0
+    pending = []
+    carry = ""
+
+    async def write(batch):
+        nonlocal written
+        vectors = await scheduler.embed_text_batch(batch)
+        await run_qdrant("upsert", collection_name=collection_name,
+                         points=_chunk_points(parent_id, payload, batch, vectors, written, None))
+        bump_collection_generation(collection_name)
+        written += len(batch)
+        if progress is not None:
+            await progress(written)
+
+    async for piece in pieces:
+        chunks = await loop.run_in_executor(None, chunk_text, f"{carry}\n{piece}" if carry else piece)
+        if not chunks:
+            continue
+        carry = chunks.pop()
+        pending.extend(chunks)
+        while len(pending) >= INGEST_UPSERT_BATCH_SIZE:
+            batch, pending = pending[:INGEST_UPSERT_BATCH_SIZE], pending[INGEST_UPSERT_BATCH_SIZE:]
+            await write(batch)
+
+    if carry:
+        pending.append(carry)
+    if pending:
+        await write(pending)
+    if not written:
+        raise ValueError("No text could be extracted from the document")
+
+    await run_qdrant("set_payload", collection_name=collection_name, payload={"chunk_count": written},
+                     points=_document_selector(parent_id))
+    _log_chunked(parent_id, written, collection_name)
+    return parent_id
+
+def _document_selector(memory_id):
+    # The document's own point plus every chunk that points back at it.
+    return models.FilterSelector(filter=models.Filter(should=[
+        models.HasIdCondition(has_id=[int(memory_id)]),
+        models.FieldCondition(key="parent_id", match=models.MatchValue(value=str(memory_id)))
+    ]))
+
+def _log_chunked(parent_id, count, collection_name):
+    logger.info(f"Qdrant Ingest - Stored {count} chunks for document {parent_id} in collection '{collection_name}'")
+    print(f"Ingested text into {collection_name} with ID {parent_id} ({count} chunks)")
+
+def _log_ingested(point, collection_name):
+    logger.info(f"Qdrant Ingest - Successfully stored {point.payload['type']} in collection '{collection_name}' with ID {point.id}")
+    print(f"Ingested {point.payload['type']} into {collection_name} with ID {point.id}")
 
 def update_memory_document(memory_id: str, update_data: dict, collection_name="memories"):
     client = get_qdrant_client()
 
     try:
-        existing_points = client.retrieve(collection_name=collection_name, ids=[int(memory_id)])
+        existing_points = client.retrieve(collection_name=collection_name, ids=[int(memory_id)], with_vectors=True)
         if not existing_points:
             raise ValueError(f"Memory with ID {memory_id} not found")
 
         existing_point = existing_points[0]
-        current_payload = existing_point.payload
-        current_vector = existing_point.vector
-
-        updated_payload = current_payload.copy()
-        updated_payload.update(update_data)
-
-        vector_updated = False
-        if 'text' in update_data and update_data['text'] and current_payload.get('type') == 'text':
-            embedder = TextEmbedder()
-            current_vector = embedder.embed(update_data['text'])
-            vector_updated = True
-            logger.info(f"Qdrant Update - Re-embedded text, dimensions: {len(current_vector)}")
-        elif 'image_path' in update_data and update_data['image_path'] and current_payload.get('type') == 'image':
-            embedder = ImageEmbedder()
-            current_vector = embedder.embed(update_data['image_path'])
-            updated_payload['image_url'] = update_data['image_path']
-            vector_updated = True
-            logger.info(f"Qdrant Update - Re-embedded image, dimensions: {len(current_vector)}")
+        chunks = _chunked_update(existing_point.payload, update_data)
+        if chunks is not None:
+            if chunks:
+                client.delete(collection_name=collection_name, points_selector=_document_selector(memory_id))
+                _ingest_chunks(client, int(memory_id), chunks, {**existing_point.payload, **update_data}, collection_name)
+            else:
+                client.set_payload(collection_name=collection_name, payload=update_data, points=_document_selector(memory_id))
+                bump_collection_generation(collection_name)
+            _log_updated(memory_id, collection_name)
+            return
+
+        updated_payload, reembed = _apply_update(existing_point.payload, update_data)
+
+        vectors = dict(existing_point.vector or {})
+        if TEXT_VECTOR in reembed:
+            vectors[TEXT_VECTOR] = TextEmbedder().embed(update_data['text'])
+            vectors[LEXICAL_VECTOR] = _lexical_vector(update_data['text'])
+        if IMAGE_VECTOR in reembed:
+            vectors[IMAGE_VECTOR] = ImageEmbedder().embed(update_data['image_path'])
+        _log_reembedded(reembed, vectors)
 
         updated_point = models.PointStruct(
             id=int(memory_id),
-            vector=current_vector,
+            vector=_wire_vectors(vectors),
             payload=updated_payload
         )
 
         client.upsert(collection_name=collection_name, points=[updated_point])
-        logger.info(f"Qdrant Update - Successfully updated memory {memory_id} in collection '{collection_name}'")
-        print(f"Updated memory {memory_id} in {collection_name}")
+        bump_collection_generation(collection_name)
+        _log_updated(memory_id, collection_name)
+
+    except Exception as e:
+        logger.error(f"Qdrant Update failed for memory {memory_id}: {str(e)}")
+        raise
+
+async def update_memory_document_async(memory_id: str, update_data: dict, collection_name="memories"):
+    try:
+        existing_points = await run_qdrant("retrieve", collection_name=collection_name, ids=[int(memory_id)], with_vectors=True)
+        if not existing_points:
+            raise ValueError(f"Memory with ID {memory_id} not found")
+
+        existing_point = existing_points[0]
+        chunks = _chunked_update(existing_point.payload, update_data)
+        if chunks is not None:
+            if chunks:
+                await run_qdrant("delete", collection_name=collection_name, points_selector=_document_selector(memory_id))
+                await _ingest_chunks_async(int(memory_id), chunks, {**existing_point.payload, **update_data}, collection_name)
+            else:
+                await run_qdrant("set_payload", collection_name=collection_name, payload=update_data,
+                                 points=_document_selector(memory_id))
+                bump_collection_generation(collection_name)
+            _log_updated(memory_id, collection_name)
+            return
+
+        updated_payload, reembed = _apply_update(existing_point.payload, update_data)
+
+        scheduler = get_embedding_scheduler()
+        jobs = {}
+        if TEXT_VECTOR in reembed:
+            jobs[TEXT_VECTOR] = scheduler.embed_text(update_data['text'])
+        if IMAGE_VECTOR in reembed:
+            jobs[IMAGE_VECTOR] = scheduler.embed_image(update_data['image_path'])
+        vectors = dict(existing_point.vector or {})
+        vectors.update(zip(jobs, await asyncio.gather(*jobs.values())))
+        if TEXT_VECTOR in reembed:
+            vectors[LEXICAL_VECTOR] = _lexical_vector(update_data['text'])
+        _log_reembedded(reembed, vectors)
+
+        updated_point = models.PointStruct(
+            id=int(memory_id),
+            vector=_wire_vectors(vectors),
+            payload=updated_payload
+        )
+
+        await run_qdrant("upsert", collection_name=collection_name, points=[updated_point])
+        bump_collection_generation(collection_name)
+        _log_updated(memory_id, collection_name)
 
     except Exception as e:
         logger.error(f"Qdrant Update failed for memory {memory_id}: {str(e)}")
         raise
 
-def ingest_images(images_dir="data/raw/images", collection_name="memories"):
+def _chunked_update(current_payload, update_data):
+    # New chunks when the memory is, or becomes, a chunked document ([] for a
+    # metadata-only update of one); None when the single-point path applies.
+    if current_payload.get("type") != "text":
+        return None
+    chunks = chunk_text(update_data['text']) if update_data.get('text') else []
+    if "parent_id" in current_payload or len(chunks) > 1:
+        return chunks
+    return None
+
+def _apply_update(current_payload, update_data):
+    updated_payload = current_payload.copy()
+    updated_payload.update(update_data)
+
+    # New text re-embeds the text vector of any memory, including image descriptions.
+    reembed = []
+    if 'text' in update_data and update_data['text']:
+        reembed.append(TEXT_VECTOR)
+    if 'image_path' in update_data and update_data['image_path'] and current_payload.get('type') == 'image':
+        updated_payload['image_url'] = update_data['image_path']
+        reembed.append(IMAGE_VECTOR)
+    return updated_payload, reembed
+
+def _log_reembedded(reembed, vectors):
+    for name in reembed:
+        logger.info(f"Qdrant Update - Re-embedded {name}, dimensions: {len(vectors[name])}")
+
+def _log_updated(memory_id, collection_name):
+    logger.info(f"Qdrant Update - Successfully updated memory {memory_id} in collection '{collection_name}'")
+    print(f"Updated memory {memory_id} in {collection_name}")
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+def ingest_images(images_dir="data/raw/images", collection_name="memories",
+                  upsert_batch_size=INGEST_UPSERT_BATCH_SIZE,
+                  manifest_path=INGEST_MANIFEST_PATH,
+                  force=False):
     embedder = ImageEmbedder()
     client = get_qdrant_client()
 
+    manifest = IngestionManifest(manifest_path) if manifest_path else None
+    source = f"{collection_name}:{os.path.abspath(images_dir)}"
+    run_id = manifest.begin_run(source) if manifest else None
+    model_version = _model_version()
+
+    image_paths = (
+        entry.path for entry in os.scandir(images_dir)
+        if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+    started = time.perf_counter()
+    ingested = 0
+    unchanged = 0
+    failed = []
+    pending = {}
     points = []
-    for filename in os.listdir(images_dir):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-            image_path = os.path.join(images_dir, filename)
-            vector = embedder.embed(image_path)
-            metadata = {
-                "id": filename,
-                "department": "Unknown",
-                "date": "2024-01-01",
-                "outcome": "success",
-                "type": "image",
-                "tags": []
-            }
-            payload = {**metadata, "image_url": image_path}
-            points.append(
-                models.PointStruct(
-                    id=hash(filename) % 1000000,
-                    vector=vector,
-                    payload=payload
-                )
-            )
+
+    def changed_paths():
+        nonlocal unchanged
+        for batch in batched(image_paths, INGEST_BATCH_SIZE):
+            known = manifest.lookup(source, batch) if manifest and not force else {}
+            current = []
+            refreshed = []
+            for image_path in batch:
+                mtime = os.path.getmtime(image_path)
+                entry = known.get(image_path)
+                if entry is not None and entry.model_version == model_version and entry.mtime == mtime:
+                    current.append(image_path)
+                    continue
+                # mtime moved: hash the bytes before paying for an embedding.
+                digest = file_hash(image_path)
+                if _is_current(entry, digest, model_version):
+                    refreshed.append((image_path, digest, mtime, entry.point_id))
+                    continue
+                pending[image_path] = (digest, mtime)
+                yield image_path
+            if manifest:
+                manifest.touch(source, run_id, current)
+                manifest.record(source, run_id, model_version, refreshed)
+            unchanged += len(current) + len(refreshed)
+
+    for image_path, vector, error in embedder.iter_embeddings(changed_paths()):
+        digest, mtime = pending.pop(image_path)
+        if error is not None:
+            failed.append((image_path, error))
+            continue
+        filename = os.path.basename(image_path)
+        metadata = {
+            "id": filename,
+            "department": "Unknown",
+            "date": "2024-01-01",
+            "outcome": "success",
+            "type": "image",
+            "tags": []
+        }
+        payload = {**metadata, "image_url": image_path}
+        point = models.PointStruct(
+            id=stable_point_id(source, image_path),
+            vector={IMAGE_VECTOR: vector.tolist()},
+            payload=payload
+        )
+        points.append((point, (image_path, digest, mtime, point.id)))
+        if len(points) >= upsert_batch_size:
+            ingested += _upsert_images(client, collection_name, points, manifest, source, run_id, model_version)
+            _log_throughput(ingested, started, "images")
+            points = []
 
     if points:
-        client.upsert(collection_name=collection_name, points=points)
-        print(f"Ingested {len(points)} images into {collection_name}")
+        ingested += _upsert_images(client, collection_name, points, manifest, source, run_id, model_version)
+
+    removed = _finish_run(client, manifest, source, run_id, collection_name)
+
+    for image_path, error in failed:
+        logger.warning(f"Qdrant Ingest - Failed to ingest image {image_path}: {error}")
+    if ingested or failed or unchanged or removed:
+        elapsed = time.perf_counter() - started
+        print(f"Ingested {ingested} images into {collection_name} in {elapsed:.1f}s "
+              f"({unchanged} unchanged, {removed} removed, {len(failed)} skipped)")
     else:
         print("No images found to ingest")
+
+def _upsert_images(client, collection_name, entries, manifest, source, run_id, model_version):
+    client.upsert(collection_name=collection_name, points=[point for point, _ in entries])
+    bump_collection_generation(collection_name)
+    if manifest:
+        manifest.record(source, run_id, model_version, [row for _, row in entries])
+    return len(entries)
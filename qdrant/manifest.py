@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+import hashlib
+import json
+import time
+import uuid
+from collections import namedtuple
+
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", "./ingest_manifest.sqlite")
+
+# SQLite caps bound parameters per statement; stay well below the limit.
+_QUERY_CHUNK = 500
+
+ManifestEntry = namedtuple("ManifestEntry", ["content_hash", "mtime", "model_version", "point_id"])
+
+# point_id is TEXT because Qdrant IDs are unsigned 64-bit and SQLite integers are signed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    source TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    mtime REAL,
+    model_version TEXT NOT NULL,
+    point_id TEXT NOT NULL,
+    last_run TEXT NOT NULL,
+    PRIMARY KEY (source, item_key)
+);
+CREATE INDEX IF NOT EXISTS items_last_run ON items (source, last_run);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    completed_at REAL
+);
+"""
+
+
+def content_hash(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stable_point_id(source: str, item_key: str) -> int:
+    # Unlike hash(), stable across processes; 64 bits keeps collisions negligible.
+    return int(hashlib.md5(f"{source}:{item_key}".encode()).hexdigest()[:16], 16)
+
+
+class IngestionManifest:
+    def __init__(self, path=INGEST_MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Upserts record their chunk from the ingest worker thread.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def begin_run(self, source: str) -> str:
+        with self._lock:
+            # An unfinished run is resumed so items it already stored count as seen.
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE source = ? AND completed_at IS NULL ORDER BY started_at DESC LIMIT 1",
+                (source,)
+            ).fetchone()
+            if row:
+                return row[0]
+            run_id = uuid.uuid4().hex
+            self._conn.execute("INSERT INTO runs (run_id, source, started_at) VALUES (?, ?, ?)", (run_id, source, time.time()))
+            self._conn.commit()
+            return run_id
+
+    def complete_run(self, run_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE runs SET completed_at = ? WHERE run_id = ?", (time.time(), run_id))
+            self._conn.commit()
+
+    def lookup(self, source: str, keys) -> dict:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT item_key, content_hash, mtime, model_version, point_id FROM items "
+                    f"WHERE source = ? AND item_key IN ({placeholders})",
+                    [source, *chunk]
+                )
+                for key, digest, mtime, model_version, point_id in rows:
+                    found[key] = ManifestEntry(digest, mtime, model_version, int(point_id))
+        return found
+
+    def touch(self, source: str, run_id: str, keys):
+        keys = list(keys)
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE items SET last_run = ? WHERE source = ? AND item_key = ?",
+                [(run_id, source, key) for key in keys]
+            )
+            self._conn.commit()
+
+    def record(self, source: str, run_id: str, model_version: str, rows):
+        # rows: (item_key, content_hash, mtime, point_id), written once the points are stored.
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (source, item_key, content_hash, mtime, model_version, point_id, last_run) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(source, key, digest, mtime, model_version, str(point_id), run_id) for key, digest, mtime, point_id in rows]
+            )
+            self._conn.commit()
+
+    def stale_point_ids(self, source: str, run_id: str) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT point_id FROM items WHERE source = ? AND last_run != ?", (source, run_id)
+            ).fetchall()
+        return [int(row[0]) for row in rows]
+
+    def forget_stale(self, source: str, run_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE source = ? AND last_run != ?", (source, run_id))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
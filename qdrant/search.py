@@ -1,30 +1,243 @@
 from qdrant_client.http import models
-from qdrant.client import get_qdrant_client
+from qdrant.client import get_qdrant_client, run_qdrant
 from embeddings.text_embedder import TextEmbedder
+from embeddings.scheduler import get_embedding_scheduler
+from embeddings.query_cache import get_query_cache
+from embeddings.model_registry import model_identity
+from embeddings.sparse_embedder import SparseEmbedder
+from qdrant.collections import get_indexed_fields, get_indexed_fields_async, search_params, VECTOR_NAMES, LEXICAL_VECTOR
+import threading
 import logging
+import os
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def search_memories(query: str, collection_name="memories", limit=5, filters=None):
-    embedder = TextEmbedder()
+# Candidates fetched per named vector before fusion, as a multiple of the limit.
+SEARCH_PREFETCH_FACTOR = int(os.getenv("SEARCH_PREFETCH_FACTOR", "4"))
+LEXICAL_SEARCH = os.getenv("LEXICAL_SEARCH", "true").lower() == "true"
+# Chunk hits fetched per requested document, and how they roll up to it (max or sum).
+CHUNK_SEARCH_FACTOR = int(os.getenv("CHUNK_SEARCH_FACTOR", "3"))
+CHUNK_AGGREGATION = os.getenv("CHUNK_AGGREGATION", "max")
+
+def search_memories(query: str, collection_name="memories", limit=5, filters=None, query_vector=None, hnsw_ef=None, exact=False, with_vectors=False):
     client = get_qdrant_client()
 
-    query_vector = embedder.embed(query)
+    if query_vector is None:
+        query_vector = embed_query(query)
     logger.info(f"Qdrant Search - Query: '{query}', Vector dimensions: {len(query_vector)}, Collection: {collection_name}")
+    if filters:
+        _report_filter_index(filters, get_indexed_fields(collection_name))
 
-    search_result = client.search(
+    search_result = client.query_points(
         collection_name=collection_name,
-        query_vector=query_vector,
-        limit=limit,
-        query_filter=filters
+        **_fused_query(query, query_vector, limit * CHUNK_SEARCH_FACTOR, filters, search_params(hnsw_ef, exact)),
+        query_filter=filters,
+        with_payload=True,
+        with_vectors=_dense_vectors(with_vectors)
+    ).points
+    search_result = _aggregate_chunks(search_result, limit)
+
+    _log_results(search_result)
+    return search_result
+
+async def search_memories_async(query: str, collection_name="memories", limit=5, filters=None, query_vector=None, hnsw_ef=None, exact=False, with_vectors=False):
+    if query_vector is None:
+        query_vector = await embed_query_async(query)
+    logger.info(f"Qdrant Search - Query: '{query}', Vector dimensions: {len(query_vector)}, Collection: {collection_name}")
+    if filters:
+        _report_filter_index(filters, await get_indexed_fields_async(collection_name))
+
+    response = await run_qdrant(
+        "query_points",
+        collection_name=collection_name,
+        **_fused_query(query, query_vector, limit * CHUNK_SEARCH_FACTOR, filters, search_params(hnsw_ef, exact)),
+        query_filter=filters,
+        with_payload=True,
+        with_vectors=_dense_vectors(with_vectors)
     )
+    search_result = _aggregate_chunks(response.points, limit)
+
+    _log_results(search_result)
+    return search_result
 
+def search_memories_batch(queries: list, collection_name="memories", limits=None, filters=None, query_vectors=None, hnsw_ef=None, exact=False, with_vectors=False):
+    client = get_qdrant_client()
+
+    if query_vectors is None:
+        query_vectors = embed_queries(queries)
+    limits = limits if limits is not None else [5] * len(queries)
+    requests = _batch_requests(queries, query_vectors, limits, filters, search_params(hnsw_ef, exact), with_vectors)
+    logger.info(f"Qdrant Batch Search - {len(requests)} queries, Collection: {collection_name}")
+    if any(request.filter for request in requests):
+        indexed = get_indexed_fields(collection_name)
+        for request in requests:
+            _report_filter_index(request.filter, indexed)
+
+    responses = client.query_batch_points(collection_name=collection_name, requests=requests)
+    results = [_aggregate_chunks(response.points, limit) for response, limit in zip(responses, limits)]
+    for search_result in results:
+        _log_results(search_result)
+    return results
+
+async def search_memories_batch_async(queries: list, collection_name="memories", limits=None, filters=None, query_vectors=None, hnsw_ef=None, exact=False, with_vectors=False):
+    if query_vectors is None:
+        query_vectors = await embed_queries_async(queries)
+    limits = limits if limits is not None else [5] * len(queries)
+    requests = _batch_requests(queries, query_vectors, limits, filters, search_params(hnsw_ef, exact), with_vectors)
+    logger.info(f"Qdrant Batch Search - {len(requests)} queries, Collection: {collection_name}")
+    if any(request.filter for request in requests):
+        indexed = await get_indexed_fields_async(collection_name)
+        for request in requests:
+            _report_filter_index(request.filter, indexed)
+
+    responses = await run_qdrant("query_batch_points", collection_name=collection_name, requests=requests)
+    results = [_aggregate_chunks(response.points, limit) for response, limit in zip(responses, limits)]
+    for search_result in results:
+        _log_results(search_result)
+    return results
+
+def _batch_requests(queries, query_vectors, limits, filters, params=None, with_vectors=False):
+    filters = filters if filters is not None else [None] * len(queries)
+    return [
+        models.QueryRequest(
+            **_fused_query(query, query_vector, limit * CHUNK_SEARCH_FACTOR, query_filter, params),
+            filter=query_filter,
+            with_payload=True,
+            with_vector=_dense_vectors(with_vectors)
+        )
+        for query, query_vector, limit, query_filter in zip(queries, query_vectors, limits, filters)
+    ]
+
+def _dense_vectors(with_vectors):
+    # Only the dense vectors, for callers that compare results with each other.
+    return list(VECTOR_NAMES) if with_vectors else False
+
+def _fused_query(query, query_vector, limit, query_filter, params):
+    # The query is scored against the text and the image vector of every point, and
+    # its terms against the lexical vector; the candidate lists are merged
+    # server-side with reciprocal rank fusion, all in a single request, so the
+    # lexical channel runs alongside the dense ones instead of after them.
+    # One C-level conversion, shared by every prefetch, instead of a float() per element.
+    vector = np.asarray(query_vector, dtype=np.float32).tolist()
+    prefetch = [
+        models.Prefetch(
+            query=vector,
+            using=name,
+            filter=query_filter,
+            params=params,
+            limit=limit * SEARCH_PREFETCH_FACTOR
+        )
+        for name in VECTOR_NAMES
+    ]
+    if LEXICAL_SEARCH:
+        indices, values = SparseEmbedder().embed_query(query)
+        if indices:
+            prefetch.append(models.Prefetch(
+                query=models.SparseVector(indices=indices, values=values),
+                using=LEXICAL_VECTOR,
+                filter=query_filter,
+                limit=limit * SEARCH_PREFETCH_FACTOR
+            ))
+    return dict(
+        prefetch=prefetch,
+        query=models.FusionQuery(fusion=models.Fusion.RRF),
+        limit=limit
+    )
+
+def _aggregate_chunks(points, limit):
+    # Chunks of a long document collapse onto their parent, scored by the max of the
+    # chunk scores or by their sum, which rewards a document matching in several
+    # places; unchunked points stand for themselves. Points arrive best first, so a
+    # document is represented by its best chunk, whose text is marked as a snippet
+    # of the parent.
+    groups = {}
+    for point in points:
+        key = point.payload.get("parent_id", point.id)
+        if key not in groups:
+            groups[key] = [point, point.score]
+        else:
+            groups[key][1] += point.score
+
+    aggregated = []
+    for key, (best, total) in groups.items():
+        if "parent_id" not in best.payload:
+            aggregated.append(best)
+            continue
+        score = total if CHUNK_AGGREGATION == "sum" else best.score
+        aggregated.append(best.model_copy(update={"id": int(key), "score": score,
+                                                  "payload": {**best.payload, "snippet": True}}))
+    return sorted(aggregated, key=lambda point: point.score, reverse=True)[:limit]
+
+def embed_query(query: str):
+    cache = get_query_cache()
+    query_vector = cache.get(query, model_identity())
+    if query_vector is None:
+        query_vector = cache.put(query, TextEmbedder().embed(query), model_identity())
+    return query_vector
+
+async def embed_query_async(query: str):
+    cache = get_query_cache()
+    query_vector = cache.get(query, model_identity())
+    if query_vector is None:
+        query_vector = cache.put(query, await get_embedding_scheduler().embed_text(query), model_identity())
+    return query_vector
+
+def embed_queries(queries: list):
+    cache = get_query_cache()
+    vectors = [cache.get(query, model_identity()) for query in queries]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        # Every cache miss is encoded in a single forward pass.
+        embedded = TextEmbedder().embed_batch([queries[i] for i in missing])
+        for i, vector in zip(missing, embedded):
+            vectors[i] = cache.put(queries[i], vector, model_identity())
+    return vectors
+
+async def embed_queries_async(queries: list):
+    cache = get_query_cache()
+    vectors = [cache.get(query, model_identity()) for query in queries]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        embedded = await get_embedding_scheduler().embed_text_batch([queries[i] for i in missing])
+        for i, vector in zip(missing, embedded):
+            vectors[i] = cache.put(queries[i], vector, model_identity())
+    return vectors
+
+_filter_stats_lock = threading.Lock()
+_filter_stats = {"filtered_searches": 0, "fully_indexed": 0, "unindexed_fields": {}}
+
+def _report_filter_index(query_filter, indexed: set):
+    if not query_filter:
+        return
+    keys = {condition.key for condition in (query_filter.must or []) if isinstance(condition, models.FieldCondition)}
+    unindexed = sorted(keys - indexed)
+    with _filter_stats_lock:
+        _filter_stats["filtered_searches"] += 1
+        if not unindexed:
+            _filter_stats["fully_indexed"] += 1
+        for field in unindexed:
+            _filter_stats["unindexed_fields"][field] = _filter_stats["unindexed_fields"].get(field, 0) + 1
+
+    if unindexed:
+        logger.warning(f"Qdrant Search - Filter on unindexed fields {unindexed}, payloads will be scanned (run scripts/migrate_payload_indexes.py)")
+    else:
+        logger.info(f"Qdrant Search - Filter served by payload indexes on {sorted(keys)}")
+
+def filter_index_metrics() -> dict:
+    with _filter_stats_lock:
+        return {
+            "filtered_searches": _filter_stats["filtered_searches"],
+            "fully_indexed": _filter_stats["fully_indexed"],
+            "unindexed_fields": dict(_filter_stats["unindexed_fields"]),
+        }
+
+def _log_results(search_result):
     for i, result in enumerate(search_result):
         logger.info(f"Result {i+1}: ID={result.id}, Score={result.score:.4f}, Type={result.payload.get('type', 'unknown')}")
 
     logger.info(f"Qdrant Search completed - Found {len(search_result)} results")
-    return search_result
 
 def build_filter(department=None, date_from=None, date_to=None, outcome=None, type_filter=None, location=None, tags=None):
     conditions = []
@@ -49,17 +262,10 @@ def build_filter(department=None, date_from=None, date_to=None, outcome=None, ty
             match=models.MatchValue(value=location)
         ))
     if tags:
-        tag_conditions = []
-        for tag in tags:
-            tag_conditions.append(models.FieldCondition(
-                key="tags",
-                match=models.MatchValue(value=tag)
-            ))
-        if tag_conditions:
-            conditions.append(models.FieldCondition(
-                key="tags",
-                match=models.MatchAny(any=tag_conditions)
-            ))
+        conditions.append(models.FieldCondition(
+            key="tags",
+            match=models.MatchAny(any=list(tags))
+        ))
     if date_from or date_to:
         date_conditions = {}
         if date_from:
@@ -0,0 +1,86 @@
+import json
+from itertools import islice
+
+READ_CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_records(path: str, chunk_size=READ_CHUNK_SIZE):
+    if path.endswith(".jsonl"):
+        yield from _iter_jsonl(path)
+    else:
+        yield from _iter_json_array(path, chunk_size)
+
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_jsonl(path):
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_json_array(path, chunk_size):
+    # Decodes one element at a time from a top-level JSON array so memory use is
+    # bounded by the largest single record, not the file.
+    with open(path, "r") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            data = f.read(chunk_size)
+            if not data:
+                eof = True
+            buffer = buffer[pos:] + data
+            pos = 0
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip(_WHITESPACE)
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"{path} is not a JSON array")
+        pos += 1
+
+        while True:
+            skip(_WHITESPACE + ",")
+            if pos >= len(buffer):
+                raise ValueError(f"Unexpected end of file in {path}")
+            if buffer[pos] == "]":
+                return
+            while True:
+                try:
+                    record, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # A number cut at the buffer boundary ("4." of "4.5") decodes early,
+                # so only accept a record once the delimiter after it is buffered.
+                if not eof and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                    fill()
+                    continue
+                break
+            pos = end
+            yield record
@@ -1,8 +1,15 @@
 import openai
 import os
-from reasoning.prompt_templates import REASONING_PROMPT_TEMPLATE
+import asyncio
+import logging
+from reasoning.prompt_templates import REASONING_PROMPT_TEMPLATE, SUMMARY_PROMPT_TEMPLATE
 from memory.schema import MemoryItem
 
+logger = logging.getLogger(__name__)
+
+REASONING_TIMEOUT_SECONDS = float(os.getenv("REASONING_TIMEOUT_SECONDS", "30"))
+SUMMARY_TIMEOUT_SECONDS = float(os.getenv("SUMMARY_TIMEOUT_SECONDS", "20"))
+
 class ReasoningEngine:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -16,6 +23,39 @@ class ReasoningEngine:
         if not self.api_key:
             return self._basic_reasoning(query, memories)
 
+        response = openai.ChatCompletion.create(**self._reasoning_request(query, memories))
+        return self._format_reasoning(response, memories)
+
+    async def generate_reasoning_async(self, query: str, memories: list[MemoryItem]) -> str:
+        if not self.api_key:
+            return self._basic_reasoning(query, memories)
+
+        response = await openai.ChatCompletion.acreate(**self._reasoning_request(query, memories))
+        return self._format_reasoning(response, memories)
+
+    async def generate_reasoning_and_summary_async(self, query: str, memories: list[MemoryItem],
+                                                   reasoning_timeout: float = REASONING_TIMEOUT_SECONDS,
+                                                   summary_timeout: float = SUMMARY_TIMEOUT_SECONDS) -> tuple[str, str]:
+        # Both prompts are built from the same memories, so fan them out together
+        # and let each section fall back to its template independently.
+        reasoning, summary = await asyncio.gather(
+            self._with_fallback("reasoning", self.generate_reasoning_async(query, memories), reasoning_timeout,
+                                lambda: self._basic_reasoning(query, memories)),
+            self._with_fallback("summary", self.summarize_memories_async(query, memories), summary_timeout,
+                                lambda: self._basic_summary(query, memories))
+        )
+        return reasoning, summary
+
+    async def _with_fallback(self, section: str, coro, timeout: float, fallback):
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Reasoning - {section} timed out after {timeout:.1f}s, using basic template")
+        except Exception as e:
+            logger.warning(f"Reasoning - {section} failed ({e}), using basic template")
+        return fallback()
+
+    def _reasoning_request(self, query: str, memories: list[MemoryItem]) -> dict:
         memories_text = "\n".join([
             f"- ID: {m.id}, Department: {m.department}, Date: {m.date}, Outcome: {m.outcome}, Type: {m.type}\n  Content: {m.text if m.text else f'Image: {m.image_url}'}"
             for m in memories
@@ -23,13 +63,14 @@ class ReasoningEngine:
 
         prompt = REASONING_PROMPT_TEMPLATE.format(query=query, memories=memories_text)
 
-        response = openai.ChatCompletion.create(
+        return dict(
             model="openai/gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=800,
             temperature=0
         )
 
+    def _format_reasoning(self, response, memories: list[MemoryItem]) -> str:
         reasoning_text = response.choices[0].message.content.strip()
 
         sources = "\n\nSources:\n" + "\n".join([
@@ -67,17 +108,28 @@ class ReasoningEngine:
         if not self.api_key:
             return self._basic_summary(query, memories)
 
-        from .prompt_templates import SUMMARY_PROMPT_TEMPLATE
+        response = openai.ChatCompletion.create(**self._summary_request(query, memories))
+        return self._format_summary(response, memories)
+
+    async def summarize_memories_async(self, query: str, memories: list[MemoryItem]) -> str:
+        if not self.api_key:
+            return self._basic_summary(query, memories)
+
+        response = await openai.ChatCompletion.acreate(**self._summary_request(query, memories))
+        return self._format_summary(response, memories)
+
+    def _summary_request(self, query: str, memories: list[MemoryItem]) -> dict:
         memories_text = "\n".join([f"- {m.text if m.text else f'Image: {m.image_url}'} (Outcome: {m.outcome}, Type: {m.type})" for m in memories])
         prompt = SUMMARY_PROMPT_TEMPLATE.format(query=query, memories=memories_text)
 
-        response = openai.ChatCompletion.create(
+        return dict(
             model="openai/gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=400,
             temperature=0.2
         )
 
+    def _format_summary(self, response, memories: list[MemoryItem]) -> str:
         summary_text = response.choices[0].message.content.strip()
 
         sources = "\n\nSources:\n" + "\n".join([
@@ -9,4 +9,13 @@ class RecommendationEngine:
         return self.reasoning_engine.generate_reasoning(query, memories)
 
     def get_summary(self, query: str, memories: list[MemoryItem]) -> str:
-        return self.reasoning_engine.summarize_memories(query, memories)
\ No newline at end of file
+        return self.reasoning_engine.summarize_memories(query, memories)
+
+    async def generate_recommendation_async(self, query: str, memories: list[MemoryItem]) -> str:
+        return await self.reasoning_engine.generate_reasoning_async(query, memories)
+
+    async def get_summary_async(self, query: str, memories: list[MemoryItem]) -> str:
+        return await self.reasoning_engine.summarize_memories_async(query, memories)
+
+    async def generate_recommendation_with_summary_async(self, query: str, memories: list[MemoryItem]) -> tuple[str, str]:
+        return await self.reasoning_engine.generate_reasoning_and_summary_async(query, memories)
\ No newline at end of file
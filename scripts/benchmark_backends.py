@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import glob
+import time
+import numpy as np
+import torch
+from PIL import Image
+from embeddings.model_registry import load_clip, features_to_numpy, DEFAULT_MODEL_NAME, DEFAULT_PRETRAINED
+from embeddings.backends import BACKENDS, CLIP_EXPORT_DIR
+
+SAMPLE_TEXTS = [
+    "Flood response plan for the eastern district after the 2019 monsoon",
+    "Budget review meeting notes: road maintenance deferred to next quarter",
+    "Decision to relocate the vaccination camp closer to the bus terminal",
+    "Photo of a collapsed culvert on the highway",
+]
+
+def load_images(clip, count, seed):
+    paths = sorted(glob.glob("data/raw/images/**/*.*", recursive=True))[:count]
+    images = []
+    for path in paths:
+        try:
+            with Image.open(path) as image:
+                images.append(clip.preprocess(image.convert("RGB")))
+        except Exception:
+            continue
+    # Pad with random images so the benchmark also runs without sample data.
+    rng = np.random.default_rng(seed)
+    while len(images) < count:
+        pixels = rng.integers(0, 256, (256, 256, 3), dtype=np.uint8)
+        images.append(clip.preprocess(Image.fromarray(pixels)))
+    return torch.stack(images)
+
+def encode(clip, kind, inputs):
+    with torch.no_grad():
+        if kind == "text":
+            return features_to_numpy(clip.model.encode_text(inputs))
+        return features_to_numpy(clip.model.encode_image(inputs))
+
+def throughput(clip, kind, inputs, batch_size, seconds):
+    encode(clip, kind, inputs[:batch_size])
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for i in range(0, len(inputs), batch_size):
+            encode(clip, kind, inputs[i:i + batch_size])
+            done += len(inputs[i:i + batch_size])
+    return done / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CLIP inference backends for output parity and CPU throughput")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--pretrained", default=DEFAULT_PRETRAINED)
+    parser.add_argument("--export-dir", default=CLIP_EXPORT_DIR)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Minimum timed run per backend and tower")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Fail if any vector is less similar to the PyTorch one")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    reference = load_clip(args.model, args.pretrained, "cpu", backend="torch")
+    inputs = {
+        "text": reference.tokenizer((SAMPLE_TEXTS * args.samples)[:args.samples]),
+        "image": load_images(reference, args.samples, args.seed),
+    }
+    expected = {kind: encode(reference, kind, value) for kind, value in inputs.items()}
+
+    print(f"{args.samples} samples per tower, batch size {args.batch_size}, torch threads {torch.get_num_threads()}")
+    print(f"{'backend':<13}{'tower':<7}{'min cos':>9}{'mean cos':>10}{'items/s':>10}{'speedup':>9}")
+    failed = False
+    baseline = {}
+    for backend in args.backends:
+        try:
+            clip = reference if backend == "torch" else load_clip(args.model, args.pretrained, "cpu", backend, args.export_dir)
+        except FileNotFoundError as e:
+            print(f"{backend:<13}skipped: {e}")
+            continue
+        for kind, value in inputs.items():
+            # Rows are unit vectors, so the row-wise dot product is the cosine.
+            cosines = np.einsum("ij,ij->i", encode(clip, kind, value), expected[kind])
+            rate = throughput(clip, kind, value, args.batch_size, args.seconds)
+            baseline.setdefault(kind, rate)
+            failed |= bool(cosines.min() < args.min_cosine)
+            print(f"{backend:<13}{kind:<7}{cosines.min():>9.5f}{cosines.mean():>10.5f}{rate:>10.1f}{rate / baseline[kind]:>8.2f}x")
+
+    if failed:
+        print(f"Parity check failed: some vectors are below cosine {args.min_cosine} against PyTorch.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+import numpy as np
+from qdrant_client.http import models
+from qdrant.client import get_qdrant_client
+from qdrant.collections import create_memory_collection, delete_collection, search_params, COLLECTION_PROFILES, TEXT_VECTOR
+from qdrant.streaming import batched
+from embeddings.similarity import normalize, cosine_matrix, top_k
+
+def load_vectors(args):
+    if args.source_collection:
+        client = get_qdrant_client()
+        vectors = []
+        offset = None
+        while True:
+            points, offset = client.scroll(collection_name=args.source_collection, limit=256, offset=offset,
+                                           with_payload=False, with_vectors=True)
+            vectors.extend(point.vector[TEXT_VECTOR] for point in points if TEXT_VECTOR in (point.vector or {}))
+            if offset is None:
+                break
+        vectors = np.asarray(vectors, dtype=np.float32)
+    else:
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((args.num_vectors, args.dim)).astype(np.float32)
+    return normalize(vectors, copy=False)
+
+def wait_for_index(client, collection_name, timeout=600):
+    started = time.time()
+    while time.time() - started < timeout:
+        info = client.get_collection(collection_name)
+        if info.status == models.CollectionStatus.GREEN and info.indexed_vectors_count >= info.points_count:
+            return
+        time.sleep(1)
+    print(f"  warning: indexing of '{collection_name}' did not finish within {timeout}s")
+
+def benchmark(profile, vectors, queries, exact, hnsw_ef):
+    k = exact.shape[1]
+    client = get_qdrant_client()
+    collection_name = f"benchmark_{profile.replace('-', '_')}"
+    if client.collection_exists(collection_name):
+        delete_collection(collection_name)
+    create_memory_collection(collection_name, vector_size=vectors.shape[1], profile=profile)
+    # Build the graph even for small benchmark sets instead of falling back to full scans.
+    client.update_collection(
+        collection_name=collection_name,
+        optimizer_config=models.OptimizersConfigDiff(indexing_threshold=1),
+        hnsw_config=models.HnswConfigDiff(full_scan_threshold=1)
+    )
+
+    for batch in batched(range(len(vectors)), 512):
+        client.upsert(
+            collection_name=collection_name,
+            points=models.Batch(ids=batch, vectors={TEXT_VECTOR: vectors[batch].tolist()}),
+            wait=True
+        )
+    wait_for_index(client, collection_name)
+
+    recalls = []
+    latencies = []
+    for query, expected in zip(queries, exact):
+        query = query.tolist()
+        started = time.perf_counter()
+        approximate = client.query_points(collection_name=collection_name, query=query, using=TEXT_VECTOR, limit=k,
+                                          search_params=search_params(hnsw_ef, profile=profile)).points
+        latencies.append(time.perf_counter() - started)
+        expected = set(expected.tolist())
+        recalls.append(len(expected & {point.id for point in approximate}) / max(len(expected), 1))
+
+    delete_collection(collection_name)
+    return float(np.mean(recalls)), float(np.mean(latencies) * 1000), float(np.percentile(latencies, 95) * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report recall@k of each collection profile against exact search")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(COLLECTION_PROFILES), default=list(COLLECTION_PROFILES))
+    parser.add_argument("--source-collection", help="Copy vectors from this collection instead of generating random ones")
+    parser.add_argument("--num-vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, help="Override the profile's hnsw_ef")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if "://" not in os.getenv("QDRANT_URL", "./qdrant_storage"):
+        print("Note: embedded Qdrant always searches exhaustively; point QDRANT_URL at a server for meaningful numbers.")
+
+    vectors = load_vectors(args)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)]
+    # Perturb the sampled points so queries are near, but not identical to, stored vectors.
+    queries = queries + rng.standard_normal(queries.shape).astype(np.float32) * 0.05
+    queries = normalize(queries, copy=False)
+
+    # Ground truth is one brute-force numpy scan, shared by every profile.
+    exact, _ = top_k(cosine_matrix(queries, vectors, normalized=True), args.k)
+
+    print(f"{len(vectors)} vectors, {len(queries)} queries, k={args.k}")
+    print(f"{'profile':<14}{'recall@k':>10}{'avg ms':>10}{'p95 ms':>10}")
+    for profile in args.profiles:
+        recall, avg_ms, p95_ms = benchmark(profile, vectors, queries, exact, args.hnsw_ef)
+        print(f"{profile:<14}{recall:>10.4f}{avg_ms:>10.2f}{p95_ms:>10.2f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from embeddings.model_registry import load_clip, DEFAULT_MODEL_NAME, DEFAULT_PRETRAINED
+from embeddings.backends import export, CLIP_EXPORT_DIR
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the CLIP text and vision towers for the torchscript/onnx backends")
+    parser.add_argument("--backend", nargs="+", choices=["torchscript", "onnx", "onnx-int8"], default=["onnx"])
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--pretrained", default=DEFAULT_PRETRAINED)
+    parser.add_argument("--out-dir", default=CLIP_EXPORT_DIR)
+    args = parser.parse_args()
+
+    # Exports are traced on CPU from the eager PyTorch model.
+    clip = load_clip(args.model, args.pretrained, "cpu", backend="torch")
+    for backend in args.backend:
+        print(f"Exporting {args.model} ({args.pretrained}) for {backend}...")
+        for path in export(clip, backend, args.out_dir):
+            print(f"  {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    print("Check parity and speed with scripts/benchmark_backends.py, then set EMBED_BACKEND.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -4,13 +4,28 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from qdrant.ingest import ingest_documents, ingest_images
+import argparse
+from qdrant.ingest import ingest_documents, ingest_images, INGEST_BATCH_SIZE, INGEST_UPSERT_BATCH_SIZE
+from qdrant.manifest import INGEST_MANIFEST_PATH
 
 def main():
+    parser = argparse.ArgumentParser(description="Ingest documents and images into Qdrant")
+    parser.add_argument("--documents", default="data/processed/documents.json", help="JSON array or JSONL file of {id, text} records")
+    parser.add_argument("--metadata", default="data/processed/metadata.json", help="Metadata aligned with --documents; pass '' when metadata is inline")
+    parser.add_argument("--images-dir", default="data/raw/images")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Documents per embedding batch")
+    parser.add_argument("--upsert-batch-size", type=int, default=INGEST_UPSERT_BATCH_SIZE, help="Points per Qdrant upsert")
+    parser.add_argument("--manifest", default=INGEST_MANIFEST_PATH, help="Ingestion manifest; pass '' to disable incremental ingestion")
+    parser.add_argument("--force", action="store_true", help="Re-embed every item even if the manifest says it is unchanged")
+    args = parser.parse_args()
+
     print("Ingesting documents into Qdrant...")
-    ingest_documents()
+    ingest_documents(args.documents, args.metadata or None,
+                     batch_size=args.batch_size, upsert_batch_size=args.upsert_batch_size,
+                     manifest_path=args.manifest or None, force=args.force)
     print("Ingesting images into Qdrant...")
-    ingest_images()
+    ingest_images(args.images_dir, upsert_batch_size=args.upsert_batch_size,
+                  manifest_path=args.manifest or None, force=args.force)
     print("Data ingestion completed.")
 
 if __name__ == "__main__":
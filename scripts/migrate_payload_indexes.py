@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from qdrant.collections import ensure_payload_indexes, PAYLOAD_INDEXES
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing payload indexes on an existing collection")
+    parser.add_argument("--collection", default="memories")
+    args = parser.parse_args()
+
+    print(f"Checking payload indexes on '{args.collection}'...")
+    created = ensure_payload_indexes(args.collection)
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+    else:
+        print(f"All {len(PAYLOAD_INDEXES)} payload indexes already present.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from qdrant_client.http import models
+from qdrant.client import get_qdrant_client
+from qdrant.collections import (create_memory_collection, delete_collection, COLLECTION_PROFILES, QDRANT_COLLECTION_PROFILE,
+                                TEXT_VECTOR, IMAGE_VECTOR, VECTOR_NAMES, LEXICAL_VECTOR)
+from embeddings.sparse_embedder import SparseEmbedder
+
+# Collections created before named vectors hold one unnamed CLIP vector per point
+# and no sparse vector, and Qdrant cannot change a collection's vector layout in
+# place. The points are copied into a staging collection with the current layout
+# (the unnamed vector becomes "text" or "image" by the point's type, the lexical
+# vector is computed from its text), the original is recreated and the staged
+# points are copied back. Vectors are not recomputed, so no model is loaded.
+
+def needs_migration(client, collection_name) -> bool:
+    params = client.get_collection(collection_name).config.params
+    vectors = params.vectors if isinstance(params.vectors, dict) else {}
+    return set(vectors) != set(VECTOR_NAMES) or LEXICAL_VECTOR not in (params.sparse_vectors or {})
+
+def convert_point(point, sparse_embedder):
+    payload = point.payload or {}
+    if isinstance(point.vector, dict):
+        vector = {name: value for name, value in point.vector.items() if name in VECTOR_NAMES}
+    else:
+        vector = {IMAGE_VECTOR if payload.get("type") == "image" else TEXT_VECTOR: point.vector}
+    if payload.get("text") and LEXICAL_VECTOR not in vector:
+        indices, values = sparse_embedder.embed(payload["text"])
+        vector[LEXICAL_VECTOR] = models.SparseVector(indices=indices, values=values)
+    return models.PointStruct(id=point.id, vector=vector, payload=payload)
+
+def copy_points(client, source, target, batch_size, convert=None):
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(collection_name=source, limit=batch_size, offset=offset,
+                                       with_payload=True, with_vectors=True)
+        if points:
+            if convert is not None:
+                points = [convert(point) for point in points]
+            else:
+                points = [models.PointStruct(id=point.id, vector=point.vector, payload=point.payload) for point in points]
+            client.upsert(collection_name=target, points=points, wait=True)
+            copied += len(points)
+            print(f"  {copied} points copied to '{target}'")
+        if offset is None:
+            return copied
+
+def main():
+    parser = argparse.ArgumentParser(description="Move an existing collection to named dense vectors plus the lexical sparse vector")
+    parser.add_argument("--collection", default="memories")
+    parser.add_argument("--profile", choices=sorted(COLLECTION_PROFILES), default=QDRANT_COLLECTION_PROFILE,
+                        help="HNSW/quantization/on-disk storage profile of the recreated collection")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--keep-staging", action="store_true", help="keep the staging copy after a successful migration")
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    staging = f"{args.collection}_migration"
+
+    migrate = client.collection_exists(args.collection) and needs_migration(client, args.collection)
+    if migrate:
+        # A staging copy left next to an unmigrated collection is incomplete: start over.
+        if client.collection_exists(staging):
+            delete_collection(staging)
+        print(f"Copying '{args.collection}' into '{staging}' with the current vector layout...")
+        create_memory_collection(staging, profile=args.profile)
+        sparse_embedder = SparseEmbedder()
+        copy_points(client, args.collection, staging, args.batch_size, lambda point: convert_point(point, sparse_embedder))
+    elif client.collection_exists(staging):
+        # A previous run stopped after the staging copy was complete.
+        print(f"Resuming from staging collection '{staging}'...")
+    else:
+        print(f"'{args.collection}' already uses the current vector layout.")
+        return
+
+    if migrate or not client.collection_exists(args.collection):
+        print(f"Recreating '{args.collection}'...")
+        if client.collection_exists(args.collection):
+            delete_collection(args.collection)
+        create_memory_collection(args.collection, profile=args.profile)
+    copied = copy_points(client, staging, args.collection, args.batch_size)
+
+    if not args.keep_staging:
+        delete_collection(staging)
+    print(f"Migrated {copied} points in '{args.collection}'.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import argparse
+import asyncio
+import subprocess
+import time
+
+# What the API imports at startup and during warmup, in that order.
+DEFAULT_MODULES = ["api.routes", "ingestion.worker", "memory.decay_update", "memory.memory_manager", "reasoning.recommendation"]
+
+def _importtime(code):
+    # python -X importtime writes "self us | cumulative us | name" per import to
+    # stderr, with the name indented two spaces per nesting level.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.splitlines()[-1] if result.stderr else "import failed")
+        sys.exit(1)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+def import_times(modules):
+    # Shared dependencies are charged to whichever module imports them first;
+    # imports the interpreter does on its own (site, encodings) are left out.
+    baseline = {name for name, _, _, _ in _importtime("pass")}
+    return [row for row in _importtime("; ".join(f"import {module}" for module in modules)) if row[0] not in baseline]
+
+async def warm(components):
+    from api.startup import Startup, warm_text, warm_image, warm_qdrant
+    startup = Startup(components)
+    startup.register("text", warm_text)
+    startup.register("image", warm_image)
+    startup.register("qdrant", warm_qdrant)
+    await startup.start(blocking=True)
+    return startup.status()
+
+def main():
+    parser = argparse.ArgumentParser(description="Show where API startup time goes: module imports, then component warmup")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=25, help="Slowest imports to list")
+    parser.add_argument("--warmup", nargs="*", default=["text", "qdrant"], help="Components to warm after importing (none to skip)")
+    args = parser.parse_args()
+
+    rows = import_times(args.modules)
+    total = sum(cumulative for _, depth, _, cumulative in rows if depth == 0)
+    print(f"Importing {', '.join(args.modules)}: {total:.0f} ms")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for name, depth, self_ms, cumulative_ms in sorted(rows, key=lambda row: -row[3])[:args.top]:
+        print(f"{cumulative_ms:>14.1f}{self_ms:>10.1f}  {'  ' * depth}{name}")
+
+    if args.warmup:
+        started = time.perf_counter()
+        status = asyncio.run(warm(args.warmup))
+        print(f"\nWarmup: {time.perf_counter() - started:.2f}s (includes imports not listed above)")
+        for name, component in status["components"].items():
+            detail = f"{component.get('seconds', 0):.2f}s" if component["state"] == "ready" else component.get("error", "")
+            print(f"  {name:<10}{component['state']:<8}{detail}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+from memory.decay_update import refresh_decay, DECAY_HALF_LIFE_DAYS
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute stored decay weights for every memory")
+    parser.add_argument("--collection", default="memories")
+    args = parser.parse_args()
+
+    print(f"Refreshing decay weights on '{args.collection}' (half-life {DECAY_HALF_LIFE_DAYS:g} days)...")
+    refreshed = asyncio.run(refresh_decay(args.collection))
+    print(f"Updated {refreshed} memories.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -34,11 +34,12 @@ def main():
     memory_manager = MemoryManager()
     recommendation_engine = RecommendationEngine()
 
-    for item in queries:
+    # One embedding pass and one Qdrant round trip for the whole checklist.
+    all_memories = memory_manager.retrieve_memories_batch([item["query"] for item in queries])
+
+    for item, memories in zip(queries, all_memories):
         query = item["query"]
         print(f"\nQuery: {query}")
-
-        memories = memory_manager.retrieve_memories(query)
         print(f"Retrieved {len(memories)} memories")
 
         recommendation = recommendation_engine.generate_recommendation(query, memories)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import signal
+from ingestion.worker import start_worker_processes, stop_worker_processes, INGEST_WORKERS
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ingestion queue workers (for INGEST_WORKER_MODE=external)")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    args = parser.parse_args()
+
+    processes = start_worker_processes(args.workers)
+    print(f"Started {args.workers} ingestion workers. Press Ctrl+C to stop.")
+    # Blocked only after the workers are spawned so they keep default handling.
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT, signal.SIGTERM})
+    try:
+        signal.sigwait({signal.SIGINT, signal.SIGTERM})
+    finally:
+        stop_worker_processes(processes)
+        print("Workers stopped.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -4,11 +4,28 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from qdrant.collections import create_memory_collection
+import argparse
+from qdrant.client import get_qdrant_client
+from qdrant.collections import create_memory_collection, delete_collection, COLLECTION_PROFILES, QDRANT_COLLECTION_PROFILE
 
 def main():
-    print("Setting up Qdrant collection...")
-    create_memory_collection()
+    parser = argparse.ArgumentParser(description="Create the memories collection")
+    parser.add_argument("--profile", choices=sorted(COLLECTION_PROFILES), default=QDRANT_COLLECTION_PROFILE,
+                        help="HNSW/quantization/on-disk storage profile")
+    parser.add_argument("--recreate", action="store_true",
+                        help="drop an existing collection and its points first (to keep them, run migrate_vector_layout.py)")
+    args = parser.parse_args()
+
+    if get_qdrant_client().collection_exists("memories"):
+        if not args.recreate:
+            print("Collection 'memories' already exists. Run scripts/migrate_vector_layout.py to bring it to the current "
+                  "vector layout with its points, or pass --recreate to drop it and re-ingest.")
+            sys.exit(1)
+        print("Dropping existing collection 'memories'...")
+        delete_collection("memories")
+
+    print(f"Setting up Qdrant collection (profile: {args.profile})...")
+    create_memory_collection(profile=args.profile)
     print("Collection 'memories' created successfully.")
 
 if __name__ == "__main__":
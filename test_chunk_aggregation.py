@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from qdrant_client.http import models
+import qdrant.search as search
+from qdrant.search import _aggregate_chunks
+
+def _point(point_id, score, **payload):
+    payload.setdefault("text", f"point {point_id}")
+    return models.ScoredPoint(id=point_id, version=0, score=score, payload=payload)
+
+# Best first, as Qdrant returns them: the short document has the single best chunk,
+# the long one matches in three places.
+POINTS = [
+    _point(11, 0.9, parent_id="100", chunk_count=1),
+    _point(21, 0.6, parent_id="200", chunk_count=40),
+    _point(3, 0.55),
+    _point(22, 0.5, parent_id="200", chunk_count=40),
+    _point(23, 0.4, parent_id="200", chunk_count=40),
+]
+
+def test_max_keeps_the_best_chunk(monkeypatch):
+    monkeypatch.setattr(search, "CHUNK_AGGREGATION", "max")
+    results = _aggregate_chunks(POINTS, 3)
+    assert [point.id for point in results] == [100, 200, 3]
+    assert results[1].score == pytest.approx(0.6)
+    assert results[1].payload["text"] == "point 21" and results[1].payload["snippet"]
+    assert "snippet" not in results[2].payload
+
+def test_sum_lets_a_long_document_win(monkeypatch):
+    monkeypatch.setattr(search, "CHUNK_AGGREGATION", "sum")
+    results = _aggregate_chunks(POINTS, 2)
+    assert [point.id for point in results] == [200, 100]
+    assert results[0].score == pytest.approx(1.5)
\ No newline at end of file
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from embeddings.chunking import chunk_text, _bpe
+
+TEXT = " ".join(f"step{i} of the evacuation plan," for i in range(120))
+
+def _tokens(text):
+    bpe = _bpe()
+    return sum(len(bpe.encode(word)) if bpe is not None else 1 for word in text.split())
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Flood evacuation, downtown district.") == ["Flood evacuation, downtown district."]
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("   \n ") == []
+
+def test_chunks_are_verbatim_and_fit_the_window():
+    chunks = chunk_text(TEXT, max_tokens=40, overlap_tokens=8)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk in TEXT
+        assert _tokens(chunk) <= 40
+    assert TEXT.startswith(chunks[0]) and TEXT.endswith(chunks[-1])
+
+def test_consecutive_chunks_overlap():
+    chunks = chunk_text(TEXT, max_tokens=40, overlap_tokens=8)
+    for previous, current in zip(chunks, chunks[1:]):
+        first_word = current.split()[0]
+        assert first_word in previous.split()
+        assert TEXT.index(current) < TEXT.index(previous) + len(previous)
+
+def test_no_overlap():
+    chunks = chunk_text(TEXT, max_tokens=40, overlap_tokens=0)
+    assert " ".join(chunks) == TEXT
+
+def test_oversized_word_is_its_own_chunk():
+    word = "x" * 400
+    assert chunk_text(f"before {word} after", max_tokens=1, overlap_tokens=0) == ["before", word, "after"]
\ No newline at end of file
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+from datetime import date
+import numpy as np
+import pytest
+from qdrant_client.http import models
+import memory.decay_update as decay
+from memory.decay_update import (recency_weights, outcome_weights, rerank, diversify, access_count, AccessTracker,
+                                 DECAY_FLOOR, DECAY_HALF_LIFE_DAYS)
+
+TODAY = date(2024, 6, 1)
+
+def _point(point_id, score, vector=None, **payload):
+    payload.setdefault("date", "2024-06-01")
+    payload.setdefault("outcome", "success")
+    return models.ScoredPoint(id=point_id, version=0, score=score, payload=payload, vector=vector)
+
+def test_recency_weights():
+    half_life_ago = str(np.datetime64(TODAY) - np.timedelta64(int(DECAY_HALF_LIFE_DAYS), "D"))
+    weights = recency_weights(["2024-06-01", half_life_ago, "2030-01-01", None, "not a date"], TODAY)
+    half = DECAY_FLOOR + (1 - DECAY_FLOOR) * 0.5
+    # Future dates count as today; undated memories as one half-life old.
+    assert np.allclose(weights, [1.0, half, 1.0, half, half])
+
+def test_recency_weights_approach_the_floor():
+    weights = recency_weights(["1900-01-01"], TODAY)
+    assert weights[0] == pytest.approx(DECAY_FLOOR, abs=1e-3)
+
+def test_outcome_weights():
+    assert np.allclose(outcome_weights(["success", "mixed", "failure", "unknown"]), [1.0, 0.9, 0.8, 1.0])
+
+def test_rerank_prefers_recent_memories(monkeypatch):
+    monkeypatch.setattr(decay, "date", type("FixedDate", (), {"today": staticmethod(lambda: TODAY)}))
+    points = [_point(1, 0.80, date="2010-01-01"), _point(2, 0.78), _point(3, 0.2)]
+    ranked = rerank(points, 2)
+    assert [point.id for point in ranked] == [2, 1]
+    assert ranked[0].score == pytest.approx(0.78)
+
+def test_rerank_uses_stored_weight_and_access_boost():
+    points = [_point(1, 0.8, decay_weight=0.5), _point(2, 0.5, decay_weight=1.0),
+              _point(3, 0.5, decay_weight=1.0, access_count_w0=50)]
+    assert [point.id for point in rerank(points, 3)] == [3, 2, 1]
+
+def test_rerank_disabled_keeps_order(monkeypatch):
+    monkeypatch.setattr(decay, "DECAY_ENABLED", False)
+    points = [_point(1, 0.8, decay_weight=0.1), _point(2, 0.5)]
+    assert [point.id for point in rerank(points, 1)] == [1]
+
+def test_access_count_sums_worker_fields():
+    assert access_count({"access_count": 2, "access_count_w0": 3, "access_count_w1": 4, "decay_weight": 0.5}) == 9
+    assert access_count({}) == 0
+
+def test_diversify_skips_near_duplicates():
+    points = [_point(1, 1.0, vector={"text": [1.0, 0.0]}), _point(2, 0.99, vector={"text": [1.0, 0.01]}),
+              _point(3, 0.7, vector={"image": [0.0, 1.0]})]
+    assert [point.id for point in diversify(points, 2, diversity=0.5)] == [1, 3]
+    assert [point.id for point in diversify(points, 2, diversity=0.0)] == [1, 2]
+
+def test_diversify_without_vectors_keeps_order():
+    points = [_point(1, 1.0), _point(2, 0.9), _point(3, 0.8)]
+    assert [point.id for point in diversify(points, 2, diversity=0.5)] == [1, 2]
+
+def test_access_tracker_drain_and_merge():
+    tracker = AccessTracker()
+    tracker.record(["1", 2, 2])
+    counts, last = tracker.drain()
+    assert counts == {1: 1, 2: 2}
+    assert tracker.drain() == ({}, {})
+
+    tracker.record([2])
+    tracker.merge(counts, last)
+    merged, merged_last = tracker.drain()
+    assert merged == {1: 1, 2: 3}
+    assert merged_last[2] >= last[2]
+
+def test_failed_flush_keeps_the_counts(monkeypatch):
+    tracker = AccessTracker()
+    monkeypatch.setattr(decay, "_tracker", tracker)
+
+    async def unavailable(method, **kwargs):
+        raise ConnectionError("qdrant unavailable")
+
+    monkeypatch.setattr(decay, "run_qdrant", unavailable)
+    tracker.record([1, 1, 2])
+    with pytest.raises(ConnectionError):
+        asyncio.run(decay.flush_access_stats())
+    assert tracker.drain()[0] == {1: 2, 2: 1}
+
+def test_flush_adds_to_this_workers_field(monkeypatch):
+    tracker = AccessTracker()
+    monkeypatch.setattr(decay, "_tracker", tracker)
+    monkeypatch.setenv("API_WORKER_INDEX", "1")
+    calls = []
+
+    async def fake_qdrant(method, **kwargs):
+        calls.append((method, kwargs))
+        if method == "retrieve":
+            return [models.Record(id=1, payload={"access_count_w1": 4})]
+
+    monkeypatch.setattr(decay, "run_qdrant", fake_qdrant)
+    tracker.record([1, 1])
+    assert asyncio.run(decay.flush_access_stats()) == 1
+    method, kwargs = calls[-1]
+    assert method == "batch_update_points"
+    assert kwargs["update_operations"][0].set_payload.payload["access_count_w1"] == 6
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import multiprocessing
+import pytest
+from qdrant.generations import GenerationStore
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "generations.sqlite")
+
+def test_bump_counts_per_collection(path):
+    store = GenerationStore(path)
+    assert store.get("memories") == 0
+    assert store.bump("memories") == 1
+    assert store.bump("memories") == 2
+    assert store.get("memories") == 2
+    assert store.get("other") == 0
+    store.close()
+
+def test_bumps_are_seen_by_other_stores(path):
+    # Each store stands in for a separate API or ingestion worker process.
+    api, worker = GenerationStore(path), GenerationStore(path)
+    before = api.get("memories")
+    worker.bump("memories")
+    assert api.get("memories") == before + 1
+    api.close()
+    worker.close()
+
+def _bump(store):
+    store.bump("memories")
+
+def test_bumps_from_a_forked_process(path):
+    # The child inherits the parent's store and must open its own connection.
+    store = GenerationStore(path)
+    assert store.get("memories") == 0
+    process = multiprocessing.get_context("fork").Process(target=_bump, args=(store,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert store.get("memories") == 1
+    store.close()
\ No newline at end of file
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import ingestion.queue as job_queue
+from ingestion.queue import JobQueue
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # No backoff, so a failed item can be claimed again straight away.
+    monkeypatch.setattr(job_queue, "INGEST_RETRY_BACKOFF", 0)
+    queue = JobQueue(str(tmp_path / "queue.sqlite"))
+    yield queue
+    queue.close()
+
+def test_claim_hands_out_each_item_once(queue):
+    job_id = queue.enqueue("document", [{"text": "a"}, {"text": "b"}])
+
+    first = queue.claim("w1")
+    second = queue.claim("w2")
+    assert (first.job_id, first.item_index, first.payload, first.attempts) == (job_id, 0, {"text": "a"}, 1)
+    assert second.item_index == 1
+    assert queue.claim("w3") is None
+    assert queue.status(job_id)["status"] == "running"
+
+def test_complete_records_results(queue):
+    job_id = queue.enqueue("document", [{"text": "a"}])
+    queue.complete(queue.claim("w1"), {"memory_id": "1"})
+
+    status = queue.status(job_id)
+    assert status["status"] == "completed"
+    assert status["results"] == [{"memory_id": "1"}]
+
+def test_fail_retries_then_dead_letters(queue):
+    job_id = queue.enqueue("document", [{"text": "a"}], max_attempts=2)
+
+    assert queue.fail(queue.claim("w1"), "boom") == "queued"
+    item = queue.claim("w1")
+    assert item.attempts == 2
+    assert queue.fail(item, "boom again") == "dead"
+    assert queue.claim("w1") is None
+
+    status = queue.status(job_id)
+    assert status["status"] == "failed"
+    assert status["dead_letters"] == [{"item_index": 0, "attempts": 2, "error": "boom again"}]
+
+def test_partial_failure_status(queue):
+    job_id = queue.enqueue("document", [{"text": "a"}, {"text": "b"}], max_attempts=1)
+    queue.complete(queue.claim("w1"))
+    queue.fail(queue.claim("w1"), "boom")
+    assert queue.status(job_id)["status"] == "completed_with_errors"
+
+def test_expired_lease_is_requeued(queue, monkeypatch):
+    job_id = queue.enqueue("document", [{"text": "a"}])
+    queue.claim("w1")
+
+    monkeypatch.setattr(job_queue, "INGEST_LEASE_SECONDS", -1)
+    item = queue.claim("w2")
+    assert item is not None and item.attempts == 2
+    assert queue.status(job_id)["counts"]["running"] == 1
+
+def test_expired_lease_dead_letters_exhausted_item(queue, monkeypatch):
+    job_id = queue.enqueue("document", [{"text": "a"}], max_attempts=1)
+    queue.claim("w1")
+
+    monkeypatch.setattr(job_queue, "INGEST_LEASE_SECONDS", -1)
+    assert queue.claim("w2") is None
+    status = queue.status(job_id)
+    assert status["status"] == "failed"
+    assert status["dead_letters"][0]["error"] == "lease expired"
+
+def test_renew_keeps_the_lease(queue, monkeypatch):
+    queue.enqueue("document", [{"text": "a"}])
+    item = queue.claim("w1")
+
+    monkeypatch.setattr(job_queue, "INGEST_LEASE_SECONDS", 60)
+    queue._conn.execute("UPDATE items SET claimed_at = claimed_at - 120")
+    queue.renew(item)
+    assert queue.claim("w2") is None
+
+def test_progress_is_reported_while_running(queue):
+    job_id = queue.enqueue("upload", [{"upload": {}}])
+    item = queue.claim("w1")
+    queue.progress(item, {"pages_done": 3, "pages_total": 10})
+    assert queue.status(job_id)["progress"] == {0: {"pages_done": 3, "pages_total": 10}}
+
+def test_cancel_stops_queued_items_and_flags_running_ones(queue):
+    job_id = queue.enqueue("document", [{"text": "a"}, {"text": "b"}])
+    running = queue.claim("w1")
+
+    assert queue.cancel(job_id)
+    assert queue.is_cancelled(job_id)
+    assert queue.claim("w2") is None
+    assert queue.status(job_id)["status"] == "running"
+
+    queue.mark_cancelled(running)
+    assert queue.status(job_id)["status"] == "cancelled"
+
+def test_unknown_job(queue):
+    assert queue.status("missing") is None
+    assert not queue.cancel("missing")
+
+def test_stale_worker_cannot_touch_a_reclaimed_item(queue, monkeypatch):
+    job_id = queue.enqueue("document", [{"text": "a"}])
+    stale = queue.claim("w1")
+
+    monkeypatch.setattr(job_queue, "INGEST_LEASE_SECONDS", -1)
+    current = queue.claim("w2")
+    assert current.worker_id == "w2"
+
+    assert not queue.progress(stale, {"pages_done": 1})
+    assert not queue.renew(stale)
+    assert not queue.complete(stale, {"memory_id": "stale"})
+    assert not queue.mark_cancelled(stale)
+    assert queue.fail(stale, "boom") == "lost"
+
+    assert queue.complete(current, {"memory_id": "1"})
+    status = queue.status(job_id)
+    assert status["status"] == "completed"
+    assert status["results"] == [{"memory_id": "1"}]
+
+def test_finished_item_cannot_be_completed_again(queue):
+    queue.enqueue("document", [{"text": "a"}])
+    item = queue.claim("w1")
+    assert queue.complete(item)
+    assert not queue.complete(item)
+
+def _spooled(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF")
+    return {"upload": {"path": str(path), "filename": name, "size": 4, "digest": "0" * 64}}
+
+def test_cancel_deletes_spooled_files_of_queued_uploads(queue, tmp_path):
+    running, queued = _spooled(tmp_path, "a.pdf"), _spooled(tmp_path, "b.pdf")
+    job_id = queue.enqueue("upload", [running, queued])
+    queue.claim("w1")
+
+    queue.cancel(job_id)
+    # The running item's worker discards its own file when it stops.
+    assert os.path.exists(running["upload"]["path"])
+    assert not os.path.exists(queued["upload"]["path"])
+
+def test_expired_lease_deletes_spooled_file_of_dead_upload(queue, tmp_path, monkeypatch):
+    upload = _spooled(tmp_path, "a.pdf")
+    queue.enqueue("upload", [upload], max_attempts=1)
+    queue.claim("w1")
+
+    monkeypatch.setattr(job_queue, "INGEST_LEASE_SECONDS", -1)
+    assert queue.claim("w2") is None
+    assert not os.path.exists(upload["upload"]["path"])
+
+def test_live_uploads(queue, tmp_path):
+    first, second = _spooled(tmp_path, "a.pdf"), _spooled(tmp_path, "b.pdf")
+    queue.enqueue("upload", [first, second])
+    queue.enqueue("document", [{"text": "a"}])
+    queue.complete(queue.claim("w1"))
+    assert queue.live_uploads() == {second["upload"]["path"]}
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from qdrant.manifest import IngestionManifest, content_hash, stable_point_id
+
+SOURCE = "memories:/data/documents.json"
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.sqlite"))
+    yield manifest
+    manifest.close()
+
+def test_hashes_and_ids_are_stable():
+    assert content_hash({"b": 1, "a": 2}, "text") == content_hash({"a": 2, "b": 1}, "text")
+    assert content_hash("text") != content_hash("text ")
+    assert stable_point_id(SOURCE, "doc-1") == stable_point_id(SOURCE, "doc-1")
+    assert stable_point_id(SOURCE, "doc-1") != stable_point_id(SOURCE, "doc-2")
+    assert 0 <= stable_point_id(SOURCE, "doc-1") < 2 ** 64
+
+def test_record_and_lookup(manifest):
+    run_id = manifest.begin_run(SOURCE)
+    big_id = 2 ** 64 - 1
+    manifest.record(SOURCE, run_id, "ViT-B-32/openai", [("doc-1", "hash-1", None, big_id)])
+
+    found = manifest.lookup(SOURCE, ["doc-1", "missing"])
+    assert list(found) == ["doc-1"]
+    entry = found["doc-1"]
+    assert (entry.content_hash, entry.model_version, entry.point_id) == ("hash-1", "ViT-B-32/openai", big_id)
+    assert manifest.lookup("other-source", ["doc-1"]) == {}
+
+def test_lookup_many_keys(manifest):
+    run_id = manifest.begin_run(SOURCE)
+    manifest.record(SOURCE, run_id, "v1", [(f"doc-{i}", "h", None, i) for i in range(1200)])
+    assert len(manifest.lookup(SOURCE, [f"doc-{i}" for i in range(1300)])) == 1200
+
+def test_unfinished_run_is_resumed(manifest):
+    run_id = manifest.begin_run(SOURCE)
+    assert manifest.begin_run(SOURCE) == run_id
+    manifest.complete_run(run_id)
+    assert manifest.begin_run(SOURCE) != run_id
+
+def test_items_not_seen_in_a_run_are_stale(manifest):
+    first = manifest.begin_run(SOURCE)
+    manifest.record(SOURCE, first, "v1", [("kept", "h1", None, 1), ("deleted", "h2", None, 2)])
+    manifest.complete_run(first)
+
+    second = manifest.begin_run(SOURCE)
+    manifest.touch(SOURCE, second, ["kept"])
+    assert manifest.stale_point_ids(SOURCE, second) == [2]
+    manifest.forget_stale(SOURCE, second)
+    assert list(manifest.lookup(SOURCE, ["kept", "deleted"])) == ["kept"]
\ No newline at end of file
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import embeddings.model_registry as registry
+from embeddings.model_registry import model_identity
+from embeddings.query_cache import QueryEmbeddingCache
+
+def test_identity_includes_the_backend(monkeypatch):
+    monkeypatch.setattr(registry, "DEFAULT_BACKEND", "torch")
+    assert model_identity("ViT-B-32", "openai") == ("ViT-B-32", "openai", "torch")
+    assert model_identity("ViT-B-32", "openai", "onnx-int8") == ("ViT-B-32", "openai", "onnx-int8")
+
+def test_backend_and_quantization_change_the_identity(monkeypatch):
+    identities = set()
+    for backend in ("torch", "torchscript", "onnx", "onnx-int8"):
+        monkeypatch.setattr(registry, "DEFAULT_BACKEND", backend)
+        identities.add(model_identity())
+    assert len(identities) == 4
+
+def test_device_is_not_part_of_the_identity(monkeypatch):
+    monkeypatch.setattr(registry, "DEFAULT_DEVICE", "cuda")
+    on_gpu = model_identity()
+    monkeypatch.setattr(registry, "DEFAULT_DEVICE", "cpu")
+    assert model_identity() == on_gpu
+
+def test_switching_backend_invalidates_the_query_cache():
+    cache = QueryEmbeddingCache(dim=2)
+    cache.put("flood routes", np.array([1.0, 0.0], dtype=np.float32), model_identity(backend="torch"))
+    assert cache.get("flood routes", model_identity(backend="onnx-int8")) is None
+    assert cache.invalidations == 1
\ No newline at end of file
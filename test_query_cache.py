@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from embeddings.query_cache import QueryEmbeddingCache
+
+MODEL = ("ViT-B-32", "openai", "torch")
+
+def _vector(seed, dim=8):
+    vector = np.random.default_rng(seed).normal(size=dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+def test_entries_spill_and_come_back(tmp_path):
+    cache = QueryEmbeddingCache(max_entries=1, spill_path=str(tmp_path / "spill.f32"), spill_entries=4, dim=8)
+    cache.put("first query", _vector(1), MODEL)
+    cache.put("second query", _vector(2), MODEL)
+    assert cache.metrics()["spilled_entries"] == 1
+    assert np.allclose(cache.get("first  query", MODEL), _vector(1))
+    assert cache.spill_hits == 1
+
+def test_two_caches_on_one_spill_path(tmp_path):
+    # Stands in for two forked API workers configured with the same path.
+    path = str(tmp_path / "spill.f32")
+    first = QueryEmbeddingCache(max_entries=1, spill_path=path, spill_entries=4, dim=8)
+    second = QueryEmbeddingCache(max_entries=1, spill_path=path, spill_entries=4, dim=8)
+    for cache, seed in ((first, 10), (second, 20)):
+        for i in range(3):
+            cache.put(f"query {i}", _vector(seed + i), MODEL)
+
+    for cache, seed in ((first, 10), (second, 20)):
+        for i in range(3):
+            assert np.allclose(cache.get(f"query {i}", MODEL), _vector(seed + i))
+    assert not os.path.exists(path)
+
+def test_model_change_invalidates(tmp_path):
+    cache = QueryEmbeddingCache(max_entries=1, spill_path=str(tmp_path / "spill.f32"), spill_entries=4, dim=8)
+    cache.put("a", _vector(1), MODEL)
+    cache.put("b", _vector(2), MODEL)
+    assert cache.get("a", ("ViT-B-32", "openai", "onnx")) is None
+    assert cache.invalidations == 1
+    assert cache.metrics()["spilled_entries"] == 0
\ No newline at end of file
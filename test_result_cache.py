@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from api.result_cache import SemanticResultCache, make_result_key
+from memory.schema import QueryFilters
+
+def _key(query, filters=None):
+    return make_result_key("memories", query, filters, 5, "summary")
+
+def test_key_ignores_case_spacing_and_tag_order():
+    assert _key("Flood  evacuation routes") == _key("flood evacuation ROUTES")
+    assert _key("flood", QueryFilters(tags=["b", "a"])) == _key("flood", QueryFilters(tags=["a", "b"]))
+
+def test_codes_that_differ_get_different_keys():
+    assert _key("policy POL-2023-14") != _key("policy POL-2023-15")
+
+def test_near_duplicate_needs_the_same_terms():
+    cache = SemanticResultCache(similarity_threshold=0.97)
+    vector, nearby = np.array([1.0, 0.0]), np.array([1.0, 0.05])
+    cache.put(_key("policy POL-2023-14"), vector, "response 14", generation=0)
+
+    assert cache.get(_key("Policy  POL-2023-14"), nearby, generation=0) == "response 14"
+    # Dense vectors this close would have matched before the terms were in the key.
+    assert cache.get(_key("policy POL-2023-15"), nearby, generation=0) is None
+
+def test_new_generation_invalidates():
+    cache = SemanticResultCache()
+    cache.put(_key("flood"), np.array([1.0, 0.0]), "response", generation=1)
+    assert cache.get(_key("flood"), np.array([1.0, 0.0]), generation=2) is None
+    assert cache.invalidations == 1
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+from embeddings.similarity import normalize, cosine_matrix, cosine, top_k, mmr
+
+rng = np.random.default_rng(7)
+
+def test_normalize_leaves_zero_rows():
+    vectors = np.array([[3.0, 4.0], [0.0, 0.0]])
+    result = normalize(vectors)
+    assert result.dtype == np.float32
+    assert np.allclose(result, [[0.6, 0.8], [0.0, 0.0]])
+    assert np.allclose(vectors, [[3.0, 4.0], [0.0, 0.0]])
+
+def test_cosine_matrix_matches_pairwise_cosine():
+    queries, corpus = rng.normal(size=(3, 16)), rng.normal(size=(5, 16))
+    expected = np.array([[q @ c / np.linalg.norm(q) / np.linalg.norm(c) for c in corpus] for q in queries])
+    assert np.allclose(cosine_matrix(queries, corpus), expected, atol=1e-5)
+    assert cosine(queries[0], corpus[1]) == pytest.approx(expected[0, 1], abs=1e-5)
+
+@pytest.mark.parametrize("k", [0, 1, 3, 10, 50])
+def test_top_k_matches_full_sort(k):
+    scores = rng.normal(size=10)
+    indices, values = top_k(scores, k)
+    expected = np.argsort(-scores)[:k]
+    assert list(indices) == list(expected)
+    assert np.allclose(values, scores[expected])
+
+def test_top_k_per_row():
+    scores = rng.normal(size=(4, 20))
+    indices, values = top_k(scores, 5)
+    assert indices.shape == values.shape == (4, 5)
+    for row, picked in zip(scores, indices):
+        assert list(picked) == list(np.argsort(-row)[:5])
+
+def test_mmr_without_diversity_is_relevance_order():
+    query, candidates = rng.normal(size=8), rng.normal(size=(12, 8))
+    relevance = cosine_matrix(query, candidates)[0]
+    assert list(mmr(query, candidates, 5, diversity=0.0)) == list(np.argsort(-relevance)[:5])
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([
+        [1.0, 0.1, 0.0],
+        [1.0, 0.11, 0.0],   # near-duplicate of the best candidate
+        [0.8, 0.0, 0.6],
+    ])
+    assert list(mmr(query, candidates, 2, diversity=0.0)) == [0, 1]
+    assert list(mmr(query, candidates, 2, diversity=0.7)) == [0, 2]
+
+def test_mmr_uses_precomputed_relevance():
+    candidates = np.eye(4)
+    assert list(mmr(None, candidates, 4, diversity=0.3, relevance=[0.1, 0.9, 0.5, 0.7])) == [1, 3, 2, 0]
+
+def test_mmr_k_larger_than_candidates():
+    picked = mmr(rng.normal(size=4), rng.normal(size=(3, 4)), 10)
+    assert sorted(picked) == [0, 1, 2]
\ No newline at end of file
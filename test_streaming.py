@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import pytest
+from qdrant.streaming import iter_json_records, batched
+
+RECORDS = [
+    {"id": "1", "text": "Flood evacuation, downtown district", "tags": ["flood", "evacuation"]},
+    {"id": "2", "text": "Budget review [draft], \"quoted\" text", "confidence": 4.5},
+    {"id": "3", "text": "", "nested": {"values": [1, 2.25, -3e2], "flag": True, "none": None}},
+    7,
+    "a bare string",
+]
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_json_array_matches_json_load(tmp_path, chunk_size):
+    # Small chunks cut records, strings and numbers at every possible boundary.
+    path = _write(tmp_path, "docs.json", json.dumps(RECORDS, indent=2))
+    assert list(iter_json_records(path, chunk_size)) == RECORDS
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1 << 16])
+def test_compact_array_and_numbers_at_the_boundary(tmp_path, chunk_size):
+    path = _write(tmp_path, "numbers.json", "[4.5,12345,-0.25,1e10]")
+    assert list(iter_json_records(path, chunk_size)) == [4.5, 12345, -0.25, 1e10]
+
+def test_empty_array(tmp_path):
+    assert list(iter_json_records(_write(tmp_path, "empty.json", "  [ ]  "))) == []
+
+def test_not_an_array(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_json_records(_write(tmp_path, "object.json", '{"id": "1"}')))
+
+def test_truncated_array(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_json_records(_write(tmp_path, "truncated.json", '[{"id": "1"}, {"id": '), chunk_size=4))
+
+def test_jsonl_skips_blank_lines(tmp_path):
+    content = "\n".join(json.dumps(record) for record in RECORDS[:3]) + "\n\n"
+    assert list(iter_json_records(_write(tmp_path, "docs.jsonl", content))) == RECORDS[:3]
+
+def test_batched():
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched([], 3)) == []
\ No newline at end of file